@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.db.loaders import loader_options
 from app.models.user import User, ProfileClient, ProfilePro
-from app.schemas.auth import SignupRequest, SignupResponse, Token
+from app.schemas.auth import SignupRequest, SignupResponse, Token, RefreshRequest
 from app.schemas.users import UserRole, UserDetailsOut
-from app.utils.auth import get_password_hash, create_access_token
-from app.services.auth import authenticate_user
+from app.services.password_hasher import password_hasher
+from app.services.auth import authenticate_user, issue_tokens, rotate_refresh_token, bump_token_version, forget_user_tokens
+from app.services.notifications import notification_dispatcher, notify
 from app.dependencies.auth import get_current_user, require_roles
+from app.core.principal_cache import Principal
 from uuid import uuid4
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
@@ -17,17 +21,17 @@ from uuid import UUID
 router = APIRouter()
 
 @router.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
-def signup(data: SignupRequest, db: Session = Depends(get_db)):
-    print("📥 signup route called")
-    existing_user = db.query(User).filter(User.email == data.email).first()
+async def signup(data: SignupRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User.id).where(User.email == data.email))
+    existing_user = result.first()
     if existing_user:
         raise HTTPException(status_code=409, detail="Email already registered")
-    print("✅ checked if user exists")
+    hashed_password = await password_hasher.hash(data.password)
     new_user = User(
         id=uuid4(),
         email=data.email,
         full_name=data.full_name,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=hashed_password,
         phone=data.phone,
         roles=data.roles,
         is_active=True,
@@ -37,7 +41,7 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.flush()  # Required to get the user_id for FK creation
+    await db.flush()  # Required to get the user_id for FK creation
 
     if UserRole.client in data.roles:
         client_profile = ProfileClient(
@@ -46,7 +50,6 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
             address=data.address.dict() if data.address else None
         )
         db.add(client_profile)
-    print("🧱 user created")
     if UserRole.pro in data.roles:
         pro_profile = ProfilePro(
             user_id=new_user.id,
@@ -57,53 +60,69 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
         )
         db.add(pro_profile)
 
+    tokens = issue_tokens(db, new_user.id, new_user.roles, new_user.token_version)
+    # emailed by the dispatcher after the commit, the request doesn't wait on the mail provider
+    notify(db, new_user.id, "welcome", f"Welcome to Timz, {new_user.full_name}!")
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error while creating user")
-    print("💾 committed")
-
-
-    access_token = create_access_token(
-        user_id=new_user.id,
-        role=new_user.roles,
-        token_version=new_user.token_version
-    )
+    notification_dispatcher.wake()
 
     return SignupResponse(
-        access_token=access_token,
+        access_token=tokens["access_token"],
+        refresh_token=tokens["refresh_token"],
         user_id=new_user.id,
         roles=new_user.roles
     )
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm=Depends(), db:Session = Depends(get_db)):
-    user=authenticate_user(db, form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm=Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access_token = create_access_token(
-        user_id=user.id,
-        role=user.roles,
-        token_version=user.token_version
-    )
+    tokens = issue_tokens(db, user.id, user.roles, user.token_version)
+    await db.commit()
 
     return {
-        "access_token": access_token,
+        "access_token": tokens["access_token"],
+        "refresh_token": tokens["refresh_token"],
         "token_type": "bearer",
         "user_id": str(user.id),
         "roles": user.roles,
     }
 
+@router.post("/refresh", response_model=Token)
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    principal, tokens = await rotate_refresh_token(db, data.refresh_token)
+    return {
+        "access_token": tokens["access_token"],
+        "refresh_token": tokens["refresh_token"],
+        "token_type": "bearer",
+        "user_id": str(principal.id),
+        "roles": list(principal.roles),
+    }
+
 
 @router.get("/me", response_model=UserDetailsOut)
-def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_me(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(
+        select(User)
+        .options(*loader_options(User, UserDetailsOut))
+        .where(User.id == current_user.id)
+    )
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found or inactive")
+    return user
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    current_user.token_version += 1
-    db.commit()
+async def logout(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    # ends every session of the user: older access tokens and all refresh tokens
+    token_version = await bump_token_version(db, current_user.id, revoke_refresh_tokens=True)
+    await db.commit()
+    forget_user_tokens(current_user.id, token_version)
     return
 
 
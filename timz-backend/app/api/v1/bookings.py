@@ -1,6 +1,96 @@
-# from fastapi import APIRouter
-#
-# router = APIRouter()
-# @router.get("/test")
-# async def test_bookings():
-#     return {"test": "Bookings routed!"}
\ No newline at end of file
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timezone
+from uuid import UUID
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.db.database import get_async_db
+from app.dependencies.auth import require_roles, get_current_user
+from app.core.principal_cache import Principal
+from app.core.constants import ACTIVE_BOOKING_STATUSES, DEFAULT_SLOT_WINDOW_DAYS, MAX_SLOT_WINDOW_DAYS
+from app.models.booking import Calendar
+from app.models.service import Service
+from app.schemas.bookings import CalendarIn, CalendarOut, SlotsOut, BookingCreate, BookingOut, BookingStatusUpdate
+from app.services.bookings import get_calendar, available_slots, create_booking, transition_booking
+from app.services.availability import refresh_availability, mark_booked, release_booking
+
+router = APIRouter()
+
+
+@router.get("/calendar", response_model=CalendarOut)
+async def get_my_calendar(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(require_roles(["pro"]))):
+    calendar = await get_calendar(db, current_user.id)
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+    return calendar
+
+
+@router.put("/calendar", response_model=CalendarOut)
+async def set_my_calendar(
+    data: CalendarIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_roles(["pro"]))
+):
+    calendar = await get_calendar(db, current_user.id)
+    if not calendar:
+        calendar = Calendar(pro_id=current_user.id)
+        db.add(calendar)
+    values = data.model_dump(mode="json")
+    values["days_off"] = data.days_off  # a Date array, not strings
+    for key, value in values.items():
+        setattr(calendar, key, value)
+    await db.commit()
+    await db.refresh(calendar)
+    await refresh_availability(db, [current_user.id])
+    return calendar
+
+
+@router.get("/slots", response_model=SlotsOut)
+async def get_slots(
+    service_id: UUID,
+    start: Optional[date] = Query(None, description="First day, today in the pro's timezone by default"),
+    days: int = Query(DEFAULT_SLOT_WINDOW_DAYS, ge=1, le=MAX_SLOT_WINDOW_DAYS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    result = await db.execute(
+        select(Service.pro_id, Service.duration).where(
+            Service.id == service_id, Service.is_active == True, Service.is_public == True
+        )
+    )
+    service = result.first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+    if not service.duration:
+        raise HTTPException(status_code=400, detail="Service has no duration")
+
+    calendar = await get_calendar(db, service.pro_id)
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+
+    now = datetime.now(timezone.utc)
+    if start is None:
+        start = now.astimezone(ZoneInfo(calendar.timezone)).date()
+    slots = await available_slots(db, calendar, service.duration, start, days, now)
+    return SlotsOut(service_id=service_id, duration=service.duration, timezone=calendar.timezone, slots=slots)
+
+
+@router.post("/", response_model=BookingOut, status_code=status.HTTP_201_CREATED)
+async def book(data: BookingCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    booking = await create_booking(db, current_user.id, data.service_id, data.starts_at)
+    mark_booked(booking)
+    return booking
+
+
+@router.patch("/{booking_id}/status", response_model=BookingOut)
+async def change_booking_status(
+    booking_id: UUID,
+    data: BookingStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    booking = await transition_booking(db, booking_id, data.status, current_user)
+    if booking.status not in ACTIVE_BOOKING_STATUSES:
+        await release_booking(db, booking)
+    return booking
@@ -1,6 +1,193 @@
-# from fastapi import APIRouter
-#
-# router = APIRouter()
-# @router.get("/test")
-# async def test_chat():
-#     return {"test": "Chat routed!"}
\ No newline at end of file
+import asyncio
+import json
+from functools import partial
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.chat_hub import IDLE_TIMEOUT, Connection
+from app.core.config import get_settings
+from app.core.principal_cache import Principal
+from app.db.database import db_session, get_async_db
+from app.dependencies.auth import get_current_user
+from app.dependencies.chat import get_conversation, websocket_principal
+from app.models.chat import ChatMessage, Conversation
+from app.schemas.chat import ChatMessageOut, ClientFrame, ConversationCreate, ConversationOut, MessageEvent
+from app.schemas.pagination import Page
+from app.services.chat import (
+    PendingMessage, chat_hub, chat_writer, get_or_create_conversation, get_participant_conversation, mark_read,
+    participant_columns,
+)
+from app.utils.pagination import PageParams, page_params, paginate
+from app.utils.serialization import TypedJSONResponse, projection
+
+settings = get_settings()
+router = APIRouter()
+
+PING = json.dumps({"type": "ping"})
+
+
+def event(type: str, **fields) -> str:
+    return json.dumps({"type": type, **{key: str(value) for key, value in fields.items()}})
+
+
+def conversation_out(conversation: Conversation, user_id) -> ConversationOut:
+    is_client = user_id == conversation.client_id
+    return ConversationOut(
+        id=conversation.id,
+        client_id=conversation.client_id,
+        pro_id=conversation.pro_id,
+        last_seq=conversation.last_seq,
+        last_message_at=conversation.last_message_at,
+        unread=conversation.unread(user_id),
+        last_read_seq=conversation.client_last_read_seq if is_client else conversation.pro_last_read_seq,
+        created_at=conversation.created_at,
+    )
+
+
+@router.post("/conversations", response_model=ConversationOut)
+async def start_conversation(
+    data: ConversationCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)
+):
+    return conversation_out(await get_or_create_conversation(db, current_user.id, data.pro_id), current_user.id)
+
+
+@router.get("/conversations", response_model=Page[ConversationOut])
+async def get_my_conversations(
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    query = select(*projection(Conversation, ConversationOut), *participant_columns(current_user.id)).where(
+        or_(Conversation.client_id == current_user.id, Conversation.pro_id == current_user.id)
+    )
+    items = await paginate(db, query, [Conversation.created_at, Conversation.id], page)
+    return TypedJSONResponse(Page[ConversationOut], items)
+
+
+@router.get("/conversations/{conversation_id}/messages", response_model=Page[ChatMessageOut])
+async def get_messages(
+    after_seq: Optional[int] = Query(None, ge=0, description="Oldest first from this seq (catching up after a reconnect)"),
+    page: PageParams = Depends(page_params),
+    conversation: Conversation = Depends(get_conversation),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # newest first by default; both directions are a range of the (conversation_id, seq) index
+    query = select(*projection(ChatMessage, ChatMessageOut)).where(ChatMessage.conversation_id == conversation.id)
+    if after_seq is not None:
+        query = query.where(ChatMessage.seq > after_seq)
+    items = await paginate(db, query, [ChatMessage.seq], page, descending=after_seq is None)
+    return TypedJSONResponse(Page[ChatMessageOut], items)
+
+
+@router.post("/conversations/{conversation_id}/read", response_model=ConversationOut)
+async def read_conversation(
+    conversation: Conversation = Depends(get_conversation),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return conversation_out(await mark_read(db, conversation, current_user.id), current_user.id)
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket, current_user: Principal = Depends(websocket_principal)):
+    """
+    One socket per client device, joined to any number of its conversations.
+    No request session is held for the life of the socket: each frame that needs the database
+    opens its own.
+    """
+    await websocket.accept()
+    connection = chat_hub.connect(current_user.id)
+    receiver = asyncio.create_task(receive_frames(websocket, connection))
+    sender = asyncio.create_task(send_frames(websocket, connection))
+    try:
+        done, _ = await asyncio.wait((receiver, sender), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        chat_hub.disconnect(connection)
+        receiver.cancel()
+        sender.cancel()
+        await asyncio.gather(receiver, sender, return_exceptions=True)
+    for task in done:
+        task.result()  # an unexpected error surfaces in the server log
+
+
+async def receive_frames(websocket: WebSocket, connection: Connection) -> None:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        connection.touch()
+        try:
+            frame = ClientFrame.validate_json(message.get("text") or message.get("bytes") or b"")
+        except ValidationError:
+            connection.offer(event("error", detail="Invalid frame"))
+            continue
+
+        if frame.type == "join":
+            async with db_session() as db:
+                conversation = await get_participant_conversation(db, frame.conversation_id, connection.user_id)
+            if not conversation:
+                connection.offer(event("error", detail="Conversation not found", conversation_id=frame.conversation_id))
+                continue
+            chat_hub.subscribe(connection, conversation.id, (conversation.client_id, conversation.pro_id))
+            connection.offer(event("joined", conversation_id=conversation.id))
+
+        elif frame.type == "leave":
+            chat_hub.unsubscribe(connection, frame.conversation_id)
+            connection.offer(event("left", conversation_id=frame.conversation_id))
+
+        elif frame.type == "message":
+            if frame.conversation_id not in connection.conversations:
+                connection.offer(event("error", detail="Join the conversation first", conversation_id=frame.conversation_id))
+                continue
+            client_id, pro_id = connection.conversations[frame.conversation_id]
+            receiver_id = pro_id if connection.user_id == client_id else client_id
+            future = chat_writer.submit(PendingMessage(
+                conversation_id=frame.conversation_id,
+                sender_id=connection.user_id,
+                receiver_id=receiver_id,
+                to_client=receiver_id == client_id,
+                message=frame.message,
+                ref=frame.ref,
+            ))
+            if future is None:
+                connection.offer(event("error", detail="Too many messages, retry later", ref=frame.ref))
+            else:
+                # not awaited: the next frames are read meanwhile, callbacks run in submission order
+                future.add_done_callback(partial(publish_stored, connection))
+
+
+def publish_stored(connection: Connection, future: asyncio.Future) -> None:
+    """Once committed, the message goes to every subscriber: the sender's copy is its acknowledgement"""
+    try:
+        stored = future.result()
+    except Exception:
+        connection.offer(event("error", detail="Message not saved, retry"))
+        return
+    if stored.seq is None:
+        connection.offer(event("error", detail="Conversation not found", conversation_id=stored.conversation_id))
+        return
+    # serialised once for every subscriber
+    chat_hub.publish(stored.conversation_id, MessageEvent.model_validate(stored, from_attributes=True).model_dump_json())
+
+
+async def send_frames(websocket: WebSocket, connection: Connection) -> None:
+    """Drain the connection's queue into the socket, ping when quiet, close when dropped or silent"""
+    try:
+        while True:
+            if not connection.queue.empty():
+                frame = connection.queue.get_nowait()
+            else:
+                try:
+                    frame = await asyncio.wait_for(connection.queue.get(), settings.chat_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    frame = PING
+            if frame is None or connection.idle_for() > settings.chat_idle_timeout_seconds:
+                await websocket.close(code=connection.close_code or IDLE_TIMEOUT)
+                return
+            await websocket.send_text(frame)
+    except (WebSocketDisconnect, OSError, RuntimeError):
+        return  # the client went away while we were sending
@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List, Optional
+from typing import Optional
+from datetime import date, time
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.dependencies.auth import get_current_user
-from app.models.user import User
+from app.core.principal_cache import Principal
 from app.models.service import Service, ServiceGroup, ServiceCategory
-from app.schemas.service import ServiceCreate, ServiceOut, ServiceGroupOut, ServiceGroupCreate, CategoryOut, CategoryCreate
-
+from app.schemas.service import ServiceCreate, ServiceOut, ServiceGroupOut, ServiceGroupCreate, CategoryOut, CategoryCreate, CategoryTreeOut, ServiceSearchHit, ServiceSimilar
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams, page_params, paginate
+from app.utils.serialization import projection, TypedJSONResponse
+from app.services.search import search_services
+from app.services.categories import add_category_closure, subtree_ids, category_tree
+from app.services.collection_versions import bump_collection_version, collection_versions, SERVICES, CATEGORIES
+from app.dependencies.caching import conditional_get
+from app.services.embeddings import service_index, index_service, embedding_vector, similar_services
+from app.services.availability import free_pros, in_horizon
+from app.core.config import get_settings
+from app.core.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+settings = get_settings()
 router = APIRouter()
 
+
+def check_embedding(data: ServiceCreate) -> None:
+    if data.embedding is not None and len(data.embedding) != settings.embedding_dim:
+        raise HTTPException(status_code=400, detail=f"embedding must have {settings.embedding_dim} values")
+
+
 @router.post("/", response_model=ServiceOut, status_code=status.HTTP_201_CREATED)
-def create_service(
+async def create_service(
         data: ServiceCreate,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_user)
 ):
     if "pro" not in current_user.roles:
         raise HTTPException(status_code=403, detail="Only pros can create services")
@@ -24,50 +44,46 @@ def create_service(
         if data.base_price is None or data.duration is None:
             raise HTTPException(status_code=400, detail="A base price and duration are required for fixed/starting_from price")
 
+    check_embedding(data)
     service = Service(pro_id=current_user.id, **data.model_dump())
     db.add(service)
-    db.commit()
-    db.refresh(service)
+    await bump_collection_version(db, SERVICES)
+    await db.commit()
+    collection_versions.expire()
+    await db.refresh(service)
+    index_service(service)
 
     return service
 
-@router.get("/", response_model=List[ServiceOut])
-def get_my_services(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(Service).filter(Service.pro_id == current_user.id).order_by(Service.created_at.desc()).all()
-
-@router.get("/{service_id}", response_model=ServiceOut)
-def get_service(
-  service_id: UUID,
-  data: ServiceCreate,
-  db: Session = Depends(get_db),
-  current_user: User = Depends(get_current_user)
+@router.get("/", response_model=Page[ServiceOut])
+async def get_my_services(
+        page: PageParams = Depends(page_params),
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_user)
 ):
-    service = db.query(Service).filter(Service.id == service_id, Service.pro_id == current_user.id).first()
-    if not service:
-        raise HTTPException(status_code=404, detail="Service not found for this id")
-
-    for key, value in data.model_dump().items():
-        setattr(service, key, value)
-
-    db.commit()
-    db.refresh(service)
-    return service
+    query = select(*projection(Service, ServiceOut)).where(Service.pro_id == current_user.id)
+    items = await paginate(db, query, [Service.created_at, Service.id], page)
+    return TypedJSONResponse(Page[ServiceOut], items)
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_service(
+async def delete_service(
         service_id: UUID,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_user)
 ):
-    service = db.query(Service).filter(Service.id == service_id, Service.pro_id == current_user.id).first()
+    result = await db.execute(select(Service).where(Service.id == service_id, Service.pro_id == current_user.id))
+    service = result.scalars().first()
     if not service:
             raise HTTPException(status_code=404, detail="Service not found")
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await bump_collection_version(db, SERVICES)
+    await db.commit()
+    collection_versions.expire()
+    service_index.remove(service_id)
 
 @router.post("/service-groups", response_model=ServiceGroupOut, status_code=status.HTTP_201_CREATED)
-def create_service_group(
-        data: ServiceGroupCreate, db: Session = Depends(get_db), current_user: User=Depends(get_current_user)
+async def create_service_group(
+        data: ServiceGroupCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)
 ):
     if "pro" not in current_user.roles:
         raise HTTPException(status_code=403, detail="Only pros can create service groups")
@@ -79,45 +95,141 @@ def create_service_group(
     )
 
     db.add(group)
-    db.commit()
-    db.refresh(group)
+    await db.commit()
+    await db.refresh(group)
     return group
 
-@router.get("/service-groups", response_model=list[ServiceGroupOut])
-def get_my_groups(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(ServiceGroup).filter(ServiceGroup.pro_id == current_user.id).order_by(ServiceGroup.position).all()
+@router.get("/service-groups", response_model=Page[ServiceGroupOut])
+async def get_my_groups(
+        page: PageParams = Depends(page_params),
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_user)
+):
+    query = select(*projection(ServiceGroup, ServiceGroupOut)).where(ServiceGroup.pro_id == current_user.id)
+    # groups keep the order chosen by the pro, id breaks ties between equal positions
+    items = await paginate(db, query, [ServiceGroup.position, ServiceGroup.id], page, descending=False)
+    return TypedJSONResponse(Page[ServiceGroupOut], items)
 
-@router.get("/public", response_model=List[ServiceOut])
-def list_public_services(
+@router.get("/public", response_model=Page[ServiceOut])
+async def list_public_services(
         category_id: Optional[UUID] = Query(None),
         pro_id: Optional[UUID] = Query(None),
         service_group_id: Optional[UUID] = Query(None),
-        db: Session = Depends(get_db)
+        available_on: Optional[date] = Query(None, description="Only pros free on this day, over the whole window below"),
+        available_from: time = Query(time(0), description="Window start, on the pro's wall clock"),
+        available_to: Optional[time] = Query(None, description="Window end, midnight by default"),
+        page: PageParams = Depends(page_params),
+        validators: dict = Depends(conditional_get(SERVICES, CATEGORIES, live_params=("available_on",))),
+        db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Service).filter(Service.is_active == True, Service.is_public == True)
+    filters = [Service.is_active == True, Service.is_public == True]
     if category_id:
-        query = query.filter(Service.category_id == category_id)
+        filters.append(Service.category_id.in_(subtree_ids(category_id)))
     if pro_id:
-        query = query.filter(Service.pro_id == pro_id)
+        filters.append(Service.pro_id == pro_id)
     if service_group_id:
-        query = query.filter(Service.service_group_id == service_group_id)
+        filters.append(Service.service_group_id == service_group_id)
+
+    if available_on:
+        if available_to is not None and available_to <= available_from:
+            raise HTTPException(status_code=400, detail="available_to must be after available_from")
+        if not in_horizon(available_on):
+            raise HTTPException(status_code=400, detail="available_on is outside the bookable horizon")
+        result = await db.execute(select(Service.pro_id).where(*filters).distinct())
+        filters.append(Service.pro_id.in_(free_pros(result.scalars().all(), available_on, available_from, available_to)))
+
+    query = select(*projection(Service, ServiceOut)).where(*filters)
+    items = await paginate(db, query, [Service.created_at, Service.id], page)
+    return TypedJSONResponse(Page[ServiceOut], items, headers=validators)
+
+@router.get("/search", response_model=list[ServiceSearchHit])
+async def search_public_services(
+        q: str = Query(..., min_length=1, max_length=200, description="Words, \"phrase\", or, -excluded"),
+        category_id: Optional[UUID] = Query(None),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        db: AsyncSession = Depends(get_async_db)
+):
+    return await search_services(db, q, limit, category_id=category_id)
 
-    return query.order_by(Service.created_at.desc()).all()
+@router.get("/{service_id}/similar", response_model=list[ServiceSimilar])
+async def get_similar_services(
+        service_id: UUID,
+        k: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+        db: AsyncSession = Depends(get_async_db)
+):
+    vector = service_index.get(service_id)
+    if vector is None:
+        # private/inactive services are not indexed but can still be compared to the public ones
+        result = await db.execute(select(Service.embedding).where(Service.id == service_id))
+        row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Service not found")
+        vector = embedding_vector(row.embedding)
+        if vector is None:
+            return []
+
+    hits = await similar_services(service_id, vector, k)
+    if not hits:
+        return []
+    result = await db.execute(select(Service).where(Service.id.in_([hit_id for hit_id, _ in hits])))
+    services = {service.id: service for service in result.scalars().all()}
+    # the index of this worker may lag a deletion made by another one
+    return [
+        ServiceSimilar(**ServiceOut.model_validate(services[hit_id]).model_dump(), score=score)
+        for hit_id, score in hits if hit_id in services
+    ]
 
 @router.post("/categories", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
-def create_category(data: CategoryCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_category(data: CategoryCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     if "admin" not in current_user.roles:
         raise HTTPException(status_code=403, detail="Only admins can create categories")
 
-    if db.query(ServiceCategory).filter(ServiceCategory.name == data.name).first():
+    result = await db.execute(select(ServiceCategory.id).where(ServiceCategory.name == data.name))
+    if result.first():
         raise HTTPException(status_code=400, detail="Category already exists")
 
-    category = ServiceCategory(name=data.name)
+    if data.parent_id and not await db.get(ServiceCategory, data.parent_id):
+        raise HTTPException(status_code=404, detail="Parent category not found")
+
+    category = ServiceCategory(name=data.name, parent_id=data.parent_id)
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    await db.flush()
+    await add_category_closure(db, category.id, data.parent_id)
+    await bump_collection_version(db, CATEGORIES)
+    await db.commit()
+    collection_versions.expire()
+    await db.refresh(category)
+    category_tree.invalidate()
     return category
 
-@router.get("/categories", response_model=list[CategoryOut])
-def list_categories(db: Session = Depends(get_db)):
-    return db.query(ServiceCategory).order_by(ServiceCategory.name).all()
\ No newline at end of file
+@router.get("/categories", response_model=list[CategoryTreeOut])
+async def list_categories(
+        validators: dict = Depends(conditional_get(CATEGORIES)),
+        db: AsyncSession = Depends(get_async_db)
+):
+    # the tree is cached already serialized, response_model only documents it
+    return Response(content=await category_tree.get_json(db, version=validators["ETag"]), media_type="application/json", headers=validators)
+
+# declared last: "/{service_id}" would otherwise shadow "/public", "/service-groups" and "/categories"
+@router.get("/{service_id}", response_model=ServiceOut)
+async def get_service(
+  service_id: UUID,
+  data: ServiceCreate,
+  db: AsyncSession = Depends(get_async_db),
+  current_user: Principal = Depends(get_current_user)
+):
+    result = await db.execute(select(Service).where(Service.id == service_id, Service.pro_id == current_user.id))
+    service = result.scalars().first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found for this id")
+
+    check_embedding(data)
+    for key, value in data.model_dump().items():
+        setattr(service, key, value)
+
+    await bump_collection_version(db, SERVICES)
+    await db.commit()
+    collection_versions.expire()
+    await db.refresh(service)
+    index_service(service)
+    return service
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db.database import get_db
+from app.db.database import get_async_db
+from app.db.loaders import loader_options
 from app.dependencies.auth import require_roles, get_current_user
+from app.core.principal_cache import Principal
+from app.services.auth import bump_token_version, forget_user_tokens
 from app.models.user import User, ProfileClient, ProfilePro
-from app.schemas.users import Address, UserRole, AddRoleRequest, RoleDeleteRequest, UserDetailsOut
+from app.schemas.users import Address, UserRole, AddRoleRequest, RoleDeleteRequest, UserDetailsOut, UserOut, ProfileClientOut, ProfileProOut
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams, page_params, paginate
+from app.utils.serialization import projection, projection_object, TypedJSONResponse
 
 
 
@@ -14,25 +21,27 @@ from app.schemas.users import Address, UserRole, AddRoleRequest, RoleDeleteReque
 router = APIRouter()
 
 @router.post("/{user_id}/deactivate", status_code=status.HTTP_204_NO_CONTENT)
-def deactivate_user(user_id: UUID, db: Session = Depends(get_db), current_admin: User = Depends(require_roles(["admin"]))):
-    user = db.query(User).filter(User.id == user_id).first()
+async def deactivate_user(user_id: UUID, db: AsyncSession = Depends(get_async_db), current_admin: Principal = Depends(require_roles(["admin"]))):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = False
-    db.commit()
+    token_version = await bump_token_version(db, user_id, revoke_refresh_tokens=True)
+    await db.commit()
+    forget_user_tokens(user_id, token_version)
     return
 
 
 @router.post("/{user_id}/add-role", status_code=200)
-def add_role(user_id: UUID, data: AddRoleRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def add_role(user_id: UUID, data: AddRoleRequest, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     if data.role in user.roles:
         raise HTTPException(status_code=400, detail="User already has this role")
 
-    user.roles.append(data.role)
+    user.roles = user.roles + [data.role]  # reassign so the ARRAY change is flagged for the flush
 
     if data.role == UserRole.pro:
         if not data.business_name:
@@ -53,18 +62,21 @@ def add_role(user_id: UUID, data: AddRoleRequest, db: Session = Depends(get_db),
         )
         db.add(profile)
 
-    db.commit()
+    # roles are carried by the access token: the user gets new ones through /auth/refresh
+    token_version = await bump_token_version(db, user_id)
+    await db.commit()
+    forget_user_tokens(user_id, token_version)
     return {"message": "Role added"}
 
 # peut etre devoir le changer en post ou patch si bug mobile delete dont accept body
 @router.delete("/{user_id}/role", status_code=204)
-def delete_role(
+async def delete_role(
     user_id: UUID,
     data: RoleDeleteRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -78,44 +90,63 @@ def delete_role(
 
     # Supprimer le profil concerné
     if data.role == UserRole.pro:
-        db.query(ProfilePro).filter(ProfilePro.user_id == user.id).delete()
+        await db.execute(delete(ProfilePro).where(ProfilePro.user_id == user.id))
     elif data.role == UserRole.client:
-        db.query(ProfileClient).filter(ProfileClient.user_id == user.id).delete()
+        await db.execute(delete(ProfileClient).where(ProfileClient.user_id == user.id))
     elif data.role == UserRole.admin:
         pass  # Pas de table associée pr l'instant, on supprime juste le rôle
 
     # Mettre à jour la liste des rôles
     user.roles = [r for r in user.roles if r != data.role]
 
+    token_version = await bump_token_version(db, user_id)
+
     # Si plus aucun rôle → supprimer entièrement le compte
     if not user.roles:
-        db.delete(user)
+        await db.delete(user)
 
-    db.commit()
+    await db.commit()
+    forget_user_tokens(user_id, token_version)
     return
 
 from fastapi import Query
 from typing import Optional
 
-@router.get("/", response_model=List[UserDetailsOut])
-def list_users(
+@router.get("/", response_model=Page[UserDetailsOut])
+async def list_users(
     role: Optional[str] = Query(None, description="Filter by role (client, pro, admin)"),
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(require_roles(["admin"]))
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(require_roles(["admin"]))
 ):
-    query = db.query(User)
+    # one query: the user columns plus each profile as a jsonb object through outer joins
+    query = (
+        select(
+            *projection(User, UserOut),
+            projection_object(ProfileClient, ProfileClientOut, "profile_client"),
+            projection_object(ProfilePro, ProfileProOut, "profile_pro"),
+        )
+        .outerjoin(ProfileClient, ProfileClient.user_id == User.id)
+        .outerjoin(ProfilePro, ProfilePro.user_id == User.id)
+    )
     if role:
-        query = query.filter(User.roles.any(role))  # PostgreSQL ARRAY filterin, fonctionne uniquement ac ARRAY(String) et pas JSONB.
-    return query.all()
+        query = query.where(User.roles.any(role))  # PostgreSQL ARRAY filterin, fonctionne uniquement ac ARRAY(String) et pas JSONB.
+    items = await paginate(db, query, [User.created_at, User.id], page)
+    return TypedJSONResponse(Page[UserDetailsOut], items)
 
 
 @router.get("/{user_id}", response_model=UserDetailsOut)
-def get_user(
+async def get_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(require_roles(["admin"]))
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(require_roles(["admin"]))
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(
+        select(User)
+        .options(*loader_options(User, UserDetailsOut))
+        .where(User.id == user_id)
+    )
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -0,0 +1,175 @@
+# app/core/availability_index.py
+
+from datetime import date
+from threading import RLock
+from typing import Hashable, Iterable
+
+import numpy as np
+
+from app.utils.bookings import MINUTES_PER_DAY
+
+BLOCK_MINUTES = 5
+BLOCKS_PER_DAY = MINUTES_PER_DAY // BLOCK_MINUTES  # 288
+BYTES_PER_DAY = BLOCKS_PER_DAY // 8  # 36, a day is a whole number of bytes
+
+
+def pack_minutes(free: np.ndarray) -> np.ndarray:
+    """
+    Flat per-minute free array of whole days (app.utils.bookings.free_minutes) -> (days, 36) packed
+    bits, a block being free only if all of its minutes are
+    """
+    blocks = free.reshape(-1, BLOCK_MINUTES).all(axis=1)
+    return np.packbits(blocks.reshape(-1, BLOCKS_PER_DAY), axis=1)
+
+
+def window_mask(first_block: int, end_block: int) -> np.ndarray:
+    """(36,) packed mask of the blocks [first_block, end_block) of a day"""
+    bits = np.zeros(BLOCKS_PER_DAY, dtype=bool)
+    bits[first_block:end_block] = True
+    return np.packbits(bits)
+
+
+class AvailabilityIndex:
+    """
+    Free/busy bitmap of every pro over a rolling horizon of days at 5-minute resolution: one bit
+    per block (set = free), 36 bytes per pro and day, in a (pros, days, 36) uint8 array.
+    Days are the pro's local dates and blocks its wall-clock times, like the slot engine.
+    "Who is free on this day over this window" is answered for all candidate pros at once:
+    AND of their day rows with the window mask, popcount, compared with the window size.
+    Unknown pros and days not filled yet count as busy.
+    """
+
+    def __init__(self, horizon_days: int, capacity: int = 1024):
+        self.horizon_days = horizon_days
+        self._lock = RLock()
+        self._origin: date | None = None  # date of day index 0
+        self._bits = np.zeros((capacity, horizon_days, BYTES_PER_DAY), dtype=np.uint8)
+        self._rows: dict = {}  # key -> row
+        self._spare_rows: list[int] = []  # rows of removed keys, reused first
+
+    @property
+    def origin(self) -> date | None:
+        return self._origin
+
+    # -- writes -------------------------------------------------------------------------------
+
+    def roll(self, origin: date) -> int:
+        """
+        Move the horizon to start at `origin`: past days are dropped and the new days are busy
+        until set_days() fills them. Returns the number of days that need filling.
+        """
+        with self._lock:
+            if self._origin is None:
+                self._origin = origin
+                return self.horizon_days
+            shift = (origin - self._origin).days
+            if shift == 0:
+                return 0
+            if abs(shift) >= self.horizon_days:
+                self._bits[:] = 0
+            elif shift > 0:
+                self._bits[:, :-shift] = self._bits[:, shift:]
+                self._bits[:, -shift:] = 0
+            else:
+                self._bits[:, -shift:] = self._bits[:, :shift]
+                self._bits[:, :-shift] = 0
+            self._origin = origin
+            return min(abs(shift), self.horizon_days)
+
+    def _row(self, key: Hashable) -> int:
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if self._spare_rows:
+            row = self._spare_rows.pop()
+        else:
+            row = len(self._rows)
+            if row == self._bits.shape[0]:
+                bits = np.zeros((2 * row, self.horizon_days, BYTES_PER_DAY), dtype=np.uint8)
+                bits[:row] = self._bits
+                self._bits = bits
+        self._bits[row] = 0
+        self._rows[key] = row
+        return row
+
+    def set_days(self, key: Hashable, first_day: date, bits: np.ndarray) -> None:
+        """Replace the (days, 36) packed bits of a pro from first_day, days outside the horizon are ignored"""
+        bits = np.asarray(bits, dtype=np.uint8).reshape(-1, BYTES_PER_DAY)
+        with self._lock:
+            if self._origin is None:
+                raise RuntimeError("roll() sets the horizon before any write")
+            start = (first_day - self._origin).days
+            first, end = max(start, 0), min(start + bits.shape[0], self.horizon_days)
+            row = self._row(key)
+            if first < end:
+                self._bits[row, first:end] = bits[first - start:end - start]
+
+    def mark_busy(self, key: Hashable, day: date, first_minute: int, end_minute: int) -> None:
+        """
+        Clear the blocks touching [first_minute, end_minute) of `day` (minutes may run past
+        midnight into the next days). Only clears, so it can't hide another booking.
+        """
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None or self._origin is None:
+                return
+            offset = (day - self._origin).days * BLOCKS_PER_DAY
+            total = self.horizon_days * BLOCKS_PER_DAY
+            first = min(max(offset + first_minute // BLOCK_MINUTES, 0), total)
+            end = min(max(offset - (-end_minute // BLOCK_MINUTES), 0), total)
+            if first >= end:
+                return
+            # days are whole bytes: the row flattened is the packing of the flat block array
+            flat = self._bits[row].reshape(-1)
+            lo, hi = first // 8, -(-end // 8)
+            blocks = np.unpackbits(flat[lo:hi])
+            blocks[first - 8 * lo:end - 8 * lo] = 0
+            flat[lo:hi] = np.packbits(blocks)
+
+    def remove(self, key: Hashable) -> bool:
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+            self._bits[row] = 0
+            self._spare_rows.append(row)
+            return True
+
+    # -- reads --------------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def keys(self) -> set:
+        with self._lock:
+            return set(self._rows)
+
+    def day_index(self, day: date) -> int | None:
+        if self._origin is None:
+            return None
+        index = (day - self._origin).days
+        return index if 0 <= index < self.horizon_days else None
+
+    def free_blocks(self, keys: Iterable[Hashable], day: date, first_block: int, end_block: int) -> dict:
+        """Number of free blocks of each known key in [first_block, end_block) of `day`"""
+        mask = window_mask(first_block, end_block)
+        with self._lock:
+            index = self.day_index(day)
+            known = [key for key in keys if key in self._rows]
+            if index is None or not known:
+                return {}
+            rows = np.fromiter((self._rows[key] for key in known), dtype=np.intp, count=len(known))
+            counts = np.bitwise_count(self._bits[rows, index] & mask).sum(axis=1, dtype=np.int64)
+        return dict(zip(known, counts.tolist()))
+
+    def free(self, keys: Iterable[Hashable], day: date, first_block: int, end_block: int) -> list:
+        """The keys free over the whole window [first_block, end_block) of `day`"""
+        size = max(min(end_block, BLOCKS_PER_DAY) - max(first_block, 0), 0)
+        return [key for key, count in self.free_blocks(keys, day, first_block, end_block).items() if count == size]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pros": len(self._rows), "days": self.horizon_days, "bytes": self._bits.nbytes}
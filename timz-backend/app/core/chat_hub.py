@@ -0,0 +1,121 @@
+# app/core/chat_hub.py
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Hashable
+
+from starlette import status
+
+SLOW_CONSUMER = status.WS_1013_TRY_AGAIN_LATER  # reconnect, then fetch the history it missed
+IDLE_TIMEOUT = status.WS_1001_GOING_AWAY
+
+
+class Connection:
+    """
+    One WebSocket of a user. Frames go through a bounded queue drained by the connection's
+    sender task: a publisher never waits on a socket. When the queue is full the connection
+    is dropped (close_code set, queue replaced by the None sentinel) rather than buffering
+    without bound or slowing the conversation down for everyone.
+    """
+
+    __slots__ = ("user_id", "queue", "conversations", "close_code", "last_seen")
+
+    def __init__(self, user_id: Hashable, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.conversations: dict = {}  # conversation id -> what the subscriber passed (e.g. the participants)
+        self.close_code: int | None = None
+        self.last_seen = time.monotonic()
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_seen
+
+    def offer(self, frame: str) -> bool:
+        """Queue a frame, False if the connection is (now) dropped"""
+        if self.close_code is not None:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.close(SLOW_CONSUMER)
+            return False
+
+    def close(self, code: int) -> None:
+        """Discard the pending frames and make the sender task close the socket"""
+        if self.close_code is not None:
+            return
+        self.close_code = code
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ChatHub:
+    """
+    In-process fan-out of chat frames, keyed by conversation id.
+    A frame is serialised once by the caller and queued on every connection subscribed to the
+    conversation; delivery to the sockets is up to each connection's sender task.
+    Subscriptions are per worker process: the participants of a conversation see each other
+    live when their connections are on the same worker.
+    Everything runs on the event loop, no locking.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._connections: set[Connection] = set()
+        self._subscribers: dict = defaultdict(set)  # conversation id -> connections
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0  # slow consumers
+
+    def connect(self, user_id: Hashable) -> Connection:
+        connection = Connection(user_id, self.queue_size)
+        self._connections.add(connection)
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        self._connections.discard(connection)
+        for conversation_id in list(connection.conversations):
+            self.unsubscribe(connection, conversation_id)
+
+    def subscribe(self, connection: Connection, conversation_id: Hashable, participants: Hashable = None) -> None:
+        connection.conversations[conversation_id] = participants
+        self._subscribers[conversation_id].add(connection)
+
+    def unsubscribe(self, connection: Connection, conversation_id: Hashable) -> None:
+        connection.conversations.pop(conversation_id, None)
+        subscribers = self._subscribers.get(conversation_id)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self._subscribers[conversation_id]
+
+    def publish(self, conversation_id: Hashable, frame: str) -> int:
+        """Queue a serialised frame for every subscriber, returns how many took it"""
+        self.published += 1
+        delivered = 0
+        for connection in list(self._subscribers.get(conversation_id, ())):
+            if connection.offer(frame):
+                delivered += 1
+            else:
+                self.dropped += 1
+                self.disconnect(connection)
+        self.delivered += delivered
+        return delivered
+
+    def subscribers(self, conversation_id: Hashable) -> int:
+        return len(self._subscribers.get(conversation_id, ()))
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._connections),
+            "conversations": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
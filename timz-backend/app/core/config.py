@@ -16,6 +16,70 @@ class Settings(BaseSettings):
     stripe_api_key: str = Field(..., alias="STRIPE_API_KEY")
     sendgrid_api_key: str = Field(..., alias="SENDGRID_API_KEY")
 
+    # Database: DB_ASYNC switches the routers between the asyncpg pool and the sync pool (threadpool)
+    db_async: bool = Field(True, alias="DB_ASYNC")
+    db_pool_size: int = Field(10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, alias="DB_MAX_OVERFLOW")
+
+    # In-process cache of the user fields checked by get_current_user
+    principal_cache_ttl_seconds: int = Field(60, alias="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_max_size: int = Field(10_000, alias="PRINCIPAL_CACHE_MAX_SIZE")
+
+    # Passwords: bcrypt cost and the process pool doing the hashing
+    bcrypt_rounds: int = Field(12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_queue_depth: int = Field(32, alias="PASSWORD_HASH_QUEUE_DEPTH")
+    password_hash_retry_after_seconds: int = Field(1, alias="PASSWORD_HASH_RETRY_AFTER_SECONDS")
+
+    # Category tree served by GET /services/categories, rebuilt locally on writes and after this TTL
+    category_tree_ttl_seconds: int = Field(60, alias="CATEGORY_TREE_TTL_SECONDS")
+
+    # Conditional GET on the public catalog: how long a worker trusts its copy of the collection
+    # versions, and how long a shared cache (CDN) may serve a response without revalidating
+    collection_version_ttl_seconds: float = Field(1.0, alias="COLLECTION_VERSION_TTL_SECONDS")
+    catalog_cdn_max_age_seconds: int = Field(30, alias="CATALOG_CDN_MAX_AGE_SECONDS")
+
+    # Embedding index (similar services): vector size, snapshot location ("" = no snapshot) and
+    # how often each worker catches up with changes made by the other ones
+    embedding_dim: int = Field(384, alias="EMBEDDING_DIM")
+    embedding_index_path: str = Field("", alias="EMBEDDING_INDEX_PATH")
+    embedding_index_sync_seconds: int = Field(60, alias="EMBEDDING_INDEX_SYNC_SECONDS")
+
+    # Availability index (free/busy bitmaps): how often each worker catches up with the bookings
+    # and calendars changed by the other ones
+    availability_sync_seconds: int = Field(30, alias="AVAILABILITY_SYNC_SECONDS")
+
+    # Chat (WebSocket): frames queued per connection before it is dropped as a slow consumer,
+    # server ping interval, and silence after which a connection is considered dead
+    chat_send_queue_size: int = Field(256, alias="CHAT_SEND_QUEUE_SIZE")
+    chat_heartbeat_seconds: float = Field(25, alias="CHAT_HEARTBEAT_SECONDS")
+    chat_idle_timeout_seconds: float = Field(60, alias="CHAT_IDLE_TIMEOUT_SECONDS")
+    chat_max_message_length: int = Field(4000, alias="CHAT_MAX_MESSAGE_LENGTH")
+    # Chat messages are written in batches: every CHAT_FLUSH_INTERVAL_MS or as soon as
+    # CHAT_FLUSH_MAX_MESSAGES wait, and at most CHAT_WRITE_QUEUE_SIZE wait per worker
+    chat_flush_interval_ms: float = Field(5, alias="CHAT_FLUSH_INTERVAL_MS")
+    chat_flush_max_messages: int = Field(500, alias="CHAT_FLUSH_MAX_MESSAGES")
+    chat_write_queue_size: int = Field(10_000, alias="CHAT_WRITE_QUEUE_SIZE")
+
+    # Notification emails: transport ("sendgrid", or "fake" to keep them in memory), sender,
+    # connections of the pooled HTTP client, and the dispatcher: rows claimed per batch, polling
+    # interval, how long a claim lasts before another worker may retry it, and the retry backoff
+    # (doubling from NOTIFICATION_BACKOFF_SECONDS up to NOTIFICATION_BACKOFF_MAX_SECONDS)
+    notification_transport: str = Field("sendgrid", alias="NOTIFICATION_TRANSPORT")
+    notification_sender: str = Field("no-reply@timz.app", alias="NOTIFICATION_SENDER")
+    notification_http_connections: int = Field(10, alias="NOTIFICATION_HTTP_CONNECTIONS")
+    notification_http_timeout_seconds: float = Field(10, alias="NOTIFICATION_HTTP_TIMEOUT_SECONDS")
+    notification_batch_size: int = Field(200, alias="NOTIFICATION_BATCH_SIZE")
+    notification_poll_seconds: float = Field(2, alias="NOTIFICATION_POLL_SECONDS")
+    notification_lease_seconds: int = Field(120, alias="NOTIFICATION_LEASE_SECONDS")
+    notification_max_attempts: int = Field(8, alias="NOTIFICATION_MAX_ATTEMPTS")
+    notification_backoff_seconds: float = Field(30, alias="NOTIFICATION_BACKOFF_SECONDS")
+    notification_backoff_max_seconds: float = Field(3600, alias="NOTIFICATION_BACKOFF_MAX_SECONDS")
+
+    # Request metrics: a statement (same fingerprint) run this many times in one request is
+    # reported as a probable N+1
+    n_plus_one_threshold: int = Field(5, alias="N_PLUS_ONE_THRESHOLD")
+
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env.dev"),
         case_sensitive=True
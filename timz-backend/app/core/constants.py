@@ -1,9 +1,10 @@
 # app/core/constants.py
 
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
+ACCESS_TOKEN_EXPIRE_MINUTES = 15  # short-lived, renewed through /auth/refresh
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 
 TOKEN_ALGORITHM = "HS256"
+TOKEN_ISSUER = "timz-api"
 
 ROLES = {
     "client": "client",
@@ -18,3 +19,10 @@ BOOKING_STATUSES = [
     "refused",
     "completed"
 ]
+ACTIVE_BOOKING_STATUSES = ["pending", "confirmed"]  # hold their time slot
+
+DEFAULT_SLOT_WINDOW_DAYS = 14
+MAX_SLOT_WINDOW_DAYS = 92  # availability requests span at most about a quarter
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100  # list endpoints reject larger pages
@@ -0,0 +1,251 @@
+# app/core/embedding_index.py
+
+import os
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Hashable, Iterable
+
+import numpy as np
+
+SEARCH_CHUNK_ROWS = 65_536  # rows scored per matmul, bounds the temporary score matrix
+
+
+class EmbeddingIndex:
+    """
+    Exact top-k cosine search over a contiguous float32 matrix.
+    Vectors are L2-normalised once when added, so a query is a single matmul per chunk of rows
+    (several queries are scored together in the same matmul).
+    Rows live in two segments:
+    - base: the last snapshot, memory-mapped read-only (its pages are shared by every worker
+      process loading the same file)
+    - delta: rows added since, in an in-memory array grown by doubling
+    A removed or replaced key only clears its alive flag (tombstone); compact() rewrites the
+    live rows once tombstones pile up, and save() writes a new snapshot.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._lock = RLock()
+        self._base = np.empty((0, dim), dtype=np.float32)
+        self._delta = np.empty((capacity, dim), dtype=np.float32)
+        self._delta_size = 0
+        self._keys: list = []  # row -> key, over base then delta rows
+        self._rows: dict = {}  # live key -> row
+        self._alive = np.zeros(capacity, dtype=bool)
+
+    # -- writes -------------------------------------------------------------------------------
+
+    def _normalize(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got shape {vectors.shape}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        if not np.all(norms > 0):
+            raise ValueError("Cannot index a zero vector")
+        return vectors / norms
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._delta_size + extra
+        if needed > self._delta.shape[0]:
+            capacity = max(needed, 2 * self._delta.shape[0])
+            delta = np.empty((capacity, self.dim), dtype=np.float32)
+            delta[:self._delta_size] = self._delta[:self._delta_size]
+            self._delta = delta
+        total = self._base.shape[0] + needed
+        if total > self._alive.shape[0]:
+            alive = np.zeros(max(total, 2 * self._alive.shape[0]), dtype=bool)
+            alive[:self._alive.shape[0]] = self._alive
+            self._alive = alive
+
+    def add_many(self, keys: list[Hashable], vectors) -> None:
+        """Insert or replace vectors (a replaced key is tombstoned and appended again)"""
+        vectors = self._normalize(vectors)
+        if len(keys) != vectors.shape[0]:
+            raise ValueError("keys and vectors have different lengths")
+        with self._lock:
+            for key in keys:
+                self._tombstone(key)
+            self._reserve(len(keys))
+            start = self._delta_size
+            self._delta[start:start + len(keys)] = vectors
+            self._delta_size += len(keys)
+            first_row = self._base.shape[0] + start
+            for offset, key in enumerate(keys):
+                row = first_row + offset
+                if key in self._rows:  # duplicate key inside the batch: the last one wins
+                    self._alive[self._rows[key]] = False
+                self._keys.append(key)
+                self._rows[key] = row
+                self._alive[row] = True
+
+    def add(self, key: Hashable, vector) -> None:
+        self.add_many([key], vector)
+
+    def _tombstone(self, key: Hashable) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        return True
+
+    def remove(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._tombstone(key)
+
+    # -- reads --------------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def keys(self) -> set:
+        with self._lock:
+            return set(self._rows)
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        base_rows = self._base.shape[0]
+        return self._base[row] if row < base_rows else self._delta[row - base_rows]
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        """Normalised vector of a key (a copy)"""
+        with self._lock:
+            row = self._rows.get(key)
+            return None if row is None else np.array(self._row_vector(row))
+
+    def _segments(self):
+        base_rows = self._base.shape[0]
+        yield 0, self._base
+        yield base_rows, self._delta[:self._delta_size]
+
+    def search(self, queries, k: int, exclude: Iterable[Hashable] = ()) -> list[list[tuple[Hashable, float]]]:
+        """
+        Top-k (key, cosine similarity) for each query vector, best first.
+        Keys in exclude are never returned (e.g. the item the query vector comes from).
+        """
+        queries = self._normalize(queries)
+        exclude = set(exclude)
+        with self._lock:
+            if not self._rows or k <= 0:
+                return [[] for _ in range(queries.shape[0])]
+            wanted = min(k + len(exclude), len(self._rows))
+            best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+            best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+
+            for offset, segment in self._segments():
+                for start in range(0, segment.shape[0], SEARCH_CHUNK_ROWS):
+                    chunk = segment[start:start + SEARCH_CHUNK_ROWS]
+                    first_row = offset + start
+                    scores = queries @ chunk.T  # (queries, rows)
+                    scores[:, ~self._alive[first_row:first_row + chunk.shape[0]]] = -np.inf
+                    take = min(wanted, chunk.shape[0])
+                    top = np.argpartition(scores, -take, axis=1)[:, -take:]
+                    best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+                    best_rows = np.concatenate([best_rows, top + first_row], axis=1)
+                    # keep the candidate matrix at `wanted` columns
+                    if best_scores.shape[1] > wanted:
+                        keep = np.argpartition(best_scores, -wanted, axis=1)[:, -wanted:]
+                        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                        best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+            order = np.argsort(-best_scores, axis=1)
+            results = []
+            for scores, rows in zip(np.take_along_axis(best_scores, order, axis=1),
+                                    np.take_along_axis(best_rows, order, axis=1)):
+                hits = []
+                for score, row in zip(scores, rows):
+                    if score == -np.inf:
+                        break
+                    key = self._keys[row]
+                    if key in exclude:
+                        continue
+                    hits.append((key, float(score)))
+                    if len(hits) == k:
+                        break
+                results.append(hits)
+            return results
+
+    # -- maintenance --------------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._base.shape[0] + self._delta_size
+            return {
+                "live": len(self._rows),
+                "rows": rows,
+                "tombstones": rows - len(self._rows),
+                "snapshot_rows": self._base.shape[0],
+            }
+
+    def compact(self, max_tombstone_ratio: float = 0.25) -> bool:
+        """Rewrite the live rows into a fresh delta segment once too many rows are dead"""
+        with self._lock:
+            rows = self._base.shape[0] + self._delta_size
+            if not rows or (rows - len(self._rows)) / rows <= max_tombstone_ratio:
+                return False
+            keys = list(self._rows)
+            vectors = np.empty((len(keys), self.dim), dtype=np.float32)
+            for i, key in enumerate(keys):
+                vectors[i] = self._row_vector(self._rows[key])
+            self._reset(np.empty((0, self.dim), dtype=np.float32), [])
+            self._reserve(len(keys))
+            self._delta[:len(keys)] = vectors
+            self._delta_size = len(keys)
+            self._keys = keys
+            self._rows = {key: row for row, key in enumerate(keys)}
+            self._alive[:len(keys)] = True
+            return True
+
+    def _reset(self, base: np.ndarray, keys: list) -> None:
+        self._base = base
+        self._delta = np.empty((1024, self.dim), dtype=np.float32)
+        self._delta_size = 0
+        self._keys = list(keys)
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._alive = np.zeros(max(len(keys), 1024), dtype=bool)
+        self._alive[:len(keys)] = True
+
+    def save(self, path: str | Path) -> int:
+        """
+        Write the live rows as a snapshot: <path>.keys.npy then <path>.vectors.npy, each through a
+        temporary file and an atomic rename. load() checks both files have the same row count.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        keys_path, vectors_path = _snapshot_paths(path)
+        with self._lock:
+            keys = list(self._rows)
+            tmp_vectors = vectors_path.with_suffix(".tmp.npy")
+            out = np.lib.format.open_memmap(tmp_vectors, mode="w+", dtype=np.float32, shape=(len(keys), self.dim))
+            for i, key in enumerate(keys):
+                out[i] = self._row_vector(self._rows[key])
+            out.flush()
+            del out
+        tmp_keys = keys_path.with_suffix(".tmp.npy")
+        np.save(tmp_keys, np.array([str(key) for key in keys], dtype=str))
+        os.replace(tmp_keys, keys_path)
+        os.replace(tmp_vectors, vectors_path)
+        return len(keys)
+
+    def load(self, path: str | Path, parse_key: Callable[[str], Hashable] = str) -> float | None:
+        """
+        Replace the content by a snapshot, memory-mapped read-only.
+        Returns the time the snapshot was written, None if there is no valid one.
+        """
+        keys_path, vectors_path = _snapshot_paths(Path(path))
+        if not keys_path.exists() or not vectors_path.exists():
+            return None
+        vectors = np.load(vectors_path, mmap_mode="r")
+        keys = [parse_key(key) for key in np.load(keys_path)]
+        if vectors.ndim != 2 or vectors.shape != (len(keys), self.dim) or vectors.dtype != np.float32:
+            return None  # interrupted save or a different model dimension: rebuild instead
+        with self._lock:
+            self._reset(vectors, keys)
+        return vectors_path.stat().st_mtime
+
+
+def _snapshot_paths(path: Path) -> tuple[Path, Path]:
+    return path.with_name(path.name + ".keys.npy"), path.with_name(path.name + ".vectors.npy")
@@ -0,0 +1,124 @@
+# app/core/mail.py
+
+import logging
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_URL = "https://api.sendgrid.com"
+
+
+@dataclass(frozen=True, slots=True)
+class Email:
+    to: str
+    subject: str
+    text: str
+
+
+class DeliveryError(Exception):
+    """A send that failed; retryable unless the provider rejected the email itself"""
+
+    def __init__(self, detail: str, retryable: bool = True):
+        super().__init__(detail)
+        self.retryable = retryable
+
+
+class MailTransport:
+    """How emails leave the app. send() raises DeliveryError when the email was not accepted."""
+
+    async def send(self, email: Email) -> None:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class SendGridTransport(MailTransport):
+    """
+    SendGrid v3 mail/send over one pooled HTTP/1.1 client: keep-alive connections are reused
+    across sends, at most max_connections at once (the extra sends wait for a free one).
+    The client is made on first use, in the event loop that sends. http_transport replaces the
+    network (e.g. httpx.MockTransport).
+    """
+
+    def __init__(
+        self, api_key: str, sender: str, max_connections: int, timeout: float, base_url: str = SENDGRID_URL,
+        http_transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_key = api_key
+        self.sender = sender
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.base_url = base_url
+        self.http_transport = http_transport
+        self._client: httpx.AsyncClient | None = None
+        self.requests = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=self.timeout,
+                transport=self.http_transport,
+            )
+        return self._client
+
+    async def send(self, email: Email) -> None:
+        self.requests += 1
+        try:
+            response = await self._get_client().post("/v3/mail/send", json={
+                "personalizations": [{"to": [{"email": email.to}]}],
+                "from": {"email": self.sender},
+                "subject": email.subject,
+                "content": [{"type": "text/plain", "value": email.text}],
+            })
+        except httpx.HTTPError as e:
+            raise DeliveryError(f"{type(e).__name__}: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise DeliveryError(f"SendGrid {response.status_code}")
+        if response.status_code >= 400:
+            raise DeliveryError(f"SendGrid {response.status_code}: {response.text[:500]}", retryable=False)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {"requests": self.requests}
+
+
+class FakeTransport(MailTransport):
+    """Keeps the emails in memory (and logs them) instead of sending; for tests and local runs"""
+
+    def __init__(self):
+        self.sent: list[Email] = []
+        self._failures: list[DeliveryError] = []
+
+    def fail_next(self, *errors: DeliveryError) -> None:
+        """The next sends raise these, in order"""
+        self._failures.extend(errors)
+
+    async def send(self, email: Email) -> None:
+        if self._failures:
+            raise self._failures.pop(0)
+        logger.info("Email to %s: %s", email.to, email.subject)
+        self.sent.append(email)
+
+    def stats(self) -> dict:
+        return {"requests": len(self.sent)}
+
+
+def make_transport(name: str, api_key: str, sender: str, max_connections: int, timeout: float) -> MailTransport:
+    if name == "sendgrid":
+        return SendGridTransport(api_key, sender, max_connections, timeout)
+    if name == "fake":
+        return FakeTransport()
+    raise ValueError(f"Unknown mail transport {name!r}")
@@ -0,0 +1,84 @@
+# app/core/principal_cache.py
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Compact, immutable view of the user row needed to authorize a request"""
+    id: UUID
+    roles: tuple[str, ...]
+    is_active: bool
+    token_version: int
+
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU cache of principals keyed by user id.
+    Writers (logout, deactivate, role changes) call invalidate() after their commit. A reader that
+    missed takes generation() before querying the DB and passes it to put(): if an invalidation
+    happened in between, the row it read may be stale and is not cached.
+    Invalidation is per process: other workers pick up the change when their entry expires (TTL).
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._lock = Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: UUID) -> Principal | None:
+        with self._lock:
+            principal = self._cache.get(user_id)
+            if principal is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return principal
+
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, principal: Principal, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._cache[principal.id] = principal
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._cache.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_max_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
@@ -0,0 +1,107 @@
+# app/core/request_metrics.py
+
+import logging
+import time
+from threading import Lock
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    BYTES_BUCKETS, COUNT_BUCKETS, SECONDS_BUCKETS, CallbackMetric, Counter, Histogram, registry,
+)
+from app.db.instrumentation import RequestStats, current_request_stats
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"  # 404s and mounts (static files): one label instead of one per path
+LABELS = ("method", "route")
+
+request_duration = registry.register(Histogram(
+    "timz_request_duration_seconds", "Time to serve a request", SECONDS_BUCKETS, LABELS))
+request_statements = registry.register(Histogram(
+    "timz_request_db_statements", "SQL statements sent by a request", COUNT_BUCKETS, LABELS))
+request_db_time = registry.register(Histogram(
+    "timz_request_db_seconds", "Time spent executing SQL statements in a request", SECONDS_BUCKETS, LABELS))
+request_pool_wait = registry.register(Histogram(
+    "timz_request_pool_wait_seconds", "Time a request waited to check out DB connections", SECONDS_BUCKETS, LABELS))
+response_size = registry.register(Histogram(
+    "timz_response_size_bytes", "Size of the response body", BYTES_BUCKETS, LABELS))
+n_plus_one = registry.register(Counter(
+    "timz_n_plus_one_total",
+    f"Requests running a statement at least {settings.n_plus_one_threshold} times",
+    LABELS + ("statement",),
+))
+
+_slowest_lock = Lock()
+_slowest: dict[tuple, tuple[float, str]] = {}  # (method, route) -> (seconds, fingerprint)
+
+
+def _record_slowest(labels: tuple, stats: RequestStats) -> None:
+    if stats.slowest_statement is None:
+        return
+    with _slowest_lock:
+        current = _slowest.get(labels)
+        if current is None or stats.slowest_seconds > current[0]:
+            _slowest[labels] = (stats.slowest_seconds, stats.slowest_statement)
+
+
+def _slowest_samples() -> dict:
+    with _slowest_lock:
+        return {labels + (statement,): seconds for labels, (seconds, statement) in _slowest.items()}
+
+
+registry.register(CallbackMetric(
+    "timz_route_slowest_statement_seconds",
+    "Slowest statement seen on a route since the process started, with its fingerprint",
+    "gauge", _slowest_samples, LABELS + ("statement",),
+))
+
+
+def record_request(labels: tuple, stats: RequestStats, seconds: float, size: int) -> None:
+    request_duration.observe(seconds, *labels)
+    request_statements.observe(stats.statements, *labels)
+    request_db_time.observe(stats.db_seconds, *labels)
+    request_pool_wait.observe(stats.pool_wait_seconds, *labels)
+    response_size.observe(size, *labels)
+    _record_slowest(labels, stats)
+
+    for statement, count in stats.fingerprints.items():
+        if count >= settings.n_plus_one_threshold:
+            n_plus_one.inc(*labels, statement)
+            logger.warning("Probable N+1 on %s %s: %d x %s", *labels, count, statement)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records, per method and route template, the duration, SQL statements, DB time, pool wait and
+    response size of every HTTP request.
+    Pure ASGI (not BaseHTTPMiddleware): it sees the body chunks of streaming responses, and the
+    route FastAPI matched is read back from the scope once the app returns.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        size = 0
+
+        async def send_counting(message):
+            nonlocal size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            record_request(labels, stats, time.perf_counter() - started, size)
@@ -0,0 +1,77 @@
+# app/core/revocation.py
+
+import heapq
+import time
+from threading import Lock
+from uuid import UUID
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class RevocationSet:
+    """
+    In-memory set of revoked access tokens, so validating an access token needs no DB read.
+    Two kinds of entries:
+    - session ids (the refresh-token family a token was issued from), revoked on refresh-token reuse
+    - per-user token_version floors, set on logout/deactivation/role changes: any access token
+      carrying an older token_version is rejected
+    An entry only has to live as long as the access tokens it targets, so each one expires after
+    the access-token lifetime and is pruned from a heap ordered by expiry.
+    The set is per process: the short access-token lifetime bounds what another worker can miss.
+    """
+
+    def __init__(self, ttl_seconds: float, timer=time.time):
+        self.ttl_seconds = ttl_seconds
+        self._timer = timer
+        self._lock = Lock()
+        self._sessions: dict[str, float] = {}
+        self._user_floors: dict[str, tuple[int, float]] = {}
+        self._expiries: list[tuple[float, str, str]] = []  # (expires_at, kind, key)
+
+    def _prune(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, kind, key = heapq.heappop(self._expiries)
+            entries = self._sessions if kind == "session" else self._user_floors
+            current = entries.get(key)
+            # the key may have been revoked again later with a further expiry
+            if current is not None and (current if kind == "session" else current[1]) <= now:
+                del entries[key]
+
+    def revoke_session(self, session_id: UUID | str) -> None:
+        with self._lock:
+            now = self._timer()
+            expires_at = now + self.ttl_seconds
+            key = str(session_id)
+            self._sessions[key] = expires_at
+            heapq.heappush(self._expiries, (expires_at, "session", key))
+            self._prune(now)
+
+    def revoke_user(self, user_id: UUID | str, min_token_version: int) -> None:
+        with self._lock:
+            now = self._timer()
+            expires_at = now + self.ttl_seconds
+            key = str(user_id)
+            previous = self._user_floors.get(key)
+            if previous is not None:
+                min_token_version = max(min_token_version, previous[0])
+            self._user_floors[key] = (min_token_version, expires_at)
+            heapq.heappush(self._expiries, (expires_at, "user", key))
+            self._prune(now)
+
+    def is_revoked(self, payload: dict) -> bool:
+        with self._lock:
+            self._prune(self._timer())
+            session_id = payload.get("sid")
+            if session_id is not None and session_id in self._sessions:
+                return True
+            floor = self._user_floors.get(payload.get("sub"))
+            return floor is not None and payload.get("token_version", 0) < floor[0]
+
+    def __len__(self) -> int:
+        return len(self._sessions) + len(self._user_floors)
+
+
+# entries outlive the tokens they target by a minute to absorb clock skew
+revocation_set = RevocationSet(ttl_seconds=settings.access_token_expire_minutes * 60 + 60)
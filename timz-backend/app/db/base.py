@@ -1,5 +1,7 @@
 from app.models.user import User
-# from app.models.booking import Booking
-# from app.models.chat import Chat
+from app.models.auth import RefreshToken
+from app.models.booking import Booking, Calendar
+from app.models.chat import Conversation, ChatMessage
+from app.models.notification import Notification
 # from app.models.payment import Payment
 # from app.models.professional import Professional
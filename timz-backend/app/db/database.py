@@ -1,8 +1,15 @@
 # app/db/database.py
 
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from starlette.concurrency import run_in_threadpool
 from app.core.config import get_settings
+from app.db.instrumentation import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
 
 settings = get_settings()
 
@@ -12,9 +19,11 @@ engine = create_engine(
     echo=False,
     future=True,
     pool_pre_ping=True,         # prevent broken connections
-    pool_size=10,               # default varies per DB
-    max_overflow=20,            # additional connections
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    poolclass=TimedQueuePool,
 )
+instrument_engine(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -24,6 +33,34 @@ SessionLocal = sessionmaker(
     future=True
 )
 
+
+def to_async_url(database_url: str) -> str:
+    """Rewrite a sync postgres URL (psycopg2) to its asyncpg equivalent"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine, only built when DB_ASYNC is on so the sync mode doesn't need asyncpg installed
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    async_engine = create_async_engine(
+        to_async_url(settings.database_url),
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        poolclass=TimedAsyncAdaptedQueuePool,
+    )
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,  # attributes are read after commit, a reload would need IO
+    )
+
 # Base for declarative models
 Base = declarative_base()
 
@@ -35,3 +72,89 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+class SyncSessionAdapter:
+    """
+    Exposes the AsyncSession API on top of a sync Session.
+    Every call doing IO is run in Starlette's threadpool, so the async routers keep a single
+    code path and DB_ASYNC=false behaves like the historical sync handlers (one thread per query).
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+# Async dependency used by the routers, the backend is selected by DB_ASYNC
+async def get_async_db() -> AsyncSession:
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    async with _sync_session_slots():
+        db = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+_session_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _sync_session_slots() -> asyncio.Semaphore:
+    """
+    At most one sync session per pooled connection. A session keeps its connection between two
+    threadpool calls: without this, a burst of requests fills the threadpool with threads blocked
+    on pool checkout while the sessions holding the connections wait for a thread (pool timeout).
+    One semaphore per event loop, asyncio primitives are bound to the loop they first wait on.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _session_slots.get(loop)
+    if slots is None:
+        slots = _session_slots[loop] = asyncio.Semaphore(settings.db_pool_size + settings.db_max_overflow)
+    return slots
+
+
+# The same session outside of a request (lifespan, background tasks)
+db_session = asynccontextmanager(get_async_db)
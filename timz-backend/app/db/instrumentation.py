@@ -0,0 +1,96 @@
+# app/db/instrumentation.py
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|\$\d+|\?")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Statement with placeholders and literals replaced by ?, and IN/VALUES lists folded, so the
+    same query issued with other parameters (or another number of them) has the same fingerprint
+    """
+    statement = _PLACEHOLDERS.sub("?", statement)
+    statement = _LITERALS.sub("?", statement)
+    statement = _VALUE_LISTS.sub("(...)", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+@dataclass
+class RequestStats:
+    """SQL activity of the current request, filled by the engine and pool hooks"""
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        key = fingerprint(statement)
+        self.statements += 1
+        self.db_seconds += seconds
+        self.fingerprints[key] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = key
+
+
+# set by the request metrics middleware; the threadpool (DB_ASYNC=false) and SQLAlchemy's greenlets
+# (asyncpg) both run with a copy of the request's context, which holds the same RequestStats
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+class _TimedCheckout:
+    """Adds the time spent waiting for a connection (or opening one) to the current request"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.pool_wait_seconds += time.perf_counter() - started
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.record_statement(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement of a (sync) engine; for an AsyncEngine pass engine.sync_engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
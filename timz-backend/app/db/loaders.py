@@ -0,0 +1,48 @@
+# app/db/loaders.py
+
+from functools import lru_cache
+from typing import get_args
+
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+
+def _nested_schema(annotation) -> type[BaseModel] | None:
+    """The schema inside Optional[X], List[X], list[X]... or None for a plain field"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = _nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def _relationship_loaders(model, schema: type[BaseModel]) -> list:
+    relationships = model.__mapper__.relationships
+    options = []
+    for name, field in schema.model_fields.items():
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        attr = getattr(model, name)
+        # to-one: joined into the same row, no fan-out; collections: one IN query per level
+        loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+        nested = _nested_schema(field.annotation)
+        if nested is not None:
+            loader = loader.options(*_relationship_loaders(relationship.mapper.class_, nested))
+        options.append(loader)
+    options.append(raiseload("*"))
+    return options
+
+
+@lru_cache(maxsize=None)
+def loader_options(model, schema: type[BaseModel]) -> tuple:
+    """
+    Eager-loading options reading exactly the relationships a response schema serializes:
+    joinedload for one-to-one/many-to-one, selectinload for collections, recursively.
+    Every other relationship is raiseload: touching it while serializing raises instead of
+    issuing one lazy query per row, so the query count of an endpoint does not depend on the
+    size of its result.
+    """
+    return tuple(_relationship_loaders(model, schema))
@@ -0,0 +1,36 @@
+"""Keyset pagination indexes
+
+Revision ID: 6c1f2a9d4e83
+Revises: 015087d68253
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1f2a9d4e83'
+down_revision: Union[str, None] = '015087d68253'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_services_public_created_at_id', 'services', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_active AND is_public'))
+    op.create_index('ix_services_pro_id_created_at_id', 'services', ['pro_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_services_category_id_created_at_id', 'services', ['category_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_services_service_group_id_created_at_id', 'services', ['service_group_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_service_groups_pro_id_position_id', 'service_groups', ['pro_id', 'position', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_service_groups_pro_id_position_id', table_name='service_groups')
+    op.drop_index('ix_services_service_group_id_created_at_id', table_name='services')
+    op.drop_index('ix_services_category_id_created_at_id', table_name='services')
+    op.drop_index('ix_services_pro_id_created_at_id', table_name='services')
+    op.drop_index('ix_services_public_created_at_id', table_name='services', postgresql_where=sa.text('is_active AND is_public'))
@@ -0,0 +1,54 @@
+"""Services full-text search vector
+
+Revision ID: 9a4d7c2b1f05
+Revises: 6c1f2a9d4e83
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d7c2b1f05'
+down_revision: Union[str, None] = '6c1f2a9d4e83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keywords is declared on the model but was never created by the initial migration
+    op.execute("ALTER TABLE services ADD COLUMN IF NOT EXISTS keywords VARCHAR[]")
+    op.execute("ALTER TABLE services ADD COLUMN IF NOT EXISTS search_vector TSVECTOR")
+    op.execute("""
+    CREATE OR REPLACE FUNCTION services_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('french', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('french', coalesce(array_to_string(NEW.keywords, ' '), '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(array_to_string(NEW.keywords, ' '), '')), 'B') ||
+            setweight(to_tsvector('french', coalesce(NEW.description, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS services_search_vector ON services")
+    op.execute("""
+    CREATE TRIGGER services_search_vector
+    BEFORE INSERT OR UPDATE OF title, keywords, description ON services
+    FOR EACH ROW EXECUTE FUNCTION services_search_vector_update()
+    """)
+    # backfill existing rows through the trigger
+    op.execute("UPDATE services SET title = title")
+    op.create_index('ix_services_search_vector', 'services', ['search_vector'], unique=False, postgresql_using='gin', if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_services_search_vector', table_name='services', postgresql_using='gin')
+    op.execute("DROP TRIGGER IF EXISTS services_search_vector ON services")
+    op.execute("DROP FUNCTION IF EXISTS services_search_vector_update()")
+    op.drop_column('services', 'search_vector')
@@ -0,0 +1,51 @@
+"""Category closure table
+
+Revision ID: b3e8f1a6c2d4
+Revises: 9a4d7c2b1f05
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8f1a6c2d4'
+down_revision: Union[str, None] = '9a4d7c2b1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # declared on the model but never created by the initial migration
+    op.execute("ALTER TABLE services_categories ADD COLUMN IF NOT EXISTS parent_id UUID REFERENCES services_categories (id)")
+    op.execute("ALTER TABLE services_categories ADD COLUMN IF NOT EXISTS search_tags VARCHAR[]")
+
+    op.create_table('services_categories_closure',
+    sa.Column('ancestor_id', sa.Uuid(), nullable=False),
+    sa.Column('descendant_id', sa.Uuid(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['services_categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['services_categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_services_categories_closure_descendant_id', 'services_categories_closure', ['descendant_id'], unique=False)
+
+    # backfill from the existing parent_id links
+    op.execute("""
+    INSERT INTO services_categories_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree AS (
+        SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM services_categories
+        UNION ALL
+        SELECT tree.ancestor_id, c.id, tree.depth + 1
+        FROM tree JOIN services_categories c ON c.parent_id = tree.descendant_id
+    )
+    SELECT ancestor_id, descendant_id, depth FROM tree
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_services_categories_closure_descendant_id', table_name='services_categories_closure')
+    op.drop_table('services_categories_closure')
@@ -0,0 +1,45 @@
+"""Notifications, doubling as the outbox of their email delivery
+
+Revision ID: b3e9a1d7c452
+Revises: c8d5f3b2a617
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9a1d7c452'
+down_revision: Union[str, None] = 'c8d5f3b2a617'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notifications',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('delivery_status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_notifications_due', 'notifications', ['next_attempt_at'], unique=False,
+                    postgresql_where=sa.text("delivery_status = 'pending'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_due', table_name='notifications', postgresql_where=sa.text("delivery_status = 'pending'"))
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications')
+    op.drop_table('notifications')
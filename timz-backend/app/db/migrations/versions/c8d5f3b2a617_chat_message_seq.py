@@ -0,0 +1,63 @@
+"""Per-conversation message seq and unread counters
+
+Revision ID: c8d5f3b2a617
+Revises: a2c7e4f19b38
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d5f3b2a617'
+down_revision: Union[str, None] = 'a2c7e4f19b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('last_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+    op.add_column('conversations', sa.Column('client_unread', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('pro_unread', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('client_last_read_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('pro_last_read_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('chat_messages', sa.Column('seq', sa.BigInteger(), nullable=True))
+
+    # existing messages are numbered in their creation order and count as read
+    op.execute("""
+        UPDATE chat_messages m SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY conversation_id ORDER BY created_at, id) AS seq
+            FROM chat_messages
+        ) numbered
+        WHERE m.id = numbered.id
+    """)
+    op.execute("""
+        UPDATE conversations c SET last_seq = last.seq, client_last_read_seq = last.seq, pro_last_read_seq = last.seq,
+            last_message_at = last.created_at
+        FROM (
+            SELECT conversation_id, max(seq) AS seq, max(created_at) AS created_at FROM chat_messages GROUP BY conversation_id
+        ) last
+        WHERE c.id = last.conversation_id
+    """)
+    op.alter_column('chat_messages', 'seq', nullable=False)
+
+    op.drop_index('ix_chat_messages_conversation_id_created_at_id', table_name='chat_messages')
+    op.create_index('ix_chat_messages_conversation_id_seq', 'chat_messages', ['conversation_id', 'seq'], unique=True,
+                    postgresql_include=['id', 'sender_id', 'receiver_id', 'status', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_conversation_id_seq', table_name='chat_messages')
+    op.create_index('ix_chat_messages_conversation_id_created_at_id', 'chat_messages', ['conversation_id', 'created_at', 'id'], unique=False)
+    op.drop_column('chat_messages', 'seq')
+    op.drop_column('conversations', 'pro_last_read_seq')
+    op.drop_column('conversations', 'client_last_read_seq')
+    op.drop_column('conversations', 'pro_unread')
+    op.drop_column('conversations', 'client_unread')
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'last_seq')
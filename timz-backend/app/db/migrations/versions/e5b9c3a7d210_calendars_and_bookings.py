@@ -0,0 +1,60 @@
+"""Calendars and bookings
+
+Revision ID: e5b9c3a7d210
+Revises: d71c4e0b9a52
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9c3a7d210'
+down_revision: Union[str, None] = 'd71c4e0b9a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('calendars',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('pro_id', sa.UUID(), nullable=False),
+    sa.Column('timezone', sa.String(), nullable=False),
+    sa.Column('available_days', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('breaks', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('days_off', postgresql.ARRAY(sa.Date()), nullable=False),
+    sa.Column('slot_step_minutes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['pro_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('pro_id')
+    )
+    op.create_table('bookings',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('pro_id', sa.UUID(), nullable=False),
+    sa.Column('client_id', sa.UUID(), nullable=False),
+    sa.Column('service_id', sa.UUID(), nullable=True),
+    sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['client_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['pro_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bookings_pro_id_starts_at', 'bookings', ['pro_id', 'starts_at'], unique=False)
+    op.create_index('ix_bookings_client_id_starts_at', 'bookings', ['client_id', 'starts_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_client_id_starts_at', table_name='bookings')
+    op.drop_index('ix_bookings_pro_id_starts_at', table_name='bookings')
+    op.drop_table('bookings')
+    op.drop_table('calendars')
@@ -0,0 +1,38 @@
+"""Booking no-overlap exclusion constraint
+
+Revision ID: f4a8d2c6e913
+Revises: e5b9c3a7d210
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a8d2c6e913'
+down_revision: Union[str, None] = 'e5b9c3a7d210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # uuid "=" in a GiST index
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('bookings', sa.Column('during', postgresql.TSTZRANGE(), sa.Computed("tstzrange(starts_at, ends_at, '[)')", persisted=True), nullable=True))
+    op.create_check_constraint('ck_bookings_ends_after_start', 'bookings', 'ends_at > starts_at')
+    op.create_exclude_constraint(
+        'ex_bookings_pro_id_during', 'bookings',
+        ('pro_id', '='), ('during', '&&'),
+        using='gist',
+        where="status IN ('pending', 'confirmed')",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ex_bookings_pro_id_during', 'bookings')
+    op.drop_constraint('ck_bookings_ends_after_start', 'bookings')
+    op.drop_column('bookings', 'during')
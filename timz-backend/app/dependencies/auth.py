@@ -1,15 +1,19 @@
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 from app.services.auth import decode_token
-from app.db.database import get_db
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.revocation import revocation_set
 from uuid import UUID
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Security(oauth2_scheme)):
+async def get_current_user(token: str = Security(oauth2_scheme)) -> Principal:
+    return principal_from_token(token)
+
+
+def principal_from_token(token: str) -> Principal:
+    # access tokens are self-contained: signature, expiry and the in-memory revocation set, no DB read
     payload = decode_token(token)
     user_id = payload.get("sub")
 
@@ -21,17 +25,19 @@ def get_current_user(db: Session = Depends(get_db), token: str = Security(oauth2
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid UUID format")
 
-    user = db.query(User).filter(User.id == user_uuid).first()
-    if not user or not user.is_active:
-        raise HTTPException(status_code=401, detail="User not found or inactive")
-
-    if payload["token_version"] != user.token_version:
+    if revocation_set.is_revoked(payload):
         raise HTTPException(status_code=401, detail="Token has been invalidated")
 
-    return user
+    roles = payload.get("role") or ()
+    return Principal(
+        id=user_uuid,
+        roles=(roles,) if isinstance(roles, str) else tuple(roles),
+        is_active=True,
+        token_version=payload.get("token_version", 0),
+    )
 
 def require_roles(allowed_roles: list[str]):
-    def role_checker(user: User = Depends(get_current_user)):
+    async def role_checker(user: Principal = Depends(get_current_user)):
         if not any(role in allowed_roles for role in user.roles):
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
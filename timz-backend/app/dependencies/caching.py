@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.config import get_settings
+from app.services.collection_versions import collection_versions
+
+settings = get_settings()
+
+# browsers revalidate every time (cheap 304), shared caches serve for s-maxage then revalidate
+CATALOG_CACHE_CONTROL = (
+    f"public, max-age=0, s-maxage={settings.catalog_cdn_max_age_seconds}, "
+    f"stale-while-revalidate={settings.catalog_cdn_max_age_seconds}"
+)
+
+
+def make_etag(versions: dict[str, tuple[int, datetime | None]]) -> str:
+    # updated_at is part of the key so a reset counter (restored or recreated table) can't reuse an ETag
+    raw = ";".join(f"{name}:{version}:{updated_at.isoformat() if updated_at else ''}" for name, (version, updated_at) in sorted(versions.items()))
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # weak comparison (RFC 9110 13.1.2): a W/ prefix added by a proxy still matches
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+    return False
+
+
+def conditional_get(*collections: str, live_params: tuple[str, ...] = ()):
+    """
+    Dependency of a public catalog endpoint whose content only changes with the given collections.
+    Answers 304 from the cached collection versions, before the endpoint runs any query,
+    otherwise adds ETag / Last-Modified / Cache-Control to the response.
+    A request with one of live_params (filters on data outside the collections) is never cached.
+    """
+    async def validators(request: Request, response: Response) -> dict:
+        if any(name in request.query_params for name in live_params):
+            response.headers["Cache-Control"] = "no-store"
+            return {"Cache-Control": "no-store"}
+
+        versions = await collection_versions.get(collections)
+        etag = make_etag(versions)
+        headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+        modified = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+        last_modified = max(modified) if modified else None
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+        if is_not_modified(request, etag, last_modified):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return headers
+
+    return validators
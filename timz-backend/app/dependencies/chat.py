@@ -0,0 +1,37 @@
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Query, WebSocket, WebSocketException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.principal_cache import Principal
+from app.db.database import get_async_db
+from app.dependencies.auth import get_current_user, principal_from_token
+from app.models.chat import Conversation
+from app.services.chat import get_participant_conversation
+
+
+async def websocket_principal(websocket: WebSocket, token: str | None = Query(None)) -> Principal:
+    """
+    The user of a WebSocket, from the same access token as the REST API: browsers can't set
+    headers on a WebSocket, so ?token= is accepted besides the Authorization header.
+    A rejected handshake is closed with 1008 before it is accepted.
+    """
+    if token is None:
+        scheme, _, token = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated")
+    try:
+        return principal_from_token(token)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+
+
+async def get_conversation(
+    conversation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+) -> Conversation:
+    conversation = await get_participant_conversation(db, conversation_id, current_user.id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return conversation
@@ -1,36 +1,86 @@
-from fastapi import FastAPI, Depends
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Depends, Response
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from app.api.v1 import auth, users, services
+from app.api.v1 import auth, users, services, bookings, chat
+from app.services.password_hasher import password_hasher
+from app.services.embeddings import run_index_sync, save_index_snapshot, service_index
+from app.services.availability import availability_index, run_availability_sync
+from app.services.chat import chat_hub, chat_writer
+from app.services.notifications import notification_dispatcher
+from app.core.config import get_settings
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+from app.core.principal_cache import principal_cache
+from app.core.request_metrics import RequestMetricsMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db, async_engine
 from sqlalchemy import text
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
-app = FastAPI()
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    index_sync = asyncio.create_task(run_index_sync(settings.embedding_index_sync_seconds))
+    availability_sync = asyncio.create_task(run_availability_sync(settings.availability_sync_seconds))
+    notification_dispatch = asyncio.create_task(notification_dispatcher.run())
+    yield
+    for task in (index_sync, availability_sync, notification_dispatch):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await chat_writer.stop()
+    await notification_dispatcher.aclose()
+    await run_in_threadpool(save_index_snapshot)
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+registry.register_stats("principal_cache", principal_cache.stats, counters=["hits", "misses", "invalidations"])
+registry.register_stats("password_hasher", password_hasher.stats, counters=["completed", "rejected"])
+registry.register_stats("embedding_index", service_index.stats)
+registry.register_stats("availability_index", availability_index.stats)
+registry.register_stats("chat_hub", chat_hub.stats, counters=["published", "delivered", "dropped"])
+registry.register_stats("chat_writer", chat_writer.stats, counters=["flushes", "written", "failed", "rejected"])
+registry.register_stats(
+    "notifications", notification_dispatcher.stats,
+    counters=["claimed", "emails", "sent", "retried", "failed", "transport_requests"],
+)
 
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 app.include_router(auth.router, prefix="/api/v1/auth")
 app.include_router(users.router, prefix="/api/v1/users")
 app.include_router(services.router, prefix="/api/v1/services")
+app.include_router(bookings.router, prefix="/api/v1/bookings")
+app.include_router(chat.router, prefix="/api/v1/chat")
 
 
 @app.get("/")
-def home():
+async def home():
     return {"message": "Welcome to Timz Backdoor!!"}
 
 @app.get("/ping_db")
-def ping_db(db: Session = Depends(get_db)):
+async def ping_db(db: AsyncSession = Depends(get_async_db)):
     try:
-        db.execute(text("SELECT 1"))  # Wrap raw SQL in text()
+        await db.execute(text("SELECT 1"))  # Wrap raw SQL in text()
         return {"message": "Database connected successfully!"}
     except Exception as e:
         return {"error": str(e)}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # CONNECT TO FRONTEND /TEST DEV
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -41,4 +91,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 
-)
\ No newline at end of file
+)
+
+# outermost: times the whole stack, CORS included
+app.add_middleware(RequestMetricsMiddleware)
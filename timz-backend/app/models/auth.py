@@ -0,0 +1,30 @@
+from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from uuid import uuid4, UUID as UUIDType
+from typing import Optional
+from app.db.database import Base
+
+
+class RefreshToken(Base):
+    """
+    One row per issued refresh token, only the sha256 of the token is stored.
+    Rotation keeps every token of a login session in the same family: presenting an already
+    rotated token means it leaked, and the whole family is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    family_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), index=True, nullable=False)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    replaced_by_id: Mapped[Optional[UUIDType]] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RefreshToken user_id={self.user_id} family_id={self.family_id}>"
@@ -0,0 +1,76 @@
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, ARRAY, Date, CheckConstraint, Computed, DDL, event, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSTZRANGE, ExcludeConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime, date
+from uuid import uuid4, UUID as UUIDType
+from typing import Optional
+from app.db.database import Base
+from app.core.constants import ACTIVE_BOOKING_STATUSES
+
+ACTIVE_BOOKING_PREDICATE = "status IN (%s)" % ", ".join(f"'{status}'" for status in ACTIVE_BOOKING_STATUSES)
+
+
+class Calendar(Base):
+    """
+    Working hours of a pro, read by the slot engine (app/utils/bookings.py).
+    Times are wall-clock times in the calendar's timezone.
+    """
+    __tablename__ = "calendars"
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    pro_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
+    timezone: Mapped[str] = mapped_column(String, nullable=False, default="Europe/Paris")
+
+    # {"mon": [["09:00", "12:00"], ["13:00", "18:00"]], ...}, a missing day is not worked
+    available_days: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # [{"start": "16:00", "end": "16:15", "days": ["mon"]}], every worked day when "days" is missing
+    breaks: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    days_off: Mapped[list[date]] = mapped_column(ARRAY(Date), nullable=False, default=list)
+    slot_step_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=15)  # grid of offered start times
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Calendar pro_id={self.pro_id}>"
+
+
+class Booking(Base):
+    """
+    Two active bookings of the same pro never overlap: the exclusion constraint rejects the
+    second insert (SQLSTATE 23P01) however many requests race, without locks or a prior check.
+    Cancelled/refused/completed bookings are outside the constraint and free their slot.
+    """
+    __tablename__ = "bookings"
+    __table_args__ = (
+        CheckConstraint("ends_at > starts_at", name="ck_bookings_ends_after_start"),
+        # GiST on (pro_id, during): also the index of busy_minutes (same predicate)
+        ExcludeConstraint(
+            ("pro_id", "="), ("during", "&&"),
+            name="ex_bookings_pro_id_during",
+            using="gist",
+            where=text(ACTIVE_BOOKING_PREDICATE),
+        ),
+        Index("ix_bookings_pro_id_starts_at", "pro_id", "starts_at"),
+        Index("ix_bookings_client_id_starts_at", "client_id", "starts_at"),
+    )
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    pro_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    client_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    service_id: Mapped[Optional[UUIDType]] = mapped_column(UUID(as_uuid=True), ForeignKey("services.id", ondelete="SET NULL"), nullable=True)
+
+    starts_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ends_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    during = mapped_column(TSTZRANGE, Computed("tstzrange(starts_at, ends_at, '[)')", persisted=True), deferred=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # see BOOKING_STATUSES
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Booking pro_id={self.pro_id} {self.starts_at} {self.status}>"
+
+
+# uuid equality in a GiST index (the pro_id part of the exclusion constraint) comes from btree_gist
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
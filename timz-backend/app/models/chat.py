@@ -0,0 +1,64 @@
+from sqlalchemy import String, Text, DateTime, Integer, BigInteger, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from uuid import uuid4, UUID as UUIDType
+from typing import Optional
+from app.db.database import Base
+
+
+class Conversation(Base):
+    """
+    One conversation per (client, pro) pair, started by the client.
+    last_seq is the seq of its last message; the unread counters are bumped by the message
+    writer in the same UPDATE that reserves the seqs, and reset when a participant reads.
+    """
+    __tablename__ = "conversations"
+    __table_args__ = (
+        UniqueConstraint("client_id", "pro_id", name="uq_conversations_client_id_pro_id"),
+        Index("ix_conversations_pro_id", "pro_id"),
+    )
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    client_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    pro_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    client_unread: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    pro_unread: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    client_last_read_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    pro_last_read_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def other(self, user_id: UUIDType) -> UUIDType:
+        return self.pro_id if user_id == self.client_id else self.client_id
+
+    def unread(self, user_id: UUIDType) -> int:
+        return self.client_unread if user_id == self.client_id else self.pro_unread
+
+    def __repr__(self):
+        return f"<Conversation client_id={self.client_id} pro_id={self.pro_id}>"
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        # history pages walk (conversation_id, seq); every column but the text is in the index
+        # (a btree entry is limited to ~2.7 kB, the text can't be)
+        Index(
+            "ix_chat_messages_conversation_id_seq", "conversation_id", "seq", unique=True,
+            postgresql_include=["id", "sender_id", "receiver_id", "status", "created_at"],
+        ),
+    )
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    conversation_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False)  # 1, 2, ... in each conversation
+    sender_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    receiver_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="sent")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ChatMessage conversation_id={self.conversation_id} sender_id={self.sender_id}>"
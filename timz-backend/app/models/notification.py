@@ -0,0 +1,40 @@
+from sqlalchemy import String, Text, DateTime, Integer, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from uuid import uuid4, UUID as UUIDType
+from typing import Optional
+from app.db.database import Base
+
+
+class Notification(Base):
+    """
+    A notification to a user, also the outbox of its email delivery: handlers add the row in the
+    transaction of the change it is about, the dispatcher sends it afterwards.
+    status is the in-app read state; delivery_status goes pending -> sent, or failed once the
+    attempts are exhausted. next_attempt_at is when a pending row is due: the backoff after a
+    failed attempt, or the lease of the dispatcher that claimed it.
+    """
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+        # the dispatcher's claim scans only what is still to send
+        Index("ix_notifications_due", "next_attempt_at", postgresql_where=text("delivery_status = 'pending'")),
+    )
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type: Mapped[str] = mapped_column(String(50), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="unread")
+
+    delivery_status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Notification user_id={self.user_id} type={self.type} delivery_status={self.delivery_status}>"
@@ -1,6 +1,6 @@
 from app.db.database import Base
 
-from sqlalchemy import String, ForeignKey, Integer, DateTime, Float, Boolean, Enum, JSON
+from sqlalchemy import String, ForeignKey, Integer, DateTime, Float, Boolean, Enum, JSON, Index, text, DDL, event, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from uuid import UUID, uuid4
@@ -17,7 +17,7 @@ from app.db.database import Base
 
 
 
-class PricingType(PyEnum):
+class PricingType(str, PyEnum):
     fixed = "fixed"
     starting_from = "starting_from"
     quote = "quote"
@@ -25,8 +25,17 @@ class PricingType(PyEnum):
 
 class Service(Base):
     __tablename__ = "services"
+    # keyset pagination indexes: every list filter is followed by the (created_at, id) sort key
+    __table_args__ = (
+        Index("ix_services_public_created_at_id", "created_at", "id",
+              postgresql_where=text("is_active AND is_public")),
+        Index("ix_services_pro_id_created_at_id", "pro_id", "created_at", "id"),
+        Index("ix_services_category_id_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_services_service_group_id_created_at_id", "service_group_id", "created_at", "id"),
+        Index("ix_services_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     pro_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -37,7 +46,7 @@ class Service(Base):
 
     duration: Mapped[int] = mapped_column(Integer, nullable=True)  # in minutes
     # linked to category defined in advance:
-    category_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("service_categories.id"), nullable=False)
+    category_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("services_categories.id"), nullable=False)
     template_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("service_templates.id"), nullable=True)
     keywords: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=True)
 
@@ -45,10 +54,11 @@ class Service(Base):
     status: Mapped[str] = mapped_column(String, default="active")  # or "pending"
 
     embedding: Mapped[dict] = mapped_column(JSONB, nullable=True)
-    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=True)
+    # maintained by the services_search_vector trigger (see SEARCH_VECTOR_FUNCTION), never loaded by default
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
 
-    service_group_id: Mapped[UUID] = mapped_column(
+    service_group_id: Mapped[UUIDType] = mapped_column(
         ForeignKey("service_groups.id"), nullable=True)  # linked to table of services cat defined by the pro
     service_group = relationship("ServiceGroup", back_populates="services")
 
@@ -58,7 +68,7 @@ class Service(Base):
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     pro = relationship("User", back_populates="services")
     category = relationship("ServiceCategory", back_populates="services")
@@ -66,14 +76,44 @@ class Service(Base):
 
 
 
+# Full-text document of a service: title (A) > keywords (B) > description (C), each stemmed in
+# French and in English since the catalog mixes both. Same SQL as the migration, so create_all() matches it.
+SEARCH_VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION services_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('french', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(array_to_string(NEW.keywords, ' '), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(array_to_string(NEW.keywords, ' '), '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(NEW.description, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER services_search_vector
+BEFORE INSERT OR UPDATE OF title, keywords, description ON services
+FOR EACH ROW EXECUTE FUNCTION services_search_vector_update()
+"""
+
+event.listen(Service.__table__, "after_create", DDL(SEARCH_VECTOR_FUNCTION))
+event.listen(Service.__table__, "after_create", DDL(SEARCH_VECTOR_TRIGGER))
+
+
 class ServiceGroup(Base):
     """
     This table represents the category where the pro can range their services in
     """
     __tablename__ = "service_groups"
+    __table_args__ = (
+        Index("ix_service_groups_pro_id_position_id", "pro_id", "position", "id"),
+    )
 
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
-    pro_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"),
+    id: Mapped[UUIDType] = mapped_column(primary_key=True, default=uuid4)
+    pro_id: Mapped[UUIDType] = mapped_column(ForeignKey("users.id"),
                                          nullable=False)
 
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -87,12 +127,13 @@ class ServiceGroup(Base):
 class ServiceCategory(Base):
     __tablename__ = "services_categories"
 
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    id: Mapped[UUIDType] = mapped_column(primary_key=True, default=uuid4)
     name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    parent_id: Mapped[UUID | None] = mapped_column(ForeignKey("service_categories.id"), nullable=True)
-    children = relationship("ServiceCategory", backref="parent", remote_side=[id])
+    parent_id: Mapped[UUIDType | None] = mapped_column(ForeignKey("services_categories.id"), nullable=True)
+    parent = relationship("ServiceCategory", remote_side=[id], back_populates="children")
+    children = relationship("ServiceCategory", back_populates="parent")
     search_tags: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=True)
 
     services = relationship("Service", back_populates="category")
@@ -100,6 +141,34 @@ class ServiceCategory(Base):
     templates = relationship("ServiceTemplate", back_populates="category")
 
 
+class ServiceCategoryClosure(Base):
+    """
+    Every (ancestor, descendant) pair of the category tree, a category being its own ancestor at
+    depth 0. A subtree is then one indexed lookup on ancestor_id instead of a walk over parent_id.
+    Maintained by app.services.categories when a category is created.
+    """
+    __tablename__ = "services_categories_closure"
+    __table_args__ = (
+        Index("ix_services_categories_closure_descendant_id", "descendant_id"),
+    )
+
+    ancestor_id: Mapped[UUIDType] = mapped_column(ForeignKey("services_categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[UUIDType] = mapped_column(ForeignKey("services_categories.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class CollectionVersion(Base):
+    """
+    Version counter of a public collection ("services", "categories"), bumped in the transaction
+    of every write to it. The ETag / Last-Modified of the catalog endpoints are derived from it.
+    """
+    __tablename__ = "collection_versions"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class ServiceComponent(Base):
     __tablename__ = "service_components"
 
@@ -115,12 +184,12 @@ class ServiceComponent(Base):
 class ServiceTemplate(Base):
     __tablename__ = "service_templates"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
 
     title: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
 
-    category_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("service_categories.id"), nullable=False)
+    category_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), ForeignKey("services_categories.id"), nullable=False)
 
     keywords: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=True)
     sub_keywords: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=True)  # plus secondaires, ex: style, durée, contexte
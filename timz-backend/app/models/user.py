@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, ARRAY
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, ARRAY, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
@@ -10,7 +10,10 @@ from typing import Optional
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),  # admin user list (keyset pagination)
+        {'extend_existing': True},
+    )
 
     id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
@@ -33,6 +36,7 @@ class User(Base):
 
     profile_client = relationship("ProfileClient", back_populates="user", uselist=False)
     profile_pro = relationship("ProfilePro", back_populates="user", uselist=False)
+    services = relationship("Service", back_populates="pro")
 
     def __repr__(self):
         return f"<User {self.email} - roles={self.roles}>"
@@ -72,8 +76,9 @@ class ProfilePro(Base):
 
     user = relationship("User", back_populates="profile_pro")
 
-    services = relationship("Service", back_populates="pro")
-    service_groups = relationship("ServiceGroup", back_populates="pro")  # si tu veux aussi accéder au groupe
+    # services.pro_id points to users.id, so the pro's services are joined through user_id
+    services = relationship("Service", primaryjoin="ProfilePro.user_id == foreign(Service.pro_id)", viewonly=True)
+    service_groups = relationship("ServiceGroup", primaryjoin="ProfilePro.user_id == foreign(ServiceGroup.pro_id)", viewonly=True)  # si tu veux aussi accéder au groupe
 
     def __repr__(self):
         return f"<ProProfile user_id={self.user_id}>"
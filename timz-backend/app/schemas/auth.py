@@ -6,6 +6,7 @@ from app.schemas.users import UserRole, Address
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     user_id: UUID
     roles: List[UserRole]
@@ -14,10 +15,15 @@ class JWTPayload(BaseModel):
     sub: UUID
     role: List[UserRole]
     token_version: int
+    jti: Optional[str] = None
+    sid: Optional[UUID] = None  # refresh-token family
     iat: int
     exp: int
     iss: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class SignupRequest(BaseModel):
     email: EmailStr
     full_name: str
@@ -33,6 +39,7 @@ class SignupRequest(BaseModel):
 
 class SignupResponse(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     user_id: UUID
     roles: List[UserRole]
\ No newline at end of file
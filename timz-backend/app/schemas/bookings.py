@@ -0,0 +1,94 @@
+from pydantic import AwareDatetime, BaseModel, Field, field_validator, model_validator
+from uuid import UUID
+from datetime import date, datetime
+from typing import Dict, List, Literal, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.utils.bookings import parse_minute
+
+Weekday = Literal["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+TimeOfDay = str  # "HH:MM", "24:00" for the end of the day
+
+
+def check_interval(start: str, end: str) -> None:
+    if parse_minute(start) >= parse_minute(end):
+        raise ValueError(f"{start}-{end}: the start must be before the end")
+
+
+class Break(BaseModel):
+    start: TimeOfDay
+    end: TimeOfDay
+    days: Optional[List[Weekday]] = None  # every day when missing
+
+    @model_validator(mode="after")
+    def check_times(self):
+        check_interval(self.start, self.end)
+        return self
+
+
+class CalendarBase(BaseModel):
+    timezone: str = "Europe/Paris"
+    available_days: Dict[Weekday, List[Tuple[TimeOfDay, TimeOfDay]]] = {}
+    breaks: List[Break] = []
+    days_off: List[date] = []
+    slot_step_minutes: int = Field(15, ge=5, le=240)
+
+    @field_validator("timezone")
+    @classmethod
+    def check_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone {value!r}")
+        return value
+
+    @field_validator("available_days")
+    @classmethod
+    def check_hours(cls, value: dict) -> dict:
+        for intervals in value.values():
+            for start, end in intervals:
+                check_interval(start, end)
+        return value
+
+
+class CalendarIn(CalendarBase):
+    pass
+
+
+class CalendarOut(CalendarBase):
+    id: UUID
+    pro_id: UUID
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SlotsOut(BaseModel):
+    service_id: UUID
+    duration: int  # minutes
+    timezone: str
+    slots: List[datetime]  # bookable start times, in the calendar's timezone
+
+
+class BookingCreate(BaseModel):
+    service_id: UUID
+    starts_at: AwareDatetime  # the end follows from the service duration
+
+
+class BookingStatusUpdate(BaseModel):
+    status: Literal["confirmed", "refused", "completed", "cancelled"]
+
+
+class BookingOut(BaseModel):
+    id: UUID
+    pro_id: UUID
+    client_id: UUID
+    service_id: Optional[UUID] = None
+    starts_at: datetime
+    ends_at: datetime
+    status: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,75 @@
+from pydantic import BaseModel, Field, TypeAdapter
+from uuid import UUID
+from datetime import datetime
+from typing import Annotated, Literal, Optional, Union
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class ConversationCreate(BaseModel):
+    pro_id: UUID  # conversations are started by the client
+
+
+class ConversationOut(BaseModel):
+    id: UUID
+    client_id: UUID
+    pro_id: UUID
+    last_seq: int
+    last_message_at: Optional[datetime] = None
+    unread: int  # messages to the current user since it last marked the conversation read
+    last_read_seq: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChatMessageOut(BaseModel):
+    id: UUID
+    conversation_id: UUID
+    seq: int
+    sender_id: UUID
+    receiver_id: UUID
+    message: str
+    status: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# -- WebSocket frames -------------------------------------------------------------------------
+# client -> server: {"type": "join" | "leave", "conversation_id"}, {"type": "message", "conversation_id", "message"},
+# {"type": "pong"} (any frame counts as a sign of life)
+# server -> client: {"type": "message", ...ChatMessageOut, "ref"} once the message is stored, {"type": "joined" | "left", "conversation_id"},
+# {"type": "ping"}, {"type": "error", "detail"}
+
+class JoinFrame(BaseModel):
+    type: Literal["join"]
+    conversation_id: UUID
+
+
+class LeaveFrame(BaseModel):
+    type: Literal["leave"]
+    conversation_id: UUID
+
+
+class MessageFrame(BaseModel):
+    type: Literal["message"]
+    conversation_id: UUID
+    message: str = Field(..., min_length=1, max_length=settings.chat_max_message_length)
+    ref: Optional[str] = Field(None, max_length=64)  # echoed in the acknowledgement
+
+
+class PongFrame(BaseModel):
+    type: Literal["pong"]
+
+
+ClientFrame = TypeAdapter(Annotated[Union[JoinFrame, LeaveFrame, MessageFrame, PongFrame], Field(discriminator="type")])
+
+
+class MessageEvent(ChatMessageOut):
+    type: Literal["message"] = "message"
+    ref: Optional[str] = None
@@ -11,14 +11,15 @@ class ServiceBase(BaseModel):
     pricing_type: Literal["fixed", "starting_from", "quote"]
     duration: Optional[int] = None
     category_id: UUID
+    keywords: Optional[List[str]] = None
     service_group_id: Optional[UUID] = None
-    options_schemas: Optional[dict] = None
+    options_schema: Optional[dict] = None
     is_active: bool = True
     is_public: bool = True
 
 
 class ServiceCreate(ServiceBase):
-    pass
+    embedding: Optional[List[float]] = None  # EMBEDDING_DIM floats, used by the similar services index
 
 
 class ServiceOut(ServiceBase):
@@ -30,6 +31,16 @@ class ServiceOut(ServiceBase):
         from_attributes = True
 
 
+class ServiceSearchHit(ServiceOut):
+    rank: float
+    title_highlight: str  # matched words wrapped in <b></b>
+    description_highlight: Optional[str] = None
+
+
+class ServiceSimilar(ServiceOut):
+    score: float  # cosine similarity with the reference service
+
+
 class ServiceGroupCreate(BaseModel):
     name: str
     position: int | None = 0
@@ -47,12 +58,18 @@ class ServiceGroupOut(BaseModel):
 
 class CategoryCreate(BaseModel):
     name: str
+    parent_id: Optional[UUID] = None
 
 
 class CategoryOut(BaseModel):
     id: UUID
     name: str
     created_at: datetime
+    parent_id: Optional[UUID] = None
 
     class Config:
         from_attributes = True
+
+
+class CategoryTreeOut(CategoryOut):
+    children: List["CategoryTreeOut"] = []
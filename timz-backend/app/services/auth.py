@@ -1,13 +1,16 @@
-import os
-
 import jwt
-import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.auth import RefreshToken
 from app.models.user import User
-from app.utils.auth import verify_password
-from dotenv import load_dotenv
+from app.utils import auth as auth_utils
+from app.utils.auth import password_needs_rehash, create_access_token, create_refresh_token, hash_refresh_token
+from app.services.password_hasher import password_hasher
+from app.core.principal_cache import Principal, principal_cache
+from app.core.revocation import revocation_set
 
 from app.core.config import get_settings
 
@@ -16,33 +19,119 @@ SECRET_KEY = settings.jwt_secret
 if not isinstance(SECRET_KEY, str) or not SECRET_KEY:
     raise RuntimeError(" JWT_SECRET not set correctly in environment")
 
-load_dotenv()
-
-
-
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-def create_access_token(data: dict, expires_delta: Optional[datetime.timedelta] = None):
-    """Generate a JWT access token"""
-    to_encode = data.copy()
-    expire = datetime.datetime.utcnow() + (expires_delta or datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_token(token: str):
     """Decode and verify JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return auth_utils.decode_token(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
     """Authenticate user by email & password"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
+    if not user or not await password_hasher.verify(password, user.hashed_password):
         return None
+
+    # BCRYPT_ROUNDS changed since this hash was made: upgrade it while we have the plain password,
+    # unless the pool is saturated (the login itself must not fail because of the rehash)
+    if password_needs_rehash(user.hashed_password) and password_hasher.has_capacity():
+        user.hashed_password = await password_hasher.hash(password)
+        await db.commit()
     return user
+
+async def load_principal(db: AsyncSession, user_id: UUID) -> Principal | None:
+    """Principal of a user, from the principal cache or a 4-column select"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        generation = principal_cache.generation()
+        result = await db.execute(
+            select(User.id, User.roles, User.is_active, User.token_version).where(User.id == user_id)
+        )
+        row = result.first()
+        if row:
+            principal = Principal(id=row.id, roles=tuple(row.roles), is_active=row.is_active, token_version=row.token_version)
+            principal_cache.put(principal, generation)
+    return principal
+
+def issue_tokens(db: AsyncSession, user_id: UUID, roles: list[str], token_version: int, family_id: UUID | None = None) -> dict:
+    """Create an access token and a refresh token (added to the session, the caller commits)"""
+    refresh_token = create_refresh_token()
+    row = RefreshToken(
+        id=uuid4(),
+        user_id=user_id,
+        family_id=family_id or uuid4(),
+        token_hash=hash_refresh_token(refresh_token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
+    )
+    db.add(row)
+
+    access_token = create_access_token(
+        user_id=user_id,
+        role=list(roles),
+        token_version=token_version,
+        session_id=row.family_id,
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "refresh_token_id": row.id}
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> tuple[Principal, dict]:
+    """Exchange a refresh token for a new token pair, revoking the presented one"""
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(refresh_token)).with_for_update()
+    )
+    current = result.scalars().first()
+    if not current:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    now = datetime.utcnow()
+    if current.revoked_at is not None:
+        # an already rotated token is replayed: assume it leaked and end the whole session
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == current.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        await db.commit()
+        revocation_set.revoke_session(current.family_id)
+        raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+
+    if current.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Refresh token expired")
+
+    principal = await load_principal(db, current.user_id)
+    if not principal or not principal.is_active:
+        raise HTTPException(status_code=401, detail="User not found or inactive")
+
+    tokens = issue_tokens(db, principal.id, list(principal.roles), principal.token_version, family_id=current.family_id)
+    current.revoked_at = now
+    current.replaced_by_id = tokens["refresh_token_id"]
+    await db.commit()
+    return principal, tokens
+
+async def bump_token_version(db: AsyncSession, user_id: UUID, revoke_refresh_tokens: bool = False) -> int:
+    """
+    Invalidate the access tokens of a user (and optionally all their sessions).
+    The caller commits, then calls forget_user_tokens() with the returned version.
+    """
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    )
+    token_version = result.scalar_one()
+    if revoke_refresh_tokens:
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+    return token_version
+
+def forget_user_tokens(user_id: UUID, token_version: int) -> None:
+    """After commit: reject older access tokens without a DB read and drop the cached principal"""
+    revocation_set.revoke_user(user_id, token_version)
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import func, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.availability_index import BLOCK_MINUTES, AvailabilityIndex, pack_minutes
+from app.core.constants import ACTIVE_BOOKING_STATUSES, MAX_SLOT_WINDOW_DAYS
+from app.db.database import db_session
+from app.models.booking import Booking, Calendar
+from app.services.bookings import local_minutes
+from app.utils.bookings import MINUTE, compile_week, free_minutes
+
+logger = logging.getLogger(__name__)
+
+SYNC_CHUNK = 1000
+
+# one index per worker process, kept current by the booking/calendar routes and by sync_availability_index().
+# The horizon starts the day before today (UTC): every pro's local today is inside it, whatever its timezone.
+availability_index = AvailabilityIndex(horizon_days=MAX_SLOT_WINDOW_DAYS + 2)
+pro_timezones: dict[UUID, str] = {}  # of the indexed pros, to place a new booking without a query
+
+
+def horizon_origin() -> date:
+    return datetime.now(timezone.utc).date() - timedelta(days=1)
+
+
+def in_horizon(day: date) -> bool:
+    return 0 <= (day - horizon_origin()).days < availability_index.horizon_days
+
+
+async def refresh_availability(
+    db: AsyncSession, pro_ids, first_day: date | None = None, days: int | None = None
+) -> None:
+    """
+    Recompute the bitmap of these pros from their calendar and active bookings, over `days` days
+    from first_day (the whole horizon by default). Pros without a calendar are dropped.
+    """
+    if availability_index.origin is None:
+        availability_index.roll(horizon_origin())
+    first_day = first_day or availability_index.origin
+    days = days or availability_index.horizon_days
+    pro_ids = list(pro_ids)
+    for start in range(0, len(pro_ids), SYNC_CHUNK):
+        chunk = pro_ids[start:start + SYNC_CHUNK]
+        result = await db.execute(select(Calendar).where(Calendar.pro_id.in_(chunk)))
+        calendars = result.scalars().all()
+
+        # one query for the chunk, each booking in the wall clock of its pro's calendar
+        bounds = func.tstzrange(
+            datetime.combine(first_day - timedelta(days=1), time(), timezone.utc),
+            datetime.combine(first_day + timedelta(days=days + 1), time(), timezone.utc),
+        )
+        result = await db.execute(
+            select(Booking.pro_id, *local_minutes(Calendar.timezone, first_day))
+            .join(Calendar, Calendar.pro_id == Booking.pro_id)
+            .where(
+                Booking.pro_id.in_(chunk),
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                Booking.during.overlaps(bounds),
+            )
+        )
+        busy = defaultdict(list)
+        for pro_id, first_minute, end_minute in result.all():
+            busy[pro_id].append((first_minute, end_minute))
+
+        # about a millisecond per pro over the whole horizon, keep it off the event loop
+        await run_in_threadpool(_set_rows, calendars, busy, first_day, days)
+        for pro_id in set(chunk) - {calendar.pro_id for calendar in calendars}:
+            availability_index.remove(pro_id)
+            pro_timezones.pop(pro_id, None)
+
+
+def _set_rows(calendars: list[Calendar], busy: dict, first_day: date, days: int) -> None:
+    for calendar in calendars:
+        free = free_minutes(
+            compile_week(calendar.available_days, calendar.breaks),
+            first_day,
+            days,
+            calendar.days_off,
+            np.array(busy.get(calendar.pro_id, []), dtype=np.int64).reshape(-1, 2),
+        )
+        availability_index.set_days(calendar.pro_id, first_day, pack_minutes(free))
+        pro_timezones[calendar.pro_id] = calendar.timezone
+
+
+def mark_booked(booking: Booking) -> None:
+    """A booking was committed: its blocks become busy, in memory only"""
+    tz = pro_timezones.get(booking.pro_id)
+    if tz is None:
+        return  # not indexed yet, the next sync builds the whole row
+    local_start = booking.starts_at.astimezone(ZoneInfo(tz)).replace(tzinfo=None)
+    local_end = booking.ends_at.astimezone(ZoneInfo(tz)).replace(tzinfo=None)
+    day = local_start.date()
+    origin = datetime.combine(day, time())
+    availability_index.mark_busy(booking.pro_id, day, (local_start - origin) // MINUTE, -((origin - local_end) // MINUTE))
+
+
+async def release_booking(db: AsyncSession, booking: Booking) -> None:
+    """A booking left the active statuses: rebuild the days it covered (other bookings may overlap them)"""
+    if booking.pro_id not in pro_timezones:
+        return
+    tz = ZoneInfo(pro_timezones[booking.pro_id])
+    first_day = booking.starts_at.astimezone(tz).date()
+    days = (booking.ends_at.astimezone(tz).date() - first_day).days + 1
+    await refresh_availability(db, [booking.pro_id], first_day, days)
+
+
+def window_blocks(start: time, end: time | None) -> tuple[int, int]:
+    """[start, end) of a day as 5-minute blocks, widened to whole blocks; end None is midnight"""
+    end_minute = 24 * 60 if end is None else end.hour * 60 + end.minute
+    return (start.hour * 60 + start.minute) // BLOCK_MINUTES, -(-end_minute // BLOCK_MINUTES)
+
+
+def free_pros(pro_ids, day: date, start: time, end: time | None) -> list[UUID]:
+    """The pros free over the whole window [start, end) of `day`, on their own wall clock"""
+    return availability_index.free(pro_ids, day, *window_blocks(start, end))
+
+
+async def sync_availability_index(db: AsyncSession, since: datetime | None = None) -> datetime:
+    """
+    Catch up with the other workers: move the horizon to today, drop pros without a calendar,
+    rebuild pros that are missing or whose calendar or bookings changed since the previous sync,
+    and fill the days the horizon gained for the others. Returns the next `since`.
+    """
+    started = datetime.utcnow()
+    new_days = availability_index.roll(horizon_origin())
+    result = await db.execute(select(Calendar.pro_id))
+    pro_ids = set(result.scalars().all())
+    for pro_id in availability_index.keys() - pro_ids:
+        availability_index.remove(pro_id)
+        pro_timezones.pop(pro_id, None)
+
+    stale = pro_ids - availability_index.keys()
+    if new_days >= availability_index.horizon_days:
+        stale = pro_ids
+    elif since is not None:
+        result = await db.execute(union(
+            select(Calendar.pro_id).where(Calendar.updated_at >= since),
+            select(Booking.pro_id).where(Booking.updated_at >= since),
+        ))
+        stale |= pro_ids & set(result.scalars().all())
+    await refresh_availability(db, stale)
+
+    if 0 < new_days < availability_index.horizon_days:
+        first_day = availability_index.origin + timedelta(days=availability_index.horizon_days - new_days)
+        await refresh_availability(db, pro_ids - stale, first_day, new_days)
+    # overlap the next window a little: a row committed during this sync may carry an earlier updated_at
+    return started - timedelta(seconds=5)
+
+
+async def run_availability_sync(interval: float) -> None:
+    """Background task started by the app lifespan"""
+    since = None
+    while True:
+        try:
+            async with db_session() as db:
+                since = await sync_availability_index(db, since=since)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Availability index sync failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,166 @@
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import DateTime, Integer, cast, func, literal, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import ACTIVE_BOOKING_STATUSES
+from app.core.principal_cache import Principal
+from app.models.booking import Booking, Calendar
+from app.models.service import Service
+from app.utils.bookings import MINUTE, available_starts, compile_week, free_minutes, offsets_to_datetimes
+
+EXCLUSION_VIOLATION = "23P01"
+# two overlapping inserts in flight each wait on the other's tuple in the exclusion check:
+# Postgres aborts one of them and the other goes on, the same outcome as 23P01
+DEADLOCK_DETECTED = "40P01"
+
+# target status -> (statuses it can be reached from, who may do it)
+BOOKING_TRANSITIONS = {
+    "confirmed": (("pending",), "pro"),
+    "refused": (("pending",), "pro"),
+    "completed": (("confirmed",), "pro"),
+    "cancelled": (("pending", "confirmed"), "any"),
+}
+
+
+async def get_calendar(db: AsyncSession, pro_id: UUID) -> Calendar | None:
+    result = await db.execute(select(Calendar).where(Calendar.pro_id == pro_id))
+    return result.scalars().first()
+
+
+def local_minutes(timezone, start: date) -> tuple:
+    """
+    Columns of a booking's (start, end) as minute offsets from `start` 00:00 on the wall clock of
+    `timezone` (a name or a column), start rounded down and end rounded up
+    """
+    origin = datetime.combine(start, time())
+
+    def minutes(column):
+        local = func.timezone(timezone, column)  # timestamptz -> wall-clock timestamp
+        return func.extract("epoch", local - literal(origin, DateTime)) / 60
+
+    return cast(func.floor(minutes(Booking.starts_at)), Integer), cast(func.ceil(minutes(Booking.ends_at)), Integer)
+
+
+async def busy_minutes(db: AsyncSession, calendar: Calendar, start: date, days: int) -> np.ndarray:
+    """
+    Active bookings of the pro overlapping the window, as (n, 2) minute offsets from `start` 00:00
+    on the pro's wall clock (start rounded down, end rounded up), computed by Postgres
+    """
+    tz = ZoneInfo(calendar.timezone)
+    result = await db.execute(
+        select(*local_minutes(calendar.timezone, start))
+        .where(
+            Booking.pro_id == calendar.pro_id,
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES),  # the predicate of the exclusion constraint's index
+            Booking.during.overlaps(func.tstzrange(
+                datetime.combine(start, time(), tz), datetime.combine(start + timedelta(days=days), time(), tz)
+            )),
+        )
+    )
+    return np.array(result.all(), dtype=np.int64).reshape(-1, 2)
+
+
+async def available_slots(
+    db: AsyncSession, calendar: Calendar, duration: int, start: date, days: int, now: datetime
+) -> list[datetime]:
+    """Bookable start times (aware, in the calendar's timezone) for a service of `duration` minutes"""
+    tz = ZoneInfo(calendar.timezone)
+    busy = await busy_minutes(db, calendar, start, days)
+    not_before = -((datetime.combine(start, time()) - now.astimezone(tz).replace(tzinfo=None)) // MINUTE)
+    offsets = available_starts(
+        compile_week(calendar.available_days, calendar.breaks),
+        start,
+        days,
+        duration,
+        calendar.slot_step_minutes,
+        days_off=calendar.days_off,
+        busy=busy,
+        not_before=not_before,
+    )
+    return [slot.replace(tzinfo=tz) for slot in offsets_to_datetimes(start, offsets)]
+
+
+def fits_calendar(calendar: Calendar, starts_at: datetime, ends_at: datetime) -> bool:
+    """Whether [starts_at, ends_at) lies within the pro's working hours (breaks and days off excluded)"""
+    tz = ZoneInfo(calendar.timezone)
+    local_start = starts_at.astimezone(tz).replace(tzinfo=None)
+    local_end = ends_at.astimezone(tz).replace(tzinfo=None)
+    day = local_start.date()
+    origin = datetime.combine(day, time())
+    free = free_minutes(
+        compile_week(calendar.available_days, calendar.breaks), day, (local_end.date() - day).days + 1, calendar.days_off
+    )
+    return bool(free[(local_start - origin) // MINUTE:-((origin - local_end) // MINUTE)].all())
+
+
+async def create_booking(db: AsyncSession, client_id: UUID, service_id: UUID, starts_at: datetime) -> Booking:
+    """
+    Insert a pending booking. Overlaps are not checked here: the exclusion constraint decides,
+    so among concurrent requests for the same time exactly one insert commits and the others get 409.
+    """
+    result = await db.execute(
+        select(Service.pro_id, Service.duration).where(
+            Service.id == service_id, Service.is_active == True, Service.is_public == True
+        )
+    )
+    service = result.first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+    if not service.duration:
+        raise HTTPException(status_code=400, detail="Service has no duration")
+    if service.pro_id == client_id:
+        raise HTTPException(status_code=400, detail="Cannot book your own service")
+    if starts_at <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail="Booking must start in the future")
+
+    calendar = await get_calendar(db, service.pro_id)
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+    ends_at = starts_at + timedelta(minutes=service.duration)
+    if not fits_calendar(calendar, starts_at, ends_at):
+        raise HTTPException(status_code=409, detail="Outside the pro's working hours")
+
+    booking = Booking(pro_id=service.pro_id, client_id=client_id, service_id=service_id, starts_at=starts_at, ends_at=ends_at)
+    db.add(booking)
+    try:
+        await db.commit()
+    except DBAPIError as e:
+        await db.rollback()
+        if getattr(e.orig, "pgcode", None) in (EXCLUSION_VIOLATION, DEADLOCK_DETECTED):
+            raise HTTPException(status_code=409, detail="Time slot already booked")
+        raise
+    return booking
+
+
+async def transition_booking(db: AsyncSession, booking_id: UUID, status: str, user: Principal) -> Booking:
+    """
+    Move a booking to `status`. The UPDATE is conditional on the current status, so of two
+    concurrent transitions from the same state only one applies; the other gets 409.
+    Transitions only leave the active statuses, they can never create an overlap.
+    """
+    booking = await db.get(Booking, booking_id)
+    if not booking or user.id not in (booking.pro_id, booking.client_id):
+        raise HTTPException(status_code=404, detail="Booking not found")
+    sources, actor = BOOKING_TRANSITIONS[status]
+    if actor == "pro" and user.id != booking.pro_id:
+        raise HTTPException(status_code=403, detail="Only the pro can do this")
+    current = booking.status  # the rollback below expires the instance
+
+    result = await db.execute(
+        update(Booking)
+        .where(Booking.id == booking_id, Booking.status.in_(sources))
+        .values(status=status, updated_at=datetime.utcnow())
+        .returning(Booking.id)
+    )
+    if result.first() is None:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Cannot change a {current} booking to {status}")
+    await db.commit()
+    await db.refresh(booking)
+    return booking
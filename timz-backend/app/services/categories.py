@@ -0,0 +1,99 @@
+import asyncio
+import time
+from uuid import UUID
+
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert, literal, Uuid
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.service import ServiceCategory, ServiceCategoryClosure
+from app.schemas.service import CategoryTreeOut
+
+settings = get_settings()
+
+
+async def add_category_closure(db: AsyncSession, category_id: UUID, parent_id: UUID | None) -> None:
+    """Closure rows of a new leaf: itself at depth 0, then every ancestor of its parent one level deeper"""
+    await db.execute(insert(ServiceCategoryClosure).values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+    if parent_id is not None:
+        await db.execute(
+            insert(ServiceCategoryClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(
+                    ServiceCategoryClosure.ancestor_id,
+                    literal(category_id, Uuid),
+                    ServiceCategoryClosure.depth + 1,
+                ).where(ServiceCategoryClosure.descendant_id == parent_id),
+            )
+        )
+
+
+def subtree_ids(category_id: UUID):
+    """Subquery of a category and all its descendants (primary key lookup on the closure table)"""
+    return select(ServiceCategoryClosure.descendant_id).where(ServiceCategoryClosure.ancestor_id == category_id)
+
+
+class CategoryTreeCache:
+    """
+    The whole category tree, serialized once to JSON and served as is by GET /categories.
+    Rebuilt with a single select after a category write in this process (invalidate()), when
+    the caller passes a different version (the categories collection version, bumped by the
+    writes of every worker), or after ttl seconds.
+    """
+
+    def __init__(self, ttl: float, timer=time.monotonic):
+        self.ttl = ttl
+        self._timer = timer
+        self._json: bytes | None = None
+        self._built_at = 0.0
+        self._version = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._adapter = TypeAdapter(list[CategoryTreeOut])
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._json = None
+
+    def _fresh(self, version) -> bool:
+        return (
+            self._json is not None
+            and (version is None or version == self._version)
+            and self._timer() - self._built_at < self.ttl
+        )
+
+    @staticmethod
+    def build(rows) -> list[dict]:
+        """Nest (id, name, created_at, parent_id) rows in one pass, siblings keep the rows order"""
+        nodes = {
+            row.id: {"id": row.id, "name": row.name, "created_at": row.created_at, "parent_id": row.parent_id, "children": []}
+            for row in rows
+        }
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            (parent["children"] if parent else roots).append(node)
+        return roots
+
+    async def get_json(self, db: AsyncSession, version=None) -> bytes:
+        if self._fresh(version):
+            return self._json
+        async with self._lock:
+            if self._fresh(version):  # rebuilt by the request we waited for
+                return self._json
+            generation = self._generation
+            result = await db.execute(
+                select(ServiceCategory.id, ServiceCategory.name, ServiceCategory.created_at, ServiceCategory.parent_id)
+                .order_by(ServiceCategory.name)
+            )
+            tree_json = self._adapter.dump_json(self.build(result.all()))
+            # a write committed during the select invalidated it again: serve it but don't keep it
+            if generation == self._generation:
+                self._json = tree_json
+                self._built_at = self._timer()
+                self._version = version
+            return tree_json
+
+
+category_tree = CategoryTreeCache(ttl=settings.category_tree_ttl_seconds)
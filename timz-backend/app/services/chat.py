@@ -0,0 +1,247 @@
+import asyncio
+import logging
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, Integer, case, column, select, or_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.chat_hub import ChatHub
+from app.core.config import get_settings
+from app.db.database import db_session
+from app.models.chat import ChatMessage, Conversation
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# one hub per worker process, fed by the chat WebSocket endpoint
+chat_hub = ChatHub(queue_size=settings.chat_send_queue_size)
+
+
+async def get_participant_conversation(db: AsyncSession, conversation_id: UUID, user_id: UUID) -> Conversation | None:
+    result = await db.execute(
+        select(Conversation).where(
+            Conversation.id == conversation_id, or_(Conversation.client_id == user_id, Conversation.pro_id == user_id)
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_or_create_conversation(db: AsyncSession, client_id: UUID, pro_id: UUID) -> Conversation:
+    if pro_id == client_id:
+        raise HTTPException(status_code=400, detail="Cannot start a conversation with yourself")
+    result = await db.execute(select(User.roles).where(User.id == pro_id, User.is_active == True))
+    roles = result.scalar_one_or_none()
+    if not roles or "pro" not in roles:
+        raise HTTPException(status_code=404, detail="Pro not found")
+
+    # concurrent first messages of the same pair end up in the same conversation
+    await db.execute(
+        insert(Conversation).values(client_id=client_id, pro_id=pro_id).on_conflict_do_nothing(
+            index_elements=[Conversation.client_id, Conversation.pro_id]
+        )
+    )
+    await db.commit()
+    result = await db.execute(
+        select(Conversation).where(Conversation.client_id == client_id, Conversation.pro_id == pro_id)
+    )
+    return result.scalars().one()
+
+
+def participant_columns(user_id: UUID) -> tuple:
+    """unread and last_read_seq of the user's side of a conversation, for a projected select"""
+    is_client = Conversation.client_id == user_id
+    return (
+        case((is_client, Conversation.client_unread), else_=Conversation.pro_unread).label("unread"),
+        case((is_client, Conversation.client_last_read_seq), else_=Conversation.pro_last_read_seq).label("last_read_seq"),
+    )
+
+
+async def mark_read(db: AsyncSession, conversation: Conversation, user_id: UUID) -> Conversation:
+    """Everything up to the conversation's last_seq is read by this participant, its unread counter drops to 0"""
+    if user_id == conversation.client_id:
+        changes = {"client_unread": 0, "client_last_read_seq": Conversation.last_seq}
+    else:
+        changes = {"pro_unread": 0, "pro_last_read_seq": Conversation.last_seq}
+    await db.execute(update(Conversation).where(Conversation.id == conversation.id).values(**changes))
+    await db.commit()
+    await db.refresh(conversation)
+    return conversation
+
+
+# -- write-behind message store ---------------------------------------------------------------
+
+@dataclass(slots=True)
+class PendingMessage:
+    conversation_id: UUID
+    sender_id: UUID
+    receiver_id: UUID
+    to_client: bool  # the receiver is the conversation's client (whose unread counter is bumped)
+    message: str
+    ref: str | None = None  # the sender's id for the message, echoed in the acknowledgement
+    future: asyncio.Future | None = None
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    status: str = "sent"
+    seq: int | None = None  # set by the flush
+
+
+async def write_messages(db: AsyncSession, batch: list[PendingMessage]) -> None:
+    """
+    Persist a batch in the session's transaction and commit: one UPDATE ... FROM (VALUES ...)
+    reserves the seqs of every conversation in the batch and bumps the unread counters, one
+    multi-row INSERT writes the messages. Messages of a conversation that no longer exists keep
+    seq None and are not written.
+    """
+    counts: dict[UUID, list[int]] = {}  # conversation -> [messages, to the client, to the pro]
+    for message in batch:
+        count = counts.setdefault(message.conversation_id, [0, 0, 0])
+        count[0] += 1
+        count[1 if message.to_client else 2] += 1
+    conversation_ids = sorted(counts)
+
+    # row locks taken in id order: flushes of other workers touching the same conversations queue, never deadlock
+    await db.execute(
+        select(Conversation.id).where(Conversation.id.in_(conversation_ids)).order_by(Conversation.id).with_for_update()
+    )
+    batch_counts = values(
+        column("id", PG_UUID(as_uuid=True)), column("n", BigInteger), column("to_client", Integer), column("to_pro", Integer),
+        name="batch_counts",
+    ).data([(conversation_id, *counts[conversation_id]) for conversation_id in conversation_ids])
+    result = await db.execute(
+        update(Conversation)
+        .where(Conversation.id == batch_counts.c.id)
+        .values(
+            last_seq=Conversation.last_seq + batch_counts.c.n,
+            client_unread=Conversation.client_unread + batch_counts.c.to_client,
+            pro_unread=Conversation.pro_unread + batch_counts.c.to_pro,
+            last_message_at=max(message.created_at for message in batch),
+        )
+        .returning(Conversation.id, Conversation.last_seq)
+    )
+    next_seq = {conversation_id: last_seq - counts[conversation_id][0] + 1 for conversation_id, last_seq in result.all()}
+
+    rows = []
+    for message in batch:
+        if message.conversation_id in next_seq:
+            message.seq = next_seq[message.conversation_id]
+            next_seq[message.conversation_id] += 1
+            rows.append({
+                "id": message.id, "conversation_id": message.conversation_id, "seq": message.seq,
+                "sender_id": message.sender_id, "receiver_id": message.receiver_id, "message": message.message,
+                "status": message.status, "created_at": message.created_at,
+            })
+    if rows:
+        await db.execute(insert(ChatMessage), rows)
+    await db.commit()
+
+
+class MessageWriter:
+    """
+    Write-behind persistence of chat messages.
+    submit() queues a message and returns a future; a background task takes the queue every
+    flush_interval seconds, or as soon as max_batch messages wait, and writes it with
+    write_messages() in one transaction. Messages arriving during a flush make the next batch.
+    The future resolves once the transaction committed (a message is acknowledged only when it
+    is durable), with the PendingMessage and its seq, or seq None if the conversation is gone.
+    Past max_pending queued messages submit() refuses and the client retries.
+    """
+
+    def __init__(self, max_batch: int, flush_interval: float, max_pending: int):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: list[PendingMessage] = []  # only touched from the event loop
+        self._task: asyncio.Task | None = None
+        self._nonempty: asyncio.Event | None = None
+        self._full: asyncio.Event | None = None
+        self._stopping = False
+
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            # events are bound to the loop that first waits on them, make them in the running one
+            self._nonempty, self._full = asyncio.Event(), asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, message: PendingMessage) -> asyncio.Future | None:
+        if len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            return None
+        self._ensure_running()
+        message.future = asyncio.get_running_loop().create_future()
+        self._pending.append(message)
+        self._nonempty.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return message.future
+
+    def _take(self) -> list[PendingMessage]:
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not self._pending:
+            self._nonempty.clear()
+        if len(self._pending) < self.max_batch:
+            self._full.clear()
+        return batch
+
+    async def _run(self) -> None:
+        while not (self._stopping and not self._pending):
+            await self._nonempty.wait()
+            if len(self._pending) < self.max_batch and not self._stopping:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            if self._pending:
+                await self._flush(self._take())
+
+    async def _flush(self, batch: list[PendingMessage]) -> None:
+        try:
+            async with db_session() as db:
+                await write_messages(db, batch)
+        except Exception as e:
+            logger.exception("Chat flush of %d messages failed", len(batch))
+            self.failed += len(batch)
+            for message in batch:
+                if not message.future.done():
+                    message.future.set_exception(e)
+            return
+        self.flushes += 1
+        for message in batch:
+            self.written += message.seq is not None
+            if not message.future.done():
+                message.future.set_result(message)
+
+    async def stop(self) -> None:
+        """Write what is still queued, then let the background task end (never cancelled mid-flush)"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._nonempty.set()
+        self._full.set()
+        await self._task
+        self._task = None
+        self._stopping = False
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+chat_writer = MessageWriter(
+    max_batch=settings.chat_flush_max_messages,
+    flush_interval=settings.chat_flush_interval_ms / 1000,
+    max_pending=settings.chat_write_queue_size,
+)
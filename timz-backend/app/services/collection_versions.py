@@ -0,0 +1,78 @@
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.database import db_session
+from app.models.service import CollectionVersion
+
+settings = get_settings()
+
+SERVICES = "services"
+CATEGORIES = "categories"
+
+
+async def bump_collection_version(db: AsyncSession, name: str) -> int:
+    """
+    Called in the transaction of a write: readers can't see the new rows with the old version.
+    Concurrent writers of the same collection queue on its row until commit.
+    The caller commits, then calls collection_versions.expire().
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        insert(CollectionVersion)
+        .values(name=name, version=1, updated_at=now)
+        .on_conflict_do_update(
+            index_elements=[CollectionVersion.name],
+            set_={"version": CollectionVersion.version + 1, "updated_at": now},
+        )
+        .returning(CollectionVersion.version)
+    )
+    return result.scalar_one()
+
+
+class CollectionVersionCache:
+    """
+    The (version, updated_at) of every collection, read with one small select at most every
+    ttl seconds per worker, so a conditional GET is answered without a request session.
+    A write in this process expires it at once, other workers see it after ttl.
+    """
+
+    def __init__(self, ttl: float, timer=time.monotonic):
+        self.ttl = ttl
+        self._timer = timer
+        self._versions: dict[str, tuple[int, datetime]] = {}
+        self._fetched_at: float | None = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def expire(self) -> None:
+        self._generation += 1
+        self._fetched_at = None
+
+    def _fresh(self) -> bool:
+        return self._fetched_at is not None and self._timer() - self._fetched_at < self.ttl
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            if self._fresh():
+                return
+            generation, fetched_at = self._generation, self._timer()
+            async with db_session() as db:
+                result = await db.execute(select(CollectionVersion.name, CollectionVersion.version, CollectionVersion.updated_at))
+                self._versions = {row.name: (row.version, row.updated_at) for row in result.all()}
+            # expired during the select: the versions read may predate that write, re-read next time
+            if generation == self._generation:
+                self._fetched_at = fetched_at
+
+    async def get(self, names: tuple[str, ...]) -> dict[str, tuple[int, datetime | None]]:
+        if not self._fresh():
+            await self._refresh()
+        return {name: self._versions.get(name, (0, None)) for name in names}
+
+
+collection_versions = CollectionVersionCache(ttl=settings.collection_version_ttl_seconds)
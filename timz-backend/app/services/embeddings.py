@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.embedding_index import EmbeddingIndex
+from app.db.database import db_session
+from app.models.service import Service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SYNC_CHUNK = 1000
+
+# one index per worker process, kept current by the write routes and by sync_service_index()
+service_index = EmbeddingIndex(dim=settings.embedding_dim)
+
+
+def embedding_vector(embedding) -> np.ndarray | None:
+    """Service.embedding (JSON array of floats) as a vector, None if absent or of the wrong size"""
+    if not isinstance(embedding, list) or len(embedding) != settings.embedding_dim:
+        return None
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector if np.any(vector) else None
+
+
+def is_indexed(service: Service) -> bool:
+    return service.is_active and service.is_public and embedding_vector(service.embedding) is not None
+
+
+def index_service(service: Service) -> None:
+    """Add, replace or drop a service after it was committed"""
+    if is_indexed(service):
+        service_index.add(service.id, embedding_vector(service.embedding))
+    else:
+        service_index.remove(service.id)
+
+
+def _eligible():
+    return Service.is_active == True, Service.is_public == True, Service.embedding.is_not(None)
+
+
+def _add_rows(rows) -> None:
+    keys, vectors = [], []
+    for service_id, embedding in rows:
+        vector = embedding_vector(embedding)
+        if vector is None:
+            service_index.remove(service_id)
+        else:
+            keys.append(service_id)
+            vectors.append(vector)
+    if keys:
+        service_index.add_many(keys, np.stack(vectors))
+
+
+async def sync_service_index(db: AsyncSession, since: datetime | None = None) -> datetime:
+    """
+    Catch up with the services table: drop keys that are no longer eligible, load the missing
+    ones and reload those updated since the previous sync. Returns the next `since`.
+    """
+    started = datetime.utcnow()
+    result = await db.execute(select(Service.id).where(*_eligible()))
+    eligible_ids = set(result.scalars().all())
+    for service_id in service_index.keys() - eligible_ids:
+        service_index.remove(service_id)
+
+    if not len(service_index):
+        result = await db.execute(select(Service.id, Service.embedding).where(*_eligible()))
+        _add_rows(result.all())
+    else:
+        missing = list(eligible_ids - service_index.keys())
+        for start in range(0, len(missing), SYNC_CHUNK):
+            result = await db.execute(
+                select(Service.id, Service.embedding).where(Service.id.in_(missing[start:start + SYNC_CHUNK]))
+            )
+            _add_rows(result.all())
+        if since is not None:
+            result = await db.execute(
+                select(Service.id, Service.embedding).where(*_eligible(), Service.updated_at >= since)
+            )
+            _add_rows(result.all())
+
+    service_index.compact()
+    # overlap the next window a little: a row committed during this sync may carry an earlier updated_at
+    return started - timedelta(seconds=5)
+
+
+async def similar_services(service_id: UUID, vector: np.ndarray, k: int) -> list[tuple[UUID, float]]:
+    # numpy releases the GIL during the matmul, keep it off the event loop
+    hits = await run_in_threadpool(service_index.search, vector, k, (service_id,))
+    return hits[0]
+
+
+async def run_index_sync(interval: float) -> None:
+    """Background task started by the app lifespan"""
+    since = None
+    path = settings.embedding_index_path
+    saved_at = await run_in_threadpool(service_index.load, path, UUID) if path else None
+    if saved_at is not None:
+        # rows changed while no process was running are reloaded by the first sync
+        since = datetime.utcfromtimestamp(saved_at) - timedelta(seconds=5)
+        logger.info("Embedding index snapshot loaded: %s", service_index.stats())
+
+    while True:
+        try:
+            async with db_session() as db:
+                since = await sync_service_index(db, since=since)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Embedding index sync failed")
+        await asyncio.sleep(interval)
+
+
+def save_index_snapshot() -> None:
+    if settings.embedding_index_path:
+        service_index.save(Path(settings.embedding_index_path))
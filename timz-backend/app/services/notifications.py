@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from contextlib import suppress
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.mail import DeliveryError, Email, MailTransport, make_transport
+from app.db.database import db_session
+from app.models.notification import Notification
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SUBJECTS = {
+    "welcome": "Welcome to Timz",
+}
+
+
+def notify(db: AsyncSession, user_id: UUID, type: str, message: str) -> Notification:
+    """
+    Add a notification to the session (the caller commits): it is emailed by the dispatcher once
+    the transaction commits, and never if it rolls back.
+    """
+    notification = Notification(id=uuid4(), user_id=user_id, type=type, message=message, next_attempt_at=datetime.utcnow())
+    db.add(notification)
+    return notification
+
+
+def digest(rows: list) -> Email:
+    """One email for all the notifications of a recipient claimed in the same batch"""
+    first = rows[0]
+    if len(rows) == 1:
+        return Email(to=first.email, subject=SUBJECTS.get(first.type, "News from Timz"), text=first.message)
+    return Email(
+        to=first.email,
+        subject=f"{len(rows)} new notifications on Timz",
+        text="\n\n".join(f"- {row.message}" for row in rows),
+    )
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """Doubling delay after each failed attempt, jittered so retries of a burst spread out"""
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class NotificationDispatcher:
+    """
+    Sends the notifications of the outbox (the notifications table) by email, in the background.
+    Each round claims up to batch_size due rows in one UPDATE ... FROM users ... RETURNING: the
+    rows are picked FOR UPDATE SKIP LOCKED, so the dispatchers of all the workers share the
+    outbox, and get a lease (next_attempt_at pushed by lease seconds) so rows claimed by a worker
+    that dies are retried once it expires. The claim commits before anything is sent: no
+    transaction or pooled DB connection is held during the HTTP calls.
+    The rows of a recipient go out as one digest email; the digests are sent concurrently over the
+    transport's pooled client. A failed digest is retried with backoff, until max_attempts or a
+    non-retryable error marks its rows failed. Delivery is at least once.
+    """
+
+    def __init__(
+        self, transport: MailTransport, batch_size: int, poll_interval: float, lease: float,
+        max_attempts: int, backoff: float, backoff_max: float,
+    ):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._wake: asyncio.Event | None = None
+
+        self.claimed = 0
+        self.emails = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def _claim(self, db: AsyncSession) -> list:
+        now = datetime.utcnow()
+        due = (
+            select(Notification.id)
+            .where(Notification.delivery_status == "pending", Notification.next_attempt_at <= now)
+            .order_by(Notification.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        # a Core UPDATE: the ORM one can't return columns of the joined users table
+        notifications, users = Notification.__table__, User.__table__
+        result = await db.execute(
+            update(notifications)
+            .where(notifications.c.id.in_(due), notifications.c.user_id == users.c.id)
+            .values(attempts=notifications.c.attempts + 1, next_attempt_at=now + timedelta(seconds=self.lease))
+            .returning(
+                notifications.c.id, notifications.c.user_id, notifications.c.type, notifications.c.message,
+                notifications.c.attempts, notifications.c.created_at, users.c.email,
+            )
+        )
+        rows = result.all()
+        await db.commit()
+        return rows
+
+    async def _send(self, rows: list) -> DeliveryError | None:
+        try:
+            await self.transport.send(digest(rows))
+        except DeliveryError as e:
+            return e
+        except Exception as e:  # a bug in a transport must not stop the others' digests
+            logger.exception("Notification transport failed")
+            return DeliveryError(f"{type(e).__name__}: {e}")
+        return None
+
+    async def dispatch_once(self) -> int:
+        """One round: claim, send, record the outcomes. Returns the number of rows claimed."""
+        async with db_session() as db:
+            rows = await self._claim(db)
+        if not rows:
+            return 0
+        self.claimed += len(rows)
+
+        recipients = defaultdict(list)
+        for row in sorted(rows, key=lambda row: row.created_at):
+            recipients[row.user_id].append(row)
+        errors = await asyncio.gather(*(self._send(user_rows) for user_rows in recipients.values()))
+
+        now = datetime.utcnow()
+        changes = []
+        for user_rows, error in zip(recipients.values(), errors):
+            if error is None:
+                self.emails += 1
+                self.sent += len(user_rows)
+                changes += [{"id": row.id, "delivery_status": "sent", "sent_at": now, "last_error": None} for row in user_rows]
+                continue
+            for row in user_rows:
+                if error.retryable and row.attempts < self.max_attempts:
+                    self.retried += 1
+                    delay = backoff_delay(row.attempts, self.backoff, self.backoff_max)
+                    changes.append({"id": row.id, "next_attempt_at": now + timedelta(seconds=delay), "last_error": str(error)})
+                else:
+                    self.failed += 1
+                    changes.append({"id": row.id, "delivery_status": "failed", "last_error": str(error)})
+            logger.warning("Notification email to %s failed: %s", user_rows[0].email, error)
+
+        async with db_session() as db:
+            for status in ("sent", "failed", None):  # a bulk UPDATE by primary key per set of columns
+                group = [change for change in changes if change.get("delivery_status") == status]
+                if group:
+                    await db.execute(update(Notification), group)
+            await db.commit()
+        return len(rows)
+
+    def wake(self) -> None:
+        """Dispatch now rather than at the next poll (e.g. after a handler committed notifications)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self) -> None:
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except Exception:
+                logger.exception("Notification dispatch failed")
+                claimed = 0
+            if claimed < self.batch_size:  # the backlog is drained, wait for more
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                self._wake.clear()
+
+    async def aclose(self) -> None:
+        self._wake = None
+        await self.transport.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "claimed": self.claimed,
+            "emails": self.emails,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            **{f"transport_{name}": value for name, value in self.transport.stats().items()},
+        }
+
+
+notification_dispatcher = NotificationDispatcher(
+    transport=make_transport(
+        settings.notification_transport,
+        api_key=settings.sendgrid_api_key,
+        sender=settings.notification_sender,
+        max_connections=settings.notification_http_connections,
+        timeout=settings.notification_http_timeout_seconds,
+    ),
+    batch_size=settings.notification_batch_size,
+    poll_interval=settings.notification_poll_seconds,
+    lease=settings.notification_lease_seconds,
+    max_attempts=settings.notification_max_attempts,
+    backoff=settings.notification_backoff_seconds,
+    backoff_max=settings.notification_backoff_max_seconds,
+)
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import get_settings
+from app.utils.auth import timed_password_hash, timed_verify_password
+
+settings = get_settings()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so a login burst doesn't pin the API workers.
+    At most max_workers + max_queue_depth calls can be pending; past that the request is
+    rejected with 503 + Retry-After instead of queueing behind hundreds of hashes.
+    """
+
+    def __init__(self, max_workers: int, max_queue_depth: int, retry_after: int):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.retry_after = retry_after
+        self._executor = None
+        self._pending = 0  # only touched from the event loop
+
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process running an event loop and DB pool threads is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def has_capacity(self) -> bool:
+        return self._pending < self.max_workers + self.max_queue_depth
+
+    async def _run(self, fn, *args):
+        if not self.has_capacity():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests, retry later",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self._pending += 1
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+        # time.monotonic() is system wide on Linux, so worker timestamps compare with ours
+        queue_wait = max(started - submitted, 0.0)
+        hash_time = finished - started
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(timed_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(timed_verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_total": self.queue_wait_total,
+            "queue_wait_max": self.queue_wait_max,
+            "hash_time_total": self.hash_time_total,
+            "hash_time_max": self.hash_time_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_queue_depth=settings.password_hash_queue_depth,
+    retry_after=settings.password_hash_retry_after_seconds,
+)
@@ -0,0 +1,58 @@
+from uuid import UUID
+from sqlalchemy import select, func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.service import Service
+from app.schemas.service import ServiceOut, ServiceSearchHit
+from app.services.categories import subtree_ids
+
+SEARCH_CONFIGS = ("french", "english")  # must match the services_search_vector trigger
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+def build_tsquery(q: str):
+    """websearch syntax ("quoted phrase", or, -exclude), stemmed in every language of the index"""
+    tsquery = None
+    for config in SEARCH_CONFIGS:
+        part = func.websearch_to_tsquery(config, q)
+        tsquery = part if tsquery is None else tsquery.op("||")(part)
+    return tsquery
+
+
+async def search_services(db: AsyncSession, q: str, limit: int, category_id: UUID | None = None) -> list[ServiceSearchHit]:
+    """
+    Public services matching q, best first.
+    The GIN index on search_vector finds the matches and ts_rank weighs them with the A/B/C weights
+    of the trigger (title > keywords > description). ts_headline re-parses the text, so it only runs
+    on the page of top hits (with the French parser, stems of both languages are highlighted).
+    """
+    tsquery = build_tsquery(q)
+    rank = func.ts_rank(Service.search_vector, tsquery)
+    top = select(Service.id, rank.label("rank")).where(
+        Service.search_vector.op("@@")(tsquery),
+        Service.is_active == True,
+        Service.is_public == True,
+    )
+    if category_id:
+        top = top.where(Service.category_id.in_(subtree_ids(category_id)))
+    top = top.order_by(desc("rank"), Service.created_at.desc()).limit(limit).subquery()
+
+    result = await db.execute(
+        select(
+            Service,
+            top.c.rank,
+            func.ts_headline(SEARCH_CONFIGS[0], Service.title, tsquery, "HighlightAll=true").label("title_highlight"),
+            func.ts_headline(SEARCH_CONFIGS[0], Service.description, tsquery, HEADLINE_OPTIONS).label("description_highlight"),
+        )
+        .join(top, top.c.id == Service.id)
+        .order_by(top.c.rank.desc(), Service.created_at.desc())
+    )
+    return [
+        ServiceSearchHit(
+            **ServiceOut.model_validate(service).model_dump(),
+            rank=row_rank,
+            title_highlight=title_highlight,
+            description_highlight=description_highlight,
+        )
+        for service, row_rank, title_highlight, description_highlight in result.all()
+    ]
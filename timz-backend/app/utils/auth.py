@@ -1,13 +1,17 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
-from jose import jwt
+import jwt
 from passlib.context import CryptContext
-from uuid import UUID
+from uuid import UUID, uuid4
 from app.core.config import get_settings
+from app.core.constants import TOKEN_ALGORITHM, TOKEN_ISSUER
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
-ALGORITHM = "HS256"
+ALGORITHM = TOKEN_ALGORITHM
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -15,11 +19,28 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with another bcrypt cost than BCRYPT_ROUNDS"""
+    return pwd_context.needs_update(hashed_password)
+
+# Entry points of the password hashing process pool (app/services/password_hasher.py).
+# They return the start/end timestamps so the caller can split queue wait from hash time.
+def timed_password_hash(password: str) -> tuple[str, float, float]:
+    started = time.monotonic()
+    hashed = pwd_context.hash(password)
+    return hashed, started, time.monotonic()
+
+def timed_verify_password(plain_password: str, hashed_password: str) -> tuple[bool, float, float]:
+    started = time.monotonic()
+    valid = pwd_context.verify(plain_password, hashed_password)
+    return valid, started, time.monotonic()
+
 def create_access_token(
     user_id: UUID,
     role: str,
     token_version: int = 0,
-    expires_delta: timedelta = timedelta(minutes=settings.access_token_expire_minutes)
+    expires_delta: timedelta = timedelta(minutes=settings.access_token_expire_minutes),
+    session_id: UUID | None = None,
 ) -> str:
     now = datetime.now(tz=timezone.utc)
     expire = now + expires_delta
@@ -27,11 +48,22 @@ def create_access_token(
         "sub": str(user_id),
         "role": role,
         "token_version": token_version,
+        "jti": uuid4().hex,
         "iat": int(now.timestamp()),
         "exp": int(expire.timestamp()),
-        "iss": "timz-api"
+        "iss": TOKEN_ISSUER
     }
+    if session_id is not None:
+        payload["sid"] = str(session_id)  # refresh-token family the token was issued from
     return jwt.encode(payload, settings.jwt_secret, algorithm=ALGORITHM)
 
 def decode_token(token: str) -> dict:
-    return jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM])
+    """Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError"""
+    return jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM], issuer=TOKEN_ISSUER)
+
+def create_refresh_token() -> str:
+    """Opaque refresh token, only its hash is stored"""
+    return secrets.token_urlsafe(48)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,116 @@
+# app/utils/bookings.py
+
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+MINUTE = timedelta(minutes=1)
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_minute(value: str) -> int:
+    """'HH:MM' -> minutes since midnight ('24:00' is the end of the day)"""
+    hours, minutes = value.split(":")
+    minute = int(hours) * 60 + int(minutes)
+    if not 0 <= minute <= MINUTES_PER_DAY or not 0 <= int(minutes) < 60:
+        raise ValueError(f"Invalid time {value!r}")
+    return minute
+
+
+def compile_week(available_days: dict, breaks: Iterable[dict] = ()) -> np.ndarray:
+    """
+    Weekly schedule as a (7, 1440) boolean array, True on the minutes the pro works.
+    available_days: {"mon": [["09:00", "12:00"], ["13:00", "18:00"]], ...}
+    breaks: [{"start": "12:00", "end": "12:30", "days": ["mon", "tue"]}], every day when days is missing
+    """
+    week = np.zeros((7, MINUTES_PER_DAY), dtype=bool)
+    for day, intervals in available_days.items():
+        weekday = WEEKDAYS.index(day)
+        for start, end in intervals:
+            week[weekday, parse_minute(start):parse_minute(end)] = True
+    for pause in breaks:
+        weekdays = [WEEKDAYS.index(day) for day in pause.get("days") or WEEKDAYS]
+        week[weekdays, parse_minute(pause["start"]):parse_minute(pause["end"])] = False
+    return week
+
+
+def minute_offsets(start_date: date, intervals: Iterable[tuple[datetime, datetime]]) -> np.ndarray:
+    """
+    (start, end) naive wall-clock datetimes -> (n, 2) minute offsets from start_date 00:00,
+    starts rounded down and ends rounded up so a partially busy minute is busy.
+    (The bookings service gets the same offsets computed by Postgres.)
+    """
+    origin = datetime.combine(start_date, datetime.min.time())
+    return np.array(
+        [((start - origin) // MINUTE, -((origin - end) // MINUTE)) for start, end in intervals], dtype=np.int64
+    ).reshape(-1, 2)
+
+
+def _ranges(firsts: np.ndarray, counts: np.ndarray, step: int = 1) -> np.ndarray:
+    """Concatenation of range(first, first + count * step, step) for each pair, without a Python loop"""
+    counts = np.maximum(counts, 0)
+    run_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(firsts, counts) + (np.arange(run_offsets.shape[0]) - run_offsets) * step
+
+
+def free_minutes(
+    week: np.ndarray, start_date: date, days: int, days_off: Iterable[date] = (), busy: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Flat boolean array of the days * 1440 minutes from start_date 00:00, True where the pro is free:
+    the weekly schedule repeated over the window, minus days off and busy (n, 2) minute intervals
+    """
+    weekdays = (start_date.weekday() + np.arange(days)) % 7
+    free = week[weekdays]  # (days, 1440), a copy
+
+    off = [(day - start_date).days for day in days_off]
+    off = [index for index in off if 0 <= index < days]
+    if off:
+        free[off] = False
+    free = free.reshape(-1)
+
+    if busy is not None and len(busy):
+        busy = np.clip(busy, 0, free.shape[0])
+        # only the busy minutes are touched, the cost follows the bookings and not the window
+        free[_ranges(busy[:, 0], busy[:, 1] - busy[:, 0])] = False
+    return free
+
+
+def slot_starts(free: np.ndarray, duration: int, step: int, not_before: int = 0) -> np.ndarray:
+    """
+    Minute offsets t (multiples of step, >= not_before) where free[t:t + duration] is all True.
+    The free minutes are turned into runs [start, end) once; each run then offers the grid
+    points from its first aligned minute up to end - duration.
+    """
+    if duration <= 0 or step <= 0:
+        raise ValueError("duration and step must be positive")
+    edges = np.flatnonzero(np.diff(free, prepend=False, append=False))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    firsts = -(-np.maximum(run_starts, not_before) // step) * step
+    return _ranges(firsts, (run_ends - duration - firsts) // step + 1, step)
+
+
+def available_starts(
+    week: np.ndarray,
+    start_date: date,
+    days: int,
+    duration: int,
+    step: int,
+    days_off: Iterable[date] = (),
+    busy: np.ndarray | None = None,
+    not_before: int = 0,
+) -> np.ndarray:
+    """
+    Bookable start times of a service lasting `duration` minutes over `days` days from
+    start_date, on a grid of `step` minutes, as minute offsets from start_date 00:00 (wall clock).
+    busy: (n, 2) minute offsets of the existing bookings, not_before: first acceptable offset.
+    """
+    free = free_minutes(week, start_date, days, days_off, busy)
+    return slot_starts(free, duration, step, not_before)
+
+
+def offsets_to_datetimes(start_date: date, offsets: np.ndarray) -> list[datetime]:
+    """Minute offsets from start_date 00:00 -> naive wall-clock datetimes"""
+    return (np.datetime64(start_date, "m") + offsets.astype("timedelta64[m]")).tolist()
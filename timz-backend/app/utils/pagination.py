@@ -0,0 +1,87 @@
+# app/utils/pagination.py
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+@dataclass(frozen=True)
+class PageParams:
+    cursor: str | None
+    limit: int
+
+
+def page_params(
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _load(value, python_type):
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    if not isinstance(value, python_type):
+        raise TypeError(value)
+    return value
+
+
+def encode_cursor(values: tuple) -> str:
+    """Opaque cursor: the sort-key values of the last row, as url-safe base64 JSON"""
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, python_types: list[type]) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(python_types):
+            raise ValueError(cursor)
+        return tuple(_load(v, t) for v, t in zip(values, python_types))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(db: AsyncSession, query: Select, keys: list, params: PageParams, descending: bool = True) -> dict:
+    """
+    Keyset pagination of a select of columns (see utils.serialization.projection) on a unique
+    sort key (e.g. created_at, id), which must be among the selected columns.
+    The page starts strictly after the cursor with a row-value comparison, so Postgres walks a
+    composite index from that point instead of counting OFFSET rows. One extra row is fetched to
+    know whether a next page exists.
+    """
+    if params.cursor:
+        values = decode_cursor(params.cursor, [key.type.python_type for key in keys])
+        boundary = tuple_(*keys) < tuple_(*values) if descending else tuple_(*keys) > tuple_(*values)
+        query = query.where(boundary)
+
+    query = query.order_by(*[key.desc() if descending else key.asc() for key in keys]).limit(params.limit + 1)
+    result = await db.execute(query)
+    rows = result.mappings().all()
+
+    items = rows[:params.limit]
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(tuple(last[key.key] for key in keys))
+    return {"items": items, "next_cursor": next_cursor}
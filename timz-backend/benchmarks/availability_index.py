@@ -0,0 +1,77 @@
+"""
+Latency of "which pros are free on this day over this window" with the availability index
+(app.core.availability_index), against the slot engine run pro by pro.
+
+    python -m benchmarks.availability_index
+    python -m benchmarks.availability_index --pros 20000 --candidates 5000 --repeat 200
+
+Every pro gets the same weekly hours and its own random bookings over a 94-day horizon. The
+query asks for a 2-hour window on a saturday for `candidates` pros (the pros of a category).
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.core.availability_index import AvailabilityIndex, pack_minutes
+from app.utils.bookings import available_starts, compile_week, free_minutes
+
+AVAILABLE_DAYS = {
+    **{day: [["09:00", "12:30"], ["13:30", "19:00"]] for day in ("mon", "tue", "wed", "thu", "fri")},
+    "sat": [["09:00", "13:00"]],
+}
+HORIZON = 94
+
+
+def timed(call, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return result, statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main(pros: int, candidates: int, bookings: int, repeat: int):
+    start = date(2026, 11, 2)
+    week = compile_week(AVAILABLE_DAYS)
+    rng = np.random.default_rng(1)
+    index = AvailabilityIndex(horizon_days=HORIZON)
+    index.roll(start)
+    busy = {}
+
+    started = time.perf_counter()
+    for pro in range(pros):
+        offsets = rng.integers(0, HORIZON * 24 * 60, bookings)
+        busy[pro] = np.stack([offsets, offsets + rng.choice([30, 60, 90], bookings)], axis=1)
+        index.set_days(pro, start, pack_minutes(free_minutes(week, start, HORIZON, busy=busy[pro])))
+    print(f"{pros} pros x {HORIZON} days built in {time.perf_counter() - started:.1f} s, {index.stats()['bytes'] / 2**20:.1f} MiB")
+
+    keys = rng.choice(pros, candidates, replace=False).tolist()
+    saturday = start + timedelta(days=12)
+    free, median, p99 = timed(lambda: index.free(keys, saturday, 10 * 12, 12 * 12), repeat)
+    print(f"index: {len(free)}/{candidates} candidates free   median {median:.3f} ms   p99 {p99:.3f} ms")
+
+    def per_pro():
+        # the slot engine asked for a 120-minute slot starting at 10:00 on that day, pro by pro
+        return [
+            pro for pro in keys
+            if 10 * 60 in available_starts(week, saturday, 1, 120, 60, busy=busy[pro] - 12 * 24 * 60).tolist()
+        ]
+
+    slow, median, p99 = timed(per_pro, max(repeat // 20, 3))
+    assert sorted(slow) == sorted(free)
+    print(f"slot engine per pro: median {median:.3f} ms   p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pros", type=int, default=10_000)
+    parser.add_argument("--candidates", type=int, default=2_000)
+    parser.add_argument("--bookings", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.pros, args.candidates, args.bookings, args.repeat)
@@ -0,0 +1,160 @@
+"""
+Load test of the chat WebSocket hub: holds `idle` open connections, then measures the fan-out
+latency of messages published to a conversation with `fanout` subscribed connections.
+
+    python -m benchmarks.chat_fanout
+    python -m benchmarks.chat_fanout --idle 10000 --fanout 500 --messages 200
+
+Starts the app with uvicorn in a subprocess (one worker, the hub is per process) and drives it
+with the websockets client. Needs DATABASE_URL: a client, a pro and their conversation are
+created for the run and deleted at the end. Every connection answers the server pings like a real
+client would. Each side holds one file descriptor per connection: raise `ulimit -n` above
+idle + fanout first.
+
+Latency is measured from the send of a message to its reception by each subscriber (the
+sender's own copy, the acknowledgement, included).
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from uuid import uuid4
+
+import httpx
+import websockets
+
+from app.models import service  # noqa: F401, User.services needs Service mapped
+from app.db.database import SessionLocal
+from app.models.chat import Conversation
+from app.models.user import User
+from app.utils.auth import create_access_token
+
+
+def seed() -> tuple:
+    client_id, pro_id = uuid4(), uuid4()
+    with SessionLocal() as db:
+        for user_id, roles in ((client_id, ["client"]), (pro_id, ["pro"])):
+            db.add(User(id=user_id, email=f"{user_id}@bench.local", hashed_password="x", full_name="Bench", roles=roles))
+        db.flush()
+        conversation = Conversation(client_id=client_id, pro_id=pro_id)
+        db.add(conversation)
+        db.commit()
+        return client_id, pro_id, conversation.id
+
+
+def cleanup(*user_ids) -> None:
+    with SessionLocal() as db:
+        for user_id in user_ids:
+            db.delete(db.get(User, user_id))  # conversation and messages cascade
+        db.commit()
+
+
+def token(user_id, roles) -> str:
+    return create_access_token(user_id=user_id, role=roles, token_version=0, session_id=uuid4())
+
+
+async def keep_alive(ws, inbox: asyncio.Queue | None = None) -> None:
+    """Answer pings, hand the other frames (with their arrival time) to inbox"""
+    try:
+        async for raw in ws:
+            frame = json.loads(raw)
+            if frame["type"] == "ping":
+                await ws.send('{"type":"pong"}')
+            elif inbox is not None:
+                inbox.put_nowait((time.perf_counter(), frame))
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def open_many(url: str, count: int, batch: int = 500) -> list:
+    sockets = []
+    for start in range(0, count, batch):
+        sockets += await asyncio.gather(*(
+            websockets.connect(url, max_queue=None, open_timeout=60) for _ in range(min(batch, count - start))
+        ))
+    return sockets
+
+
+async def run(base: str, idle: int, fanout: int, messages: int, conversation_id, client_token: str) -> None:
+    started = time.perf_counter()
+    idle_sockets = []
+    for start in range(0, idle, 1000):  # many idle users, no conversation joined
+        idle_sockets += await open_many(f"{base}/api/v1/chat/ws?token={token(uuid4(), ['client'])}", min(1000, idle - start))
+    keepers = [asyncio.create_task(keep_alive(ws)) for ws in idle_sockets]
+    print(f"{idle} idle connections open in {time.perf_counter() - started:.1f} s")
+
+    subscribers = await open_many(f"{base}/api/v1/chat/ws?token={client_token}", fanout)
+    inboxes = [asyncio.Queue() for _ in subscribers]
+    keepers += [asyncio.create_task(keep_alive(ws, inbox)) for ws, inbox in zip(subscribers, inboxes)]
+    join = json.dumps({"type": "join", "conversation_id": str(conversation_id)})
+    await asyncio.gather(*(ws.send(join) for ws in subscribers))
+    for inbox in inboxes:
+        _, frame = await inbox.get()
+        assert frame["type"] == "joined", frame
+    print(f"{fanout} connections joined the conversation")
+
+    sender = subscribers[0]
+    deliveries, completions = [], []
+    for i in range(messages):
+        sent_at = time.perf_counter()
+        await sender.send(json.dumps({"type": "message", "conversation_id": str(conversation_id), "message": f"m{i}"}))
+        arrivals = []
+        for inbox in inboxes:
+            received_at, frame = await asyncio.wait_for(inbox.get(), 30)
+            assert frame["type"] == "message" and frame["message"] == f"m{i}", frame
+            arrivals.append((received_at - sent_at) * 1000)
+        deliveries += arrivals
+        completions.append(max(arrivals))
+
+    deliveries.sort()
+    completions.sort()
+    print(f"{messages} messages x {fanout} subscribers, {idle} idle connections alongside")
+    print(f"  per delivery      median {statistics.median(deliveries):.2f} ms   p99 {deliveries[int(len(deliveries) * 0.99) - 1]:.2f} ms")
+    print(f"  whole fan-out     median {statistics.median(completions):.2f} ms   p99 {completions[int(len(completions) * 0.99) - 1]:.2f} ms")
+
+    for ws in idle_sockets + subscribers:
+        await ws.close()
+    await asyncio.gather(*keepers, return_exceptions=True)
+
+
+def main(idle: int, fanout: int, messages: int, port: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < idle + fanout + 100:
+        sys.exit(f"ulimit -n is {hard}, {idle + fanout + 100} file descriptors are needed")
+
+    client_id, pro_id, conversation_id = seed()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--ws", "websockets",
+         "--log-level", "warning", "--backlog", "4096"],
+        env={**os.environ, "CHAT_HEARTBEAT_SECONDS": "20"},
+        preexec_fn=lambda: resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard)),
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        asyncio.run(run(f"ws://127.0.0.1:{port}", idle, fanout, messages, conversation_id, token(client_id, ["client"])))
+        print(httpx.get(f"http://127.0.0.1:{port}/metrics").text.count("timz_chat_hub"), "chat hub metric lines exported")
+    finally:
+        server.terminate()
+        server.wait()
+        cleanup(client_id, pro_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=int, default=10_000)
+    parser.add_argument("--fanout", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    main(args.idle, args.fanout, args.messages, args.port)
@@ -0,0 +1,89 @@
+"""
+Benchmark of app.core.embedding_index at catalog sizes the JSONB embeddings could never serve.
+
+    python -m benchmarks.embedding_index                      # 100k and 1M vectors, dim 384
+    python -m benchmarks.embedding_index --sizes 100000 --dim 768
+
+For each size: bulk load, single-query and batched top-k latency, snapshot save, and
+mmap load + first queries on the snapshot. 1M x 384 float32 is ~1.5 GB of RAM.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.core.embedding_index import EmbeddingIndex
+
+LOAD_BATCH = 100_000
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def latencies_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        _, elapsed = timed(fn)
+        samples.append(elapsed * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def run(size: int, dim: int, k: int, batch: int, repeat: int) -> None:
+    rng = np.random.default_rng(42)
+    index = EmbeddingIndex(dim=dim, capacity=size)
+
+    started = time.perf_counter()
+    for start in range(0, size, LOAD_BATCH):
+        count = min(LOAD_BATCH, size - start)
+        index.add_many(list(range(start, start + count)), rng.standard_normal((count, dim), dtype=np.float32))
+    load_s = time.perf_counter() - started
+
+    queries = rng.standard_normal((batch, dim), dtype=np.float32)
+    index.search(queries[0], k)  # warm-up
+    single_p50, single_p95 = latencies_ms(lambda: index.search(queries[0], k), repeat)
+    batch_p50, _ = latencies_ms(lambda: index.search(queries, k), max(repeat // 4, 3))
+
+    for key in range(0, size, 10):  # 10% tombstones
+        index.remove(key)
+    tomb_p50, _ = latencies_ms(lambda: index.search(queries[0], k), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "services"
+        _, save_s = timed(index.save, path)
+        del index
+        loaded = EmbeddingIndex(dim=dim)
+        _, mmap_s = timed(loaded.load, path, int)
+        _, first_ms = timed(loaded.search, queries[0], k)
+        mmap_p50, _ = latencies_ms(lambda: loaded.search(queries[0], k), repeat)
+        del loaded
+
+    print(f"\n{size:,} vectors x {dim} (float32, {size * dim * 4 / 2**20:,.0f} MiB), top-{k}")
+    print(f"  bulk load            {load_s:8.2f} s   ({size / load_s:,.0f} vectors/s)")
+    print(f"  1 query              p50 {single_p50:8.2f} ms   p95 {single_p95:8.2f} ms")
+    print(f"  {batch} queries batched   {batch_p50:8.2f} ms   ({batch_p50 / batch:.2f} ms/query)")
+    print(f"  1 query, 10% deleted p50 {tomb_p50:8.2f} ms")
+    print(f"  snapshot save        {save_s:8.2f} s")
+    print(f"  snapshot mmap load   {mmap_s * 1000:8.2f} ms, first query {first_ms * 1000:.2f} ms, then p50 {mmap_p50:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.dim, args.k, args.batch, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
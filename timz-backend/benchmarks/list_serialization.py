@@ -0,0 +1,101 @@
+"""
+Rows/second of a 10k-row service list: the ORM + response_model path against the column-projected
+path (Core select + cached TypeAdapter + TypedJSONResponse).
+
+    python -m benchmarks.list_serialization
+    python -m benchmarks.list_serialization --rows 50000 --repeat 3
+
+Needs DATABASE_URL (and DB_ASYNC on, the default): the rows are inserted in a transaction that is
+rolled back at the end, the table is left untouched.
+"""
+import argparse
+import asyncio
+import gc
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import async_engine
+from app.models.service import Service, ServiceCategory
+from app.models.user import User
+from app.schemas.pagination import Page
+from app.schemas.service import ServiceOut
+from app.utils.serialization import TypedJSONResponse, projection
+
+
+async def seed(db: AsyncSession, rows: int):
+    pro_id, category_id = uuid4(), uuid4()
+    now = datetime.utcnow()
+    await db.execute(insert(User).values(id=pro_id, email=f"{pro_id}@bench.local", hashed_password="x",
+                                         full_name="Bench", roles=["pro"], created_at=now, updated_at=now))
+    await db.execute(insert(ServiceCategory).values(id=category_id, name=f"bench-{category_id}", created_at=now))
+    await db.execute(insert(Service), [
+        {
+            "id": uuid4(), "pro_id": pro_id, "category_id": category_id,
+            "title": f"Service {i}", "description": "Coupe, shampoing et brushing " * 3,
+            "base_price": 35.0, "pricing_type": "fixed", "duration": 45, "keywords": ["coupe", "brushing"],
+            "is_active": True, "is_public": True,
+            "created_at": now - timedelta(seconds=i), "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    return pro_id
+
+
+async def orm_path(db: AsyncSession, pro_id) -> bytes:
+    """What the list endpoints did: ORM instances, then FastAPI's response_model serialization"""
+    result = await db.execute(select(Service).where(Service.pro_id == pro_id).order_by(Service.created_at.desc()))
+    content = {"items": result.scalars().all(), "next_cursor": None}
+    field = create_model_field(name="Response", type_=Page[ServiceOut], mode="serialization")
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def projected_path(db: AsyncSession, pro_id) -> bytes:
+    result = await db.execute(
+        select(*projection(Service, ServiceOut)).where(Service.pro_id == pro_id).order_by(Service.created_at.desc())
+    )
+    return TypedJSONResponse(Page[ServiceOut], {"items": result.mappings().all(), "next_cursor": None}).body
+
+
+async def measure(name, fn, db, pro_id, rows, repeat):
+    body = await fn(db, pro_id)  # warm-up (adapters, statement cache)
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()  # no identity-map reuse between runs
+        gc.collect()  # a collection triggered by the previous run would land in this one
+        started = time.perf_counter()
+        await fn(db, pro_id)
+        samples.append(time.perf_counter() - started)
+    best = min(samples)
+    print(f"  {name:28s} {best * 1000:8.1f} ms   {rows / best:10,.0f} rows/s   ({len(body) / 2**20:.1f} MiB)")
+    return best
+
+
+async def main(rows: int, repeat: int):
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            pro_id = await seed(db, rows)
+            print(f"{rows:,} services, best of {repeat}")
+            orm = await measure("ORM + response_model", orm_path, db, pro_id, rows, repeat)
+            projected = await measure("projected + TypeAdapter", projected_path, db, pro_id, rows, repeat)
+            print(f"  speed-up x{orm / projected:.1f}")
+        finally:
+            await db.close()
+            await transaction.rollback()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
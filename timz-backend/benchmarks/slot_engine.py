@@ -0,0 +1,71 @@
+"""
+Latency of the slot engine (app.utils.bookings) for one pro over a 90-day window, the target being
+under 5 ms per call.
+
+    python -m benchmarks.slot_engine
+    python -m benchmarks.slot_engine --days 90 --bookings 600 --repeat 500
+
+The calendar has two open intervals a day on weekdays plus saturday morning, a daily break and
+a few days off; bookings are random and may overlap. Measured: available_starts (free-minute
+array, busy minutes cleared, runs -> aligned start times) on the minute offsets the bookings
+service gets from Postgres; the DB read itself is not included.
+"""
+import argparse
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.utils.bookings import available_starts, compile_week, minute_offsets
+
+AVAILABLE_DAYS = {
+    **{day: [["09:00", "12:30"], ["13:30", "19:00"]] for day in ("mon", "tue", "wed", "thu", "fri")},
+    "sat": [["09:00", "13:00"]],
+}
+BREAKS = [{"start": "16:00", "end": "16:15"}]
+
+
+def random_bookings(start: date, days: int, count: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    origin = datetime.combine(start, datetime.min.time())
+    offsets = rng.integers(0, days * 24 * 60, count)
+    lengths = rng.choice([15, 30, 45, 60, 90], count)
+    return [(origin + timedelta(minutes=int(o)), origin + timedelta(minutes=int(o + n))) for o, n in zip(offsets, lengths)]
+
+
+def main(days: int, bookings: int, duration: int, step: int, repeat: int):
+    start = date(2026, 11, 2)
+    week = compile_week(AVAILABLE_DAYS, BREAKS)
+    busy = minute_offsets(start, random_bookings(start, days, bookings))
+    days_off = [start + timedelta(days=d) for d in (10, 11, 12, 45)]
+    not_before = 10 * 60 + 7
+
+    def call():
+        return available_starts(week, start, days, duration, step, days_off=days_off, busy=busy, not_before=not_before)
+
+    slots = call()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    print(f"{days} days, {bookings} bookings, {duration} min service every {step} min: {len(slots)} slots")
+    print(f"  median {statistics.median(samples):.3f} ms   p99 {samples[int(len(samples) * 0.99) - 1]:.3f} ms"
+          f"   min {samples[0]:.3f} ms   (target < 5 ms)")
+
+    started = time.perf_counter()
+    compile_week(AVAILABLE_DAYS, BREAKS)
+    print(f"  compile_week {1000 * (time.perf_counter() - started):.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--duration", type=int, default=45)
+    parser.add_argument("--step", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.days, args.bookings, args.duration, args.step, args.repeat)
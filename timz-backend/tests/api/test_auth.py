@@ -52,3 +52,53 @@ def test_signup_duplicate_email(client):
 def test_signup_invalid_payload(client, invalid_payload):
     response = client.post("/api/v1/auth/signup", json=invalid_payload)
     assert response.status_code == 422
+
+
+def signup_client(client, email):
+    payload = {
+        "email": email,
+        "full_name": "Refresh User",
+        "password": "secret123",
+        "roles": ["client"],
+    }
+    response = client.post("/api/v1/auth/signup", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+# Rotation: chaque refresh token ne sert qu'une fois
+def test_refresh_rotates_tokens(client):
+    tokens = signup_client(client, f"{uuid4()}@example.com")
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+
+
+# Réutilisation d'un refresh token déjà utilisé → toute la session est révoquée
+def test_refresh_token_reuse_revokes_session(client):
+    tokens = signup_client(client, f"{uuid4()}@example.com")
+    rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    replay = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert replay.status_code == 401
+
+    me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 401
+    again = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert again.status_code == 401
+
+
+def test_logout_revokes_access_and_refresh_tokens(client):
+    tokens = signup_client(client, f"{uuid4()}@example.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 204
+
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
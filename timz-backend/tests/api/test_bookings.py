@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+from app.db.database import SessionLocal
+from app.models.booking import Booking
+from app.models.service import ServiceCategory, ServiceCategoryClosure
+
+CALENDAR = {
+    "timezone": "Europe/Paris",
+    "available_days": {day: [["09:00", "12:00"], ["14:00", "18:00"]] for day in ("mon", "tue", "wed", "thu", "fri")},
+    "breaks": [{"start": "16:00", "end": "16:30"}],
+    "days_off": [],
+    "slot_step_minutes": 30,
+}
+
+
+def signup(client, roles):
+    response = client.post("/api/v1/auth/signup", json={
+        "email": f"{uuid4()}@example.com", "full_name": "Booking Test", "password": "secret123", "roles": roles,
+        "business_name": "Studio",
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def add_rows(*rows):
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+
+
+def add_category():
+    category_id = uuid4()
+    add_rows(ServiceCategory(id=category_id, name=f"booking-{category_id}"))
+    add_rows(ServiceCategoryClosure(ancestor_id=category_id, descendant_id=category_id, depth=0))
+    return category_id
+
+
+def add_booking(pro_id, client_id, starts_at, minutes, status="confirmed"):
+    add_rows(Booking(pro_id=pro_id, client_id=client_id, starts_at=starts_at,
+                     ends_at=starts_at + timedelta(minutes=minutes), status=status))
+
+
+def test_calendar_and_slots(client):
+    pro = signup(client, ["pro"])
+    customer = signup(client, ["client"])
+    headers = {"Authorization": f"Bearer {pro['access_token']}"}
+
+    assert client.get("/api/v1/bookings/calendar", headers=headers).status_code == 404
+    invalid = {**CALENDAR, "available_days": {"mon": [["18:00", "09:00"]]}}
+    assert client.put("/api/v1/bookings/calendar", json=invalid, headers=headers).status_code == 422
+    assert client.put("/api/v1/bookings/calendar", json=CALENDAR,
+                      headers={"Authorization": f"Bearer {customer['access_token']}"}).status_code == 403
+
+    next_monday = (datetime.now(ZoneInfo("Europe/Paris")) + timedelta(days=7)).date()
+    next_monday -= timedelta(days=next_monday.weekday())
+    calendar = {**CALENDAR, "days_off": [str(next_monday + timedelta(days=1))]}
+    response = client.put("/api/v1/bookings/calendar", json=calendar, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["days_off"] == [str(next_monday + timedelta(days=1))]
+
+    category_id = add_category()
+    service = client.post("/api/v1/services/", json={
+        "title": "Coupe", "pricing_type": "fixed", "base_price": 30, "duration": 60, "category_id": str(category_id),
+    }, headers=headers).json()
+
+    tz = ZoneInfo("Europe/Paris")
+    add_booking(pro["user_id"], customer["user_id"], datetime(next_monday.year, next_monday.month, next_monday.day, 10, tzinfo=tz), 60)
+    add_booking(pro["user_id"], customer["user_id"], datetime(next_monday.year, next_monday.month, next_monday.day, 14, tzinfo=tz), 60, status="cancelled")
+
+    response = client.get("/api/v1/bookings/slots", params={"service_id": service["id"], "start": str(next_monday), "days": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["duration"] == 60 and body["timezone"] == "Europe/Paris"
+    slots = [datetime.fromisoformat(slot) for slot in body["slots"]]
+    assert all(slot.date() == next_monday for slot in slots)  # tuesday is a day off
+    assert [slot.strftime("%H:%M") for slot in slots] == ["09:00", "11:00", "14:00", "14:30", "15:00", "16:30", "17:00"]
+    assert slots[0].utcoffset() == tz.utcoffset(slots[0].replace(tzinfo=None))
+
+    assert client.get("/api/v1/bookings/slots", params={"service_id": service["id"], "days": 93}).status_code == 422
+    assert client.get("/api/v1/bookings/slots", params={"service_id": str(uuid4())}).status_code == 404
+
+
+def test_booking_lifecycle_and_conflicts(client):
+    pro = signup(client, ["pro"])
+    customer, other = signup(client, ["client"]), signup(client, ["client"])
+    pro_headers = {"Authorization": f"Bearer {pro['access_token']}"}
+    customer_headers = {"Authorization": f"Bearer {customer['access_token']}"}
+    other_headers = {"Authorization": f"Bearer {other['access_token']}"}
+    assert client.put("/api/v1/bookings/calendar", json=CALENDAR, headers=pro_headers).status_code == 200
+    service = client.post("/api/v1/services/", json={
+        "title": "Coupe", "pricing_type": "fixed", "base_price": 30, "duration": 60, "category_id": str(add_category()),
+    }, headers=pro_headers).json()
+
+    tz = ZoneInfo("Europe/Paris")
+    monday = (datetime.now(tz) + timedelta(days=7)).date()
+    monday -= timedelta(days=monday.weekday())
+
+    def at(hour, minute=0):
+        return datetime(monday.year, monday.month, monday.day, hour, minute, tzinfo=tz).isoformat()
+
+    def book(headers, starts_at):
+        return client.post("/api/v1/bookings/", json={"service_id": service["id"], "starts_at": starts_at}, headers=headers)
+
+    response = book(customer_headers, at(10))
+    assert response.status_code == 201
+    booking = response.json()
+    assert booking["status"] == "pending" and booking["pro_id"] == pro["user_id"]
+    assert datetime.fromisoformat(booking["ends_at"]) - datetime.fromisoformat(booking["starts_at"]) == timedelta(hours=1)
+
+    assert book(other_headers, at(10, 30)).json() == {"detail": "Time slot already booked"}
+    assert book(other_headers, at(9, 30)).status_code == 409
+    assert book(other_headers, at(11)).status_code == 201  # [10:00, 11:00) and [11:00, 12:00) touch, no overlap
+    assert book(other_headers, at(11, 30)).status_code == 409  # runs past 12:00, the end of the morning hours
+    assert book(other_headers, at(15, 45)).status_code == 409  # 16:00-16:30 break
+    assert book(other_headers, "2020-01-06T10:00:00+01:00").status_code == 400
+    assert book(pro_headers, at(14)).status_code == 400
+    assert book(other_headers, "2030-01-06T10:00:00").status_code == 422  # no timezone
+
+    def set_status(headers, status, booking_id=booking["id"]):
+        return client.patch(f"/api/v1/bookings/{booking_id}/status", json={"status": status}, headers=headers)
+
+    assert set_status(other_headers, "cancelled").status_code == 404  # not their booking
+    assert set_status(customer_headers, "confirmed").status_code == 403
+    assert set_status(customer_headers, "completed").status_code == 403
+    assert set_status(pro_headers, "completed").status_code == 409  # still pending
+    assert set_status(pro_headers, "confirmed").json()["status"] == "confirmed"
+    assert book(other_headers, at(10)).status_code == 409
+
+    assert set_status(customer_headers, "cancelled").json()["status"] == "cancelled"
+    assert set_status(customer_headers, "cancelled").json() == {"detail": "Cannot change a cancelled booking to cancelled"}
+    assert book(other_headers, at(10)).status_code == 201  # the cancelled booking freed its slot
+
+    slots = client.get("/api/v1/bookings/slots", params={"service_id": service["id"], "start": str(monday), "days": 1}).json()["slots"]
+    assert [datetime.fromisoformat(slot).strftime("%H:%M") for slot in slots] == ["09:00", "14:00", "14:30", "15:00", "16:30", "17:00"]
+
+
+def test_available_pros_filter(client):
+    category_id = add_category()
+    pros = [signup(client, ["pro"]), signup(client, ["pro"])]
+    customer = signup(client, ["client"])
+    customer_headers = {"Authorization": f"Bearer {customer['access_token']}"}
+    services = []
+    for pro in pros:
+        headers = {"Authorization": f"Bearer {pro['access_token']}"}
+        assert client.put("/api/v1/bookings/calendar", json=CALENDAR, headers=headers).status_code == 200
+        services.append(client.post("/api/v1/services/", json={
+            "title": "Coupe", "pricing_type": "fixed", "base_price": 30, "duration": 60, "category_id": str(category_id),
+        }, headers=headers).json())
+
+    tz = ZoneInfo("Europe/Paris")
+    monday = (datetime.now(tz) + timedelta(days=7)).date()
+    monday -= timedelta(days=monday.weekday())
+
+    def free_services(day, start, end):
+        response = client.get("/api/v1/services/public", params={
+            "category_id": str(category_id), "available_on": str(day), "available_from": start, "available_to": end,
+        })
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-store" and "ETag" not in response.headers
+        return {item["id"] for item in response.json()["items"]}
+
+    both = {service["id"] for service in services}
+    assert free_services(monday, "10:00", "11:00") == both
+    assert free_services(monday, "11:30", "12:30") == set()  # the morning ends at 12:00
+    assert free_services(monday + timedelta(days=5), "10:00", "11:00") == set()  # saturday
+
+    booking = client.post("/api/v1/bookings/", json={
+        "service_id": services[0]["id"], "starts_at": datetime(monday.year, monday.month, monday.day, 10, 15, tzinfo=tz).isoformat(),
+    }, headers=customer_headers).json()
+    assert free_services(monday, "10:00", "11:00") == {services[1]["id"]}
+    assert free_services(monday, "09:00", "10:15") == both
+
+    response = client.patch(f"/api/v1/bookings/{booking['id']}/status", json={"status": "cancelled"}, headers=customer_headers)
+    assert response.status_code == 200
+    assert free_services(monday, "10:00", "11:00") == both
+
+    params = {"category_id": str(category_id), "available_on": str(monday + timedelta(days=365))}
+    assert client.get("/api/v1/services/public", params=params).status_code == 400
+    params = {"available_on": str(monday), "available_from": "12:00", "available_to": "10:00"}
+    assert client.get("/api/v1/services/public", params=params).status_code == 400
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from uuid import UUID, uuid4
+
+from app.api.v1 import chat as chat_routes
+from app.core.chat_hub import IDLE_TIMEOUT
+from app.services.chat import MessageWriter, PendingMessage
+
+
+def signup(client, roles):
+    response = client.post("/api/v1/auth/signup", json={
+        "email": f"{uuid4()}@example.com", "full_name": "Chat Test", "password": "secret123", "roles": roles,
+        "business_name": "Studio",
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def receive(ws, type):
+    """Next frame of this type, skipping pings"""
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] != "ping":
+            assert frame["type"] == type, frame
+            return frame
+
+
+def test_conversations_and_history(client):
+    pro, customer, other = signup(client, ["pro"]), signup(client, ["client"]), signup(client, ["client"])
+    headers = {"Authorization": f"Bearer {customer['access_token']}"}
+
+    response = client.post("/api/v1/chat/conversations", json={"pro_id": pro["user_id"]}, headers=headers)
+    assert response.status_code == 200
+    conversation = response.json()
+    assert conversation["client_id"] == customer["user_id"] and conversation["pro_id"] == pro["user_id"]
+    assert client.post("/api/v1/chat/conversations", json={"pro_id": pro["user_id"]}, headers=headers).json() == conversation
+    assert client.post("/api/v1/chat/conversations", json={"pro_id": other["user_id"]}, headers=headers).status_code == 404
+
+    pro_headers = {"Authorization": f"Bearer {pro['access_token']}"}
+    assert [item["id"] for item in client.get("/api/v1/chat/conversations", headers=pro_headers).json()["items"]] == [conversation["id"]]
+    messages = f"/api/v1/chat/conversations/{conversation['id']}/messages"
+    assert client.get(messages, headers={"Authorization": f"Bearer {other['access_token']}"}).status_code == 404
+    assert client.get(messages, headers=pro_headers).json() == {"items": [], "next_cursor": None}
+
+
+def test_websocket_fan_out(client):
+    pro, customer, other = signup(client, ["pro"]), signup(client, ["client"]), signup(client, ["client"])
+    conversation = client.post("/api/v1/chat/conversations", json={"pro_id": pro["user_id"]},
+                               headers={"Authorization": f"Bearer {customer['access_token']}"}).json()
+
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect("/api/v1/chat/ws?token=garbage"):
+            pass
+    assert rejected.value.code == 1008
+
+    with client.websocket_connect(f"/api/v1/chat/ws?token={customer['access_token']}") as customer_ws, \
+            client.websocket_connect("/api/v1/chat/ws", headers={"Authorization": f"Bearer {pro['access_token']}"}) as pro_ws, \
+            client.websocket_connect(f"/api/v1/chat/ws?token={other['access_token']}") as other_ws:
+        other_ws.send_json({"type": "join", "conversation_id": conversation["id"]})
+        assert receive(other_ws, "error")["detail"] == "Conversation not found"
+        customer_ws.send_json({"type": "message", "conversation_id": conversation["id"], "message": "hi"})
+        assert receive(customer_ws, "error")["detail"] == "Join the conversation first"
+        customer_ws.send_text("not json")
+        assert receive(customer_ws, "error")["detail"] == "Invalid frame"
+
+        for ws in (customer_ws, pro_ws):
+            ws.send_json({"type": "join", "conversation_id": conversation["id"]})
+            assert receive(ws, "joined")["conversation_id"] == conversation["id"]
+
+        customer_ws.send_json({"type": "message", "conversation_id": conversation["id"], "message": "Bonjour", "ref": "c-1"})
+        for ws in (customer_ws, pro_ws):  # the sender's copy is its acknowledgement
+            message = receive(ws, "message")
+            assert message["message"] == "Bonjour" and message["sender_id"] == customer["user_id"]
+            assert message["receiver_id"] == pro["user_id"]
+            assert message["seq"] == 1 and message["ref"] == "c-1"
+
+        pro_ws.send_json({"type": "leave", "conversation_id": conversation["id"]})
+        receive(pro_ws, "left")
+        customer_ws.send_json({"type": "message", "conversation_id": conversation["id"], "message": "Still there?"})
+        assert receive(customer_ws, "message")["seq"] == 2
+        pro_ws.send_json({"type": "join", "conversation_id": conversation["id"]})
+        receive(pro_ws, "joined")
+        pro_ws.send_json({"type": "message", "conversation_id": conversation["id"], "message": "Yes"})
+        assert receive(pro_ws, "message")["seq"] == 3
+
+    pro_headers = {"Authorization": f"Bearer {pro['access_token']}"}
+    messages = f"/api/v1/chat/conversations/{conversation['id']}/messages"
+    history = client.get(messages, headers=pro_headers).json()["items"]
+    assert [(item["seq"], item["message"]) for item in history] == [(3, "Yes"), (2, "Still there?"), (1, "Bonjour")]
+    page = client.get(messages, params={"after_seq": 1, "limit": 1}, headers=pro_headers).json()
+    assert [item["seq"] for item in page["items"]] == [2]
+    page = client.get(messages, params={"after_seq": 1, "cursor": page["next_cursor"]}, headers=pro_headers).json()
+    assert [item["seq"] for item in page["items"]] == [3] and page["next_cursor"] is None
+
+    [mine] = client.get("/api/v1/chat/conversations", headers=pro_headers).json()["items"]
+    assert (mine["last_seq"], mine["unread"], mine["last_read_seq"]) == (3, 2, 0)
+    read = client.post(f"/api/v1/chat/conversations/{conversation['id']}/read", headers=pro_headers).json()
+    assert (read["unread"], read["last_read_seq"]) == (0, 3)
+    [theirs] = client.get("/api/v1/chat/conversations",
+                          headers={"Authorization": f"Bearer {customer['access_token']}"}).json()["items"]
+    assert (theirs["unread"], theirs["last_read_seq"]) == (1, 0)
+
+
+def test_writer_batches_and_numbers_messages(client):
+    pro, customer = signup(client, ["pro"]), signup(client, ["client"])
+    headers = {"Authorization": f"Bearer {customer['access_token']}"}
+    first = client.post("/api/v1/chat/conversations", json={"pro_id": pro["user_id"]}, headers=headers).json()
+    second = client.post("/api/v1/chat/conversations", json={"pro_id": signup(client, ["pro"])["user_id"]}, headers=headers).json()
+    writer = MessageWriter(max_batch=50, flush_interval=0.05, max_pending=121)
+
+    async def scenario():
+        futures = [
+            writer.submit(PendingMessage(
+                conversation_id=UUID(conversation["id"]), sender_id=UUID(customer["user_id"]),
+                receiver_id=UUID(conversation["pro_id"]), to_client=False, message=f"m{i}",
+            ))
+            for i in range(60) for conversation in (first, second)
+        ]
+        gone = writer.submit(PendingMessage(
+            conversation_id=uuid4(), sender_id=UUID(customer["user_id"]), receiver_id=UUID(pro["user_id"]),
+            to_client=False, message="lost",
+        ))
+        assert writer.submit(PendingMessage(
+            conversation_id=uuid4(), sender_id=uuid4(), receiver_id=uuid4(), to_client=False, message="full",
+        )) is None
+        stored = await asyncio.gather(*futures)
+        assert (await gone).seq is None
+        await writer.stop()
+        return stored
+
+    stored = client.portal.call(scenario)
+    assert [message.seq for message in stored[0::2]] == list(range(1, 61))
+    assert [message.seq for message in stored[1::2]] == list(range(1, 61))
+    assert writer.stats() == {"pending": 0, "flushes": 3, "written": 120, "failed": 0, "rejected": 1}
+
+    [item] = client.get("/api/v1/chat/conversations", headers={"Authorization": f"Bearer {pro['access_token']}"}).json()["items"]
+    assert (item["last_seq"], item["unread"]) == (60, 60)
+
+
+def test_heartbeat_and_idle_timeout(client, monkeypatch):
+    customer = signup(client, ["client"])
+    monkeypatch.setattr(chat_routes.settings, "chat_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(chat_routes.settings, "chat_idle_timeout_seconds", 0.3)
+    with client.websocket_connect(f"/api/v1/chat/ws?token={customer['access_token']}") as ws:
+        assert ws.receive_json() == {"type": "ping"}
+        ws.send_json({"type": "pong"})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            while True:
+                assert ws.receive_json() == {"type": "ping"}
+        assert closed.value.code == IDLE_TIMEOUT
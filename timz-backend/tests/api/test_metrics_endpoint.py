@@ -0,0 +1,42 @@
+import re
+from uuid import uuid4
+
+
+def sample(text, name, **labels):
+    """Value of the first sample of name carrying these labels"""
+    for line in text.splitlines():
+        if line.startswith(name + "{") and all(f'{k}="{v}"' in line for k, v in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_metrics_are_recorded_per_route_template(client):
+    signup = client.post("/api/v1/auth/signup", json={
+        "email": f"{uuid4()}@example.com", "full_name": "Metrics", "password": "secret123", "roles": ["pro"],
+    })
+    headers = {"Authorization": f"Bearer {signup.json()['access_token']}"}
+    user_id = signup.json()["user_id"]
+    for _ in range(3):
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    client.get(f"/api/v1/services/{uuid4()}", headers=headers)
+    client.get("/does/not/exist")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    me = {"method": "GET", "route": "/api/v1/auth/me"}
+    assert sample(text, "timz_request_duration_seconds_count", **me) >= 3
+    assert sample(text, "timz_request_db_statements_bucket", le="1", **me) >= 3  # the loader-options query
+    assert sample(text, "timz_request_db_seconds_sum", **me) > 0
+    assert sample(text, "timz_request_pool_wait_seconds_count", **me) >= 3
+    assert sample(text, "timz_response_size_bytes_sum", **me) > 0
+    assert sample(text, "timz_route_slowest_statement_seconds", **me) > 0
+    # templates, not raw paths
+    assert sample(text, "timz_request_duration_seconds_count", route="/api/v1/services/{service_id}") >= 1
+    assert sample(text, "timz_request_duration_seconds_count", route="unmatched") >= 1
+    assert user_id not in text
+    assert re.search(r"^timz_principal_cache_hits_total \d+", text, re.M)
+    assert re.search(r"^timz_password_hasher_completed_total \d+", text, re.M)
+    assert re.search(r"^timz_embedding_index_live \d+", text, re.M)
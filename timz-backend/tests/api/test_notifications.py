@@ -0,0 +1,89 @@
+import time
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, update
+
+from app.core.mail import DeliveryError
+from app.db.database import SessionLocal
+from app.models.notification import Notification
+from app.services.notifications import notification_dispatcher, notify
+
+transport = notification_dispatcher.transport  # FakeTransport, see conftest
+
+
+def signup(client):
+    email = f"{uuid4()}@example.com"
+    response = client.post("/api/v1/auth/signup", json={
+        "email": email, "full_name": "Ada", "password": "secret123", "roles": ["pro"], "business_name": "Studio",
+    })
+    assert response.status_code == 201
+    return email, UUID(response.json()["user_id"])
+
+
+def emails_to(address):
+    return [email for email in transport.sent if email.to == address]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def notifications_of(user_id):
+    with SessionLocal() as db:
+        return db.scalars(select(Notification).where(Notification.user_id == user_id).order_by(Notification.created_at)).all()
+
+
+def test_signup_welcome_email_goes_through_the_outbox(client):
+    address, user_id = signup(client)
+    wait_for(lambda: emails_to(address))
+    [email] = emails_to(address)
+    assert email.subject == "Welcome to Timz" and "Ada" in email.text
+    wait_for(lambda: notifications_of(user_id)[0].delivery_status == "sent")
+    [row] = notifications_of(user_id)
+    assert row.type == "welcome" and row.status == "unread" and row.attempts == 1 and row.sent_at is not None
+
+
+def test_notifications_of_a_recipient_are_sent_as_one_digest(client):
+    address, user_id = signup(client)
+    wait_for(lambda: emails_to(address))
+    with SessionLocal() as db:
+        for i in range(3):
+            notify(db, user_id, "booking", f"Booking {i} confirmed")
+        db.commit()
+    client.portal.call(notification_dispatcher.wake)
+    wait_for(lambda: len(emails_to(address)) == 2)
+    digest = emails_to(address)[1]
+    assert digest.subject == "3 new notifications on Timz"
+    assert digest.text.index("Booking 0") < digest.text.index("Booking 1") < digest.text.index("Booking 2")
+    wait_for(lambda: all(row.delivery_status == "sent" for row in notifications_of(user_id)))
+
+
+def test_failed_sends_are_retried_with_backoff_then_given_up(client):
+    address, user_id = signup(client)
+    wait_for(lambda: emails_to(address))
+    with SessionLocal() as db:
+        retried_id = notify(db, user_id, "booking", "Retried").id
+        db.commit()
+    transport.fail_next(DeliveryError("SendGrid 503"))
+    client.portal.call(notification_dispatcher.wake)
+    wait_for(lambda: notifications_of(user_id)[-1].last_error is not None)
+    row = notifications_of(user_id)[-1]
+    assert (row.delivery_status, row.attempts, row.last_error) == ("pending", 1, "SendGrid 503")
+    # half to all of NOTIFICATION_BACKOFF_SECONDS (30 s) after the first failure
+    assert datetime.utcnow() + timedelta(seconds=10) < row.next_attempt_at < datetime.utcnow() + timedelta(seconds=31)
+
+    with SessionLocal() as db:  # the backoff is over
+        db.execute(update(Notification).where(Notification.id == retried_id).values(next_attempt_at=datetime.utcnow()))
+        notify(db, user_id, "booking", "Rejected")
+        db.commit()
+    transport.fail_next(DeliveryError("SendGrid 400", retryable=False))
+    client.portal.call(notification_dispatcher.wake)
+    wait_for(lambda: all(row.delivery_status != "pending" for row in notifications_of(user_id)))
+    assert [(row.message, row.delivery_status) for row in notifications_of(user_id)[1:]] == [
+        ("Retried", "failed"), ("Rejected", "failed"),
+    ]
+    assert len(emails_to(address)) == 1  # the welcome email only
@@ -0,0 +1,215 @@
+import numpy as np
+import pytest
+from uuid import uuid4
+
+from app.db.database import SessionLocal
+from app.models.service import ServiceCategory, ServiceCategoryClosure
+
+
+@pytest.fixture
+def category_id():
+    db = SessionLocal()
+    try:
+        category = ServiceCategory(id=uuid4(), name=f"category-{uuid4()}")
+        db.add(category)
+        db.add(ServiceCategoryClosure(ancestor_id=category.id, descendant_id=category.id, depth=0))
+        db.commit()
+        return str(category.id)
+    finally:
+        db.close()
+
+
+def signup_pro(client, roles=("pro",)):
+    payload = {
+        "email": f"{uuid4()}@example.com",
+        "full_name": "Pro User",
+        "password": "secret123",
+        "business_name": "Salon",
+        "roles": list(roles),
+    }
+    response = client.post("/api/v1/auth/signup", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def create_services(client, headers, category_id, count):
+    for i in range(count):
+        payload = {"title": f"Service {i}", "pricing_type": "quote", "category_id": category_id}
+        response = client.post("/api/v1/services/", json=payload, headers=headers)
+        assert response.status_code == 201
+
+
+def collect_pages(client, url, headers=None, limit=2, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **filters}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= limit
+        ids += [item["id"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids, pages
+
+
+def test_my_services_keyset_pages(client, category_id):
+    tokens = signup_pro(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    create_services(client, headers, category_id, 5)
+
+    ids, pages = collect_pages(client, "/api/v1/services/", headers)
+    assert len(ids) == 5 and len(set(ids)) == 5
+    assert pages == 3
+
+
+def test_public_services_keyset_pages(client, category_id):
+    tokens = signup_pro(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    create_services(client, headers, category_id, 3)
+
+    ids, _ = collect_pages(client, "/api/v1/services/public", pro_id=tokens["user_id"])
+    assert len(set(ids)) == 3
+
+
+def test_page_size_and_cursor_are_validated(client):
+    assert client.get("/api/v1/services/public", params={"limit": 1000}).status_code == 422
+    assert client.get("/api/v1/services/public", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_search_ranks_title_above_keywords_and_description(client, category_id):
+    tokens = signup_pro(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    tag = "tz" + uuid4().hex[:8]  # a leading digit can make the parser split it (e.g. "3e45" is a float)
+    services = [
+        {"title": f"Soin {tag}", "description": "Coupe et brushing"},
+        {"title": "Balayage", "keywords": [f"{tag}"], "description": "Couleur"},
+        {"title": "Manucure", "description": f"Pose de vernis {tag}"},
+    ]
+    for service in services:
+        payload = {"pricing_type": "quote", "category_id": category_id, **service}
+        assert client.post("/api/v1/services/", json=payload, headers=headers).status_code == 201
+
+    response = client.get("/api/v1/services/search", params={"q": tag})
+    assert response.status_code == 200
+    hits = response.json()
+    assert [hit["title"] for hit in hits] == [f"Soin {tag}", "Balayage", "Manucure"]
+    assert f"<b>{tag}</b>" in hits[0]["title_highlight"]
+    assert f"<b>{tag}</b>" in hits[2]["description_highlight"]
+
+
+def test_search_stems_french_and_english(client, category_id):
+    tokens = signup_pro(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    payload = {"title": "Coiffures de mariage", "description": "Wedding hairstyles and makeup",
+               "pricing_type": "quote", "category_id": category_id}
+    assert client.post("/api/v1/services/", json=payload, headers=headers).status_code == 201
+
+    for q in ("coiffure mariage", "wedding hairstyle"):
+        titles = [hit["title"] for hit in client.get("/api/v1/services/search", params={"q": q}).json()]
+        assert "Coiffures de mariage" in titles
+
+
+def test_similar_services(client, category_id):
+    from app.core.config import get_settings
+    dim = get_settings().embedding_dim
+    tokens = signup_pro(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    rng = np.random.default_rng()
+    reference = rng.normal(size=dim)
+    vectors = {"reference": reference, "close": reference + rng.normal(scale=0.1, size=dim), "far": rng.normal(size=dim)}
+
+    ids = {}
+    for title, vector in vectors.items():
+        payload = {"title": title, "pricing_type": "quote", "category_id": category_id, "embedding": vector.tolist()}
+        response = client.post("/api/v1/services/", json=payload, headers=headers)
+        assert response.status_code == 201
+        ids[title] = response.json()["id"]
+
+    response = client.get(f"/api/v1/services/{ids['reference']}/similar", params={"k": 2})
+    assert response.status_code == 200
+    hits = response.json()
+    assert hits[0]["id"] == ids["close"]
+    assert ids["reference"] not in [hit["id"] for hit in hits]
+    assert hits[0]["score"] > 0.8
+
+    bad = {"title": "bad", "pricing_type": "quote", "category_id": category_id, "embedding": [1.0, 2.0]}
+    assert client.post("/api/v1/services/", json=bad, headers=headers).status_code == 400
+    assert client.get(f"/api/v1/services/{uuid4()}/similar").status_code == 404
+
+
+def test_category_subtree_filter_and_tree(client):
+    tokens = signup_pro(client, roles=["pro", "admin"])
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    tag = uuid4().hex[:8]
+
+    def create_category(name, parent_id=None):
+        response = client.post("/api/v1/services/categories", json={"name": f"{name} {tag}", "parent_id": parent_id}, headers=headers)
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    beauty = create_category("Beauty")
+    hair = create_category("Hair", beauty)
+    color = create_category("Color", hair)
+    sport = create_category("Sport")
+    for category in (beauty, hair, color, sport):
+        create_services(client, headers, category, 1)
+
+    ids, _ = collect_pages(client, "/api/v1/services/public", limit=10, category_id=beauty)
+    assert len(ids) == 3
+    ids, _ = collect_pages(client, "/api/v1/services/public", limit=10, category_id=hair)
+    assert len(ids) == 2
+
+    tree = {node["id"]: node for node in client.get("/api/v1/services/categories").json()}
+    assert sport in tree and hair not in tree
+    assert tree[beauty]["children"][0]["id"] == hair
+    assert tree[beauty]["children"][0]["children"][0]["id"] == color
+
+    response = client.post("/api/v1/services/categories", json={"name": f"Orphan {tag}", "parent_id": str(uuid4())}, headers=headers)
+    assert response.status_code == 404
+
+
+class NoDB:
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("a 304 must not query the database")
+
+
+def test_conditional_get_on_catalog(client):
+    from app.main import app
+    from app.db.database import get_async_db
+
+    tokens = signup_pro(client, roles=["pro", "admin"])
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    client.post("/api/v1/services/categories", json={"name": f"Cached {uuid4()}"}, headers=headers)
+
+    first = client.get("/api/v1/services/categories")
+    etag = first.headers["etag"]
+    assert "s-maxage" in first.headers["cache-control"]
+
+    async def no_db():
+        yield NoDB()
+
+    app.dependency_overrides[get_async_db] = no_db
+    try:
+        cached = client.get("/api/v1/services/categories", headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["etag"] == etag
+        since = client.get("/api/v1/services/categories", headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert since.status_code == 304
+    finally:
+        app.dependency_overrides.pop(get_async_db)
+
+    response = client.post("/api/v1/services/categories", json={"name": f"Cached {uuid4()}"}, headers=headers)
+    category_id = response.json()["id"]
+    changed = client.get("/api/v1/services/categories", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert category_id in [node["id"] for node in changed.json()]
+
+    public_etag = client.get("/api/v1/services/public").headers["etag"]
+    assert client.get("/api/v1/services/public", headers={"If-None-Match": public_etag}).status_code == 304
+    create_services(client, headers, category_id, 1)
+    assert client.get("/api/v1/services/public", headers={"If-None-Match": public_etag}).status_code == 200
@@ -0,0 +1,77 @@
+from uuid import uuid4
+
+
+def signup(client, roles, **extra):
+    payload = {
+        "email": f"{uuid4()}@example.com",
+        "full_name": "Listed User",
+        "password": "secret123",
+        "roles": roles,
+        **extra,
+    }
+    response = client.post("/api/v1/auth/signup", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_admin_lists_users_with_profiles(client):
+    admin = signup(client, ["admin"])
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    both = signup(client, ["client", "pro"], business_name="Studio",
+                  address={"street": "1 rue Test", "city": "Paris", "postal_code": "75000", "country": "FR"})
+
+    users, cursor = {}, None
+    while True:
+        params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/users/", params=params, headers=headers).json()
+        users.update({user["id"]: user for user in page["items"]})
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert users[admin["user_id"]]["profile_client"] is None
+    assert users[admin["user_id"]]["profile_pro"] is None
+    listed = users[both["user_id"]]
+    assert listed["profile_pro"]["business_name"] == "Studio"
+    assert listed["profile_pro"]["address"]["city"] == "Paris"
+    assert listed["profile_client"] is not None
+
+    pros = client.get("/api/v1/users/", params={"role": "pro", "limit": 100}, headers=headers).json()["items"]
+    assert all("pro" in user["roles"] for user in pros)
+
+
+# -- query count: the number of statements of an endpoint must not depend on the result size --
+
+def test_user_list_query_count_is_fixed(client, count_queries):
+    admin = signup(client, ["admin"])
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    for i in range(6):
+        signup(client, ["client", "pro"], business_name=f"Studio {i}")
+
+    counts = []
+    for limit in (1, 5, 100):
+        with count_queries() as statements:
+            response = client.get("/api/v1/users/", params={"limit": limit}, headers=headers)
+        assert response.status_code == 200
+        assert min(limit, 7) <= len(response.json()["items"]) <= limit
+        counts.append(len(statements))
+    assert counts == [1, 1, 1]
+
+
+def test_user_details_load_profiles_in_one_query(client, count_queries):
+    admin = signup(client, ["admin"])
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    user = signup(client, ["client", "pro"], business_name="Studio")
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/users/{user['user_id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["profile_pro"]["business_name"] == "Studio"
+    assert response.json()["profile_client"] is not None
+    assert len(statements) == 1
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {user['access_token']}"})
+    assert response.status_code == 200
+    assert response.json()["profile_pro"]["business_name"] == "Studio"
+    assert len(statements) == 1
@@ -1,7 +1,44 @@
+import os
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ.setdefault("NOTIFICATION_TRANSPORT", "fake")  # before the app's settings are read
+
+from app.db.database import async_engine, engine
+from app.db.instrumentation import current_request_stats
 from app.main import app
 
 @pytest.fixture
 def client():
-    return TestClient(app)
+    # context manager keeps one event loop for the whole test, the asyncpg pool is bound to it
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def count_queries():
+    """
+    with count_queries() as statements: ... collects the SQL statements sent meanwhile by requests
+    (not by background tasks such as the notification dispatcher), on the engine the routers use
+    (async or sync, see DB_ASYNC)
+    """
+    target = async_engine.sync_engine if async_engine is not None else engine
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if current_request_stats.get() is not None:
+                statements.append(statement)
+
+        event.listen(target, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(target, "before_cursor_execute", record)
+
+    return counting
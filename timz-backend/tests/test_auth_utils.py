@@ -1,5 +1,6 @@
 from app.utils.auth import *
 from datetime import timedelta
+from uuid import uuid4
 import time
 import pytest
 
@@ -30,3 +31,20 @@ def test_token_expiration():
 
     with pytest.raises(Exception):
         decode_token(token)
+
+def test_access_token_carries_jti_and_session():
+    session_id = uuid4()
+    first = decode_token(create_access_token(user_id=1, role=["client"], session_id=session_id))
+    second = decode_token(create_access_token(user_id=1, role=["client"]))
+
+    assert first["sid"] == str(session_id)
+    assert "sid" not in second
+    assert first["jti"] != second["jti"]
+
+def test_refresh_token_is_stored_hashed():
+    token = create_refresh_token()
+
+    assert len(token) > 40
+    assert hash_refresh_token(token) == hash_refresh_token(token)
+    assert hash_refresh_token(token) != token
+    assert hash_refresh_token(token) != hash_refresh_token(create_refresh_token())
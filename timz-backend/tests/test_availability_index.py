@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.core.availability_index import BLOCKS_PER_DAY, BYTES_PER_DAY, AvailabilityIndex, pack_minutes
+from app.utils.bookings import compile_week, free_minutes
+
+MONDAY = date(2026, 11, 2)
+WEEK = compile_week({day: [["09:00", "12:00"], ["14:00", "18:00"]] for day in ("mon", "tue", "wed", "thu", "fri")})
+
+
+def blocks(hour, minute=0):
+    return (hour * 60 + minute) // 5
+
+
+def index_with(pros, days=7, busy=None):
+    index = AvailabilityIndex(horizon_days=days, capacity=2)
+    index.roll(MONDAY)
+    for pro in pros:
+        index.set_days(pro, MONDAY, pack_minutes(free_minutes(WEEK, MONDAY, days, busy=(busy or {}).get(pro))))
+    return index
+
+
+def test_pack_minutes_needs_whole_free_blocks():
+    free = np.zeros(2 * 24 * 60, dtype=bool)
+    free[600:630] = True  # 10:00-10:30
+    free[700:703] = True  # part of a block only
+    packed = pack_minutes(free)
+    assert packed.shape == (2, BYTES_PER_DAY)
+    assert np.flatnonzero(np.unpackbits(packed[0])).tolist() == list(range(blocks(10), blocks(10, 30)))
+    assert not packed[1].any()
+
+
+def test_free_matches_the_minute_arrays():
+    rng = np.random.default_rng(0)
+    pros = [f"p{i}" for i in range(50)]
+    busy = {}
+    for pro in pros:
+        starts = rng.integers(0, 7 * 24 * 60, 20)
+        busy[pro] = np.stack([starts, starts + rng.choice([15, 30, 60], 20)], axis=1)
+    index = index_with(pros, busy=busy)
+
+    for day in range(7):
+        for first, end in [(blocks(9), blocks(10)), (blocks(10), blocks(12)), (blocks(14, 30), blocks(14, 45))]:
+            expected = [
+                pro for pro in pros
+                if free_minutes(WEEK, MONDAY, 7, busy=busy[pro]).reshape(7, -1)[day, first * 5:end * 5].all()
+            ]
+            assert index.free(pros, MONDAY + timedelta(days=day), first, end) == expected
+
+
+def test_mark_busy_across_midnight_and_remove():
+    index = AvailabilityIndex(horizon_days=3)
+    index.roll(MONDAY)
+    index.set_days("a", MONDAY, np.full((3, BYTES_PER_DAY), 255, dtype=np.uint8))
+    index.mark_busy("a", MONDAY, 23 * 60 + 2, 24 * 60 + 9)  # widened to 23:00-00:10
+    assert index.free_blocks(["a"], MONDAY, 0, BLOCKS_PER_DAY) == {"a": BLOCKS_PER_DAY - 12}
+    assert index.free(["a"], MONDAY, blocks(22), blocks(23)) == ["a"]
+    assert index.free(["a", "unknown"], MONDAY + timedelta(days=1), 0, blocks(0, 10)) == []
+    assert index.free(["a"], MONDAY + timedelta(days=1), blocks(0, 10), blocks(1)) == ["a"]
+    assert index.free(["a"], MONDAY + timedelta(days=3), 0, 1) == []  # outside the horizon
+
+    assert index.remove("a") and "a" not in index
+    index.set_days("b", MONDAY, np.zeros((1, BYTES_PER_DAY), dtype=np.uint8))
+    assert index.free(["b"], MONDAY + timedelta(days=1), 0, 1) == []  # reused row starts busy
+
+
+def test_roll_keeps_overlapping_days():
+    index = index_with(["a"])
+    assert index.roll(MONDAY) == 0
+    assert index.roll(MONDAY + timedelta(days=2)) == 2
+    assert index.free(["a"], MONDAY + timedelta(days=4), blocks(9), blocks(12)) == ["a"]  # friday kept
+    assert index.free(["a"], MONDAY + timedelta(days=7), blocks(9), blocks(12)) == []  # new monday, not filled
+    index.set_days("a", MONDAY + timedelta(days=7), pack_minutes(free_minutes(WEEK, MONDAY, 1)))
+    assert index.free(["a"], MONDAY + timedelta(days=7), blocks(9), blocks(12)) == ["a"]
+    assert index.roll(MONDAY + timedelta(days=30)) == 7
+    assert index.free_blocks(["a"], MONDAY + timedelta(days=30), 0, BLOCKS_PER_DAY) == {"a": 0}
+
+
+def test_rows_grow_past_capacity():
+    pros = [f"p{i}" for i in range(5)]
+    index = index_with(pros)
+    assert len(index) == 5 and index.stats()["pros"] == 5
+    assert index.free(pros, MONDAY, blocks(9), blocks(12)) == pros
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from app.db.database import SessionLocal, async_engine
+from app.main import app
+from app.models.booking import Booking, Calendar
+from app.models.service import Service, ServiceCategory
+from app.models.user import User
+from app.utils.auth import create_access_token
+
+RACERS = 300
+
+
+def setup_pro_and_clients(count):
+    """A pro with a calendar and a 60-minute service, and `count` clients with access tokens"""
+    now = datetime.utcnow()
+    pro_id, category_id, service_id = uuid4(), uuid4(), uuid4()
+    clients = [uuid4() for _ in range(count)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"id": user_id, "email": f"{user_id}@race.local", "hashed_password": "x", "full_name": "Racer",
+             "roles": roles, "created_at": now, "updated_at": now}
+            for user_id, roles in [(pro_id, ["pro"])] + [(client_id, ["client"]) for client_id in clients]
+        ])
+        db.add(ServiceCategory(id=category_id, name=f"race-{category_id}"))
+        db.add(Calendar(pro_id=pro_id, available_days={"mon": [["08:00", "20:00"]]}, breaks=[], days_off=[]))
+        db.flush()
+        db.add(Service(id=service_id, pro_id=pro_id, category_id=category_id, title="Race", pricing_type="fixed",
+                       duration=60, is_active=True, is_public=True))
+        db.commit()
+    tokens = [create_access_token(user_id=client_id, role=["client"]) for client_id in clients]
+    return pro_id, service_id, tokens
+
+
+async def race(service_id, tokens, starts):
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*[
+                http.post("/api/v1/bookings/", json={"service_id": str(service_id), "starts_at": starts_at},
+                          headers={"Authorization": f"Bearer {token}"})
+                for token, starts_at in zip(tokens, starts)
+            ])
+    finally:
+        if async_engine is not None:
+            await async_engine.dispose()  # its pool is bound to this event loop
+
+
+def test_concurrent_clients_racing_for_a_slot_get_exactly_one_booking():
+    pro_id, service_id, tokens = setup_pro_and_clients(RACERS)
+    tz = ZoneInfo("Europe/Paris")
+    monday = (datetime.now(tz) + timedelta(days=7)).date()
+    monday -= timedelta(days=monday.weekday())
+    # every request overlaps every other one: 60 minutes starting 10:00, 10:15, 10:30 or 10:45
+    starts = [datetime(monday.year, monday.month, monday.day, 10, 15 * (i % 4), tzinfo=tz).isoformat() for i in range(RACERS)]
+
+    responses = asyncio.run(race(service_id, tokens, starts))
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == RACERS - 1
+    assert {response.json()["detail"] for response in responses if response.status_code == 409} == {"Time slot already booked"}
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Booking).where(Booking.pro_id == pro_id)) == 1
@@ -0,0 +1,71 @@
+import asyncio
+from collections import namedtuple
+from datetime import datetime
+from uuid import uuid4
+
+from app.services.categories import CategoryTreeCache
+
+Row = namedtuple("Row", "id name created_at parent_id")
+
+
+def test_build_nests_in_one_pass():
+    now = datetime.utcnow()
+    root, child, grandchild, other = uuid4(), uuid4(), uuid4(), uuid4()
+    # a child may come before its parent in the rows (they are ordered by name)
+    rows = [
+        Row(grandchild, "A grandchild", now, child),
+        Row(root, "B root", now, None),
+        Row(child, "C child", now, root),
+        Row(other, "D other root", now, None),
+    ]
+    tree = CategoryTreeCache.build(rows)
+    assert [node["id"] for node in tree] == [root, other]
+    assert tree[0]["children"][0]["id"] == child
+    assert tree[0]["children"][0]["children"][0]["id"] == grandchild
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return FakeResult(self.rows)
+
+
+def test_cache_invalidation_and_ttl():
+    now = [0.0]
+    cache = CategoryTreeCache(ttl=60, timer=lambda: now[0])
+    db = FakeDB()
+
+    assert asyncio.run(cache.get_json(db)) == b"[]"
+    asyncio.run(cache.get_json(db))
+    assert db.queries == 1
+
+    db.rows = [Row(uuid4(), "New", datetime.utcnow(), None)]
+    cache.invalidate()
+    assert b"New" in asyncio.run(cache.get_json(db))
+    assert db.queries == 2
+
+    now[0] = 61
+    asyncio.run(cache.get_json(db))
+    assert db.queries == 3
+
+
+def test_cache_rebuilds_on_new_version():
+    cache = CategoryTreeCache(ttl=60, timer=lambda: 0.0)
+    db = FakeDB()
+    asyncio.run(cache.get_json(db, version='"v1"'))
+    asyncio.run(cache.get_json(db, version='"v1"'))
+    assert db.queries == 1
+    asyncio.run(cache.get_json(db, version='"v2"'))
+    assert db.queries == 2
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.core.chat_hub import SLOW_CONSUMER, ChatHub
+
+
+def test_publish_fans_out_to_subscribers_only():
+    async def scenario():
+        hub = ChatHub(queue_size=4)
+        alice, bob, carol = hub.connect("alice"), hub.connect("bob"), hub.connect("carol")
+        hub.subscribe(alice, "c1", "bob")
+        hub.subscribe(bob, "c1", "alice")
+        hub.subscribe(carol, "c2")
+
+        assert hub.publish("c1", "hello") == 2
+        assert alice.queue.get_nowait() == bob.queue.get_nowait() == "hello"
+        assert carol.queue.empty()
+
+        hub.unsubscribe(bob, "c1")
+        assert hub.publish("c1", "again") == 1 and bob.queue.empty()
+        hub.disconnect(alice)
+        assert hub.publish("c1", "nobody") == 0
+        assert hub.stats() == {"connections": 2, "conversations": 1, "published": 3, "delivered": 3, "dropped": 0}
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_dropped_without_blocking_the_others():
+    async def scenario():
+        hub = ChatHub(queue_size=2)
+        fast, slow = hub.connect("fast"), hub.connect("slow")
+        hub.subscribe(fast, "c")
+        hub.subscribe(slow, "c")
+        for i in range(3):
+            hub.publish("c", f"m{i}")
+            fast.queue.get_nowait()  # fast keeps up
+
+        # the third frame overflowed: pending frames discarded, the sender task gets the None sentinel
+        assert slow.close_code == SLOW_CONSUMER
+        assert slow.queue.get_nowait() is None and slow.queue.empty()
+        assert hub.subscribers("c") == 1 and "c" not in slow.conversations
+        assert hub.publish("c", "m3") == 1
+        assert hub.stats()["dropped"] == 1 and hub.stats()["connections"] == 1
+
+    asyncio.run(scenario())
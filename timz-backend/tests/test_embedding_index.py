@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from app.core import embedding_index
+from app.core.embedding_index import EmbeddingIndex
+
+
+def random_vectors(n, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def brute_force(vectors, keys, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores)[:k]
+    return [keys[i] for i in order]
+
+
+def test_search_matches_brute_force_across_chunks(monkeypatch):
+    monkeypatch.setattr(embedding_index, "SEARCH_CHUNK_ROWS", 7)
+    vectors = random_vectors(100)
+    keys = [f"s{i}" for i in range(100)]
+    index = EmbeddingIndex(dim=8, capacity=4)
+    index.add_many(keys[:50], vectors[:50])
+    index.add_many(keys[50:], vectors[50:])
+
+    queries = random_vectors(3, seed=1)
+    results = index.search(queries, k=5)
+    for query, hits in zip(queries, results):
+        assert [key for key, _ in hits] == brute_force(vectors, keys, query, 5)
+        scores = [score for _, score in hits]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_remove_replace_and_exclude():
+    vectors = random_vectors(10)
+    index = EmbeddingIndex(dim=8)
+    index.add_many(list(range(10)), vectors)
+
+    assert index.search(vectors[3], k=1)[0][0][0] == 3
+    assert index.remove(3)
+    assert not index.remove(3)
+    assert 3 not in [key for key, _ in index.search(vectors[3], k=10)[0]]
+
+    index.add(4, vectors[3])  # replace: the old row of 4 is tombstoned
+    assert index.search(vectors[3], k=1)[0][0][0] == 4
+    assert index.stats() == {"live": 9, "rows": 11, "tombstones": 2, "snapshot_rows": 0}
+
+    hits = index.search(vectors[3], k=3, exclude=[4])[0]
+    assert len(hits) == 3 and 4 not in [key for key, _ in hits]
+
+
+def test_rejects_wrong_dimension_and_zero_vector():
+    index = EmbeddingIndex(dim=8)
+    with pytest.raises(ValueError):
+        index.add("a", np.ones(4))
+    with pytest.raises(ValueError):
+        index.add("a", np.zeros(8))
+
+
+def test_snapshot_is_memory_mapped_and_appendable(tmp_path):
+    vectors = random_vectors(20)
+    index = EmbeddingIndex(dim=8)
+    index.add_many([f"s{i}" for i in range(20)], vectors)
+    index.remove("s0")
+    assert index.save(tmp_path / "services") == 19
+
+    loaded = EmbeddingIndex(dim=8)
+    assert loaded.load(tmp_path / "services") is not None
+    assert isinstance(loaded._base, np.memmap)
+    assert len(loaded) == 19 and "s0" not in loaded
+
+    loaded.add("new", vectors[0])
+    loaded.remove("s5")
+    assert loaded.search(vectors[0], k=1)[0][0][0] == "new"
+    assert loaded.stats() == {"live": 19, "rows": 20, "tombstones": 1, "snapshot_rows": 19}
+
+
+def test_load_rejects_other_dimension(tmp_path):
+    index = EmbeddingIndex(dim=8)
+    index.add("a", np.ones(8))
+    index.save(tmp_path / "services")
+    assert EmbeddingIndex(dim=16).load(tmp_path / "services") is None
+    assert EmbeddingIndex(dim=8).load(tmp_path / "missing") is None
+
+
+def test_compact_drops_tombstones():
+    vectors = random_vectors(10)
+    index = EmbeddingIndex(dim=8)
+    index.add_many(list(range(10)), vectors)
+    for key in range(5):
+        index.remove(key)
+    assert index.compact()
+    assert index.stats() == {"live": 5, "rows": 5, "tombstones": 0, "snapshot_rows": 0}
+    assert index.search(vectors[7], k=1)[0][0][0] == 7
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.mail import DeliveryError, Email, FakeTransport, SendGridTransport
+
+EMAIL = Email(to="ada@example.com", subject="Hi", text="Hello")
+
+
+def test_sendgrid_request_and_error_mapping():
+    requests, statuses = [], [202, 202, 503, 429, 400]
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(statuses[len(requests) - 1], text="bad request")
+
+    transport = SendGridTransport("key", "no-reply@timz.app", max_connections=2, timeout=5,
+                                  http_transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        await transport.send(EMAIL)
+        client = transport._get_client()
+        await transport.send(EMAIL)
+        assert transport._get_client() is client  # one pooled client for every send
+        outcomes = []
+        for _ in range(3):
+            with pytest.raises(DeliveryError) as error:
+                await transport.send(EMAIL)
+            outcomes.append(error.value.retryable)
+        await transport.aclose()
+        return outcomes
+
+    assert asyncio.run(scenario()) == [True, True, False]
+    assert requests[0].url == "https://api.sendgrid.com/v3/mail/send"
+    assert requests[0].headers["authorization"] == "Bearer key"
+    body = httpx.Response(200, content=requests[0].content).json()
+    assert body["personalizations"] == [{"to": [{"email": "ada@example.com"}]}]
+    assert body["from"] == {"email": "no-reply@timz.app"} and body["subject"] == "Hi"
+
+
+def test_sendgrid_network_error_is_retryable():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    transport = SendGridTransport("key", "no-reply@timz.app", max_connections=1, timeout=5,
+                                  http_transport=httpx.MockTransport(handler))
+    with pytest.raises(DeliveryError) as error:
+        asyncio.run(transport.send(EMAIL))
+    assert error.value.retryable
+
+
+def test_fake_transport_records_and_fails_on_demand():
+    transport = FakeTransport()
+    transport.fail_next(DeliveryError("down"))
+    with pytest.raises(DeliveryError):
+        asyncio.run(transport.send(EMAIL))
+    asyncio.run(transport.send(EMAIL))
+    assert transport.sent == [EMAIL]
@@ -0,0 +1,57 @@
+from app.core.metrics import Counter, Histogram, Registry
+from app.core.request_metrics import n_plus_one, record_request
+from app.db.instrumentation import RequestStats, fingerprint
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("demo_seconds", "Demo", (0.1, 1.0), ("route",)))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, "/a")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP demo_seconds Demo", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{route="/a"} 4' in lines
+    assert 'demo_seconds_sum{route="/a"} 4.25' in lines
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.register(Counter("demo_total", "Demo", ("statement",)))
+    counter.inc('SELECT "x"\nFROM t')
+    assert 'demo_total{statement="SELECT \\"x\\"\\nFROM t"} 1' in registry.render()
+
+
+def test_stats_dicts_are_exposed():
+    registry = Registry()
+    stats = {"hits": 3, "size": 7, "name": "ignored"}
+    registry.register_stats("demo", lambda: stats, counters=["hits"])
+    stats["hits"] = 4
+    rendered = registry.render()
+    assert "# TYPE timz_demo_hits_total counter\ntimz_demo_hits_total 4" in rendered
+    assert "# TYPE timz_demo_size gauge\ntimz_demo_size 7" in rendered
+    assert "name" not in rendered
+
+
+def test_fingerprint_folds_parameters_and_lists():
+    asyncpg = fingerprint("SELECT users.id FROM users\n WHERE users.id IN ($1::UUID, $2::UUID) LIMIT $3")
+    psycopg = fingerprint("SELECT users.id FROM users WHERE users.id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) LIMIT 20")
+    assert asyncpg == "SELECT users.id FROM users WHERE users.id IN (?::UUID, ?::UUID) LIMIT ?"
+    assert psycopg == "SELECT users.id FROM users WHERE users.id IN (...) LIMIT ?"
+    assert fingerprint("SELECT * FROM t WHERE name = 'it''s' AND n = 42") == "SELECT * FROM t WHERE name = ? AND n = ?"
+
+
+def test_repeated_statement_is_reported_as_n_plus_one():
+    labels = ("GET", "/test/n-plus-one")
+    stats = RequestStats()
+    for _ in range(10):
+        stats.record_statement("SELECT * FROM profile_pros WHERE user_id = $1", 0.001)
+    stats.record_statement("SELECT * FROM users LIMIT $1", 0.002)
+
+    record_request(labels, stats, 0.05, 100)
+
+    assert n_plus_one.value(*labels, "SELECT * FROM profile_pros WHERE user_id = ?") == 1
+    assert n_plus_one.value(*labels, "SELECT * FROM users LIMIT ?") == 0
@@ -0,0 +1,25 @@
+import pytest
+from datetime import datetime
+from uuid import UUID, uuid4
+from fastapi import HTTPException
+
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_roundtrip():
+    values = (datetime(2026, 10, 18, 9, 30, 12, 345678), uuid4())
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, [datetime, UUID]) == values
+
+
+def test_cursor_with_int_key():
+    values = (3, uuid4())
+    assert decode_cursor(encode_cursor(values), [int, UUID]) == values
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor(("x",)), encode_cursor((1, "not-a-uuid"))])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, [int, UUID])
+    assert exc.value.status_code == 400
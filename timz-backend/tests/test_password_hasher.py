@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.services.password_hasher import PasswordHasher
+from app.utils.auth import password_needs_rehash, get_password_hash
+
+
+@pytest.fixture
+def hasher():
+    pool = PasswordHasher(max_workers=1, max_queue_depth=0, retry_after=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_hash_and_verify_in_pool(hasher):
+    async def scenario():
+        hashed = await hasher.hash("secure_password123")
+        return hashed, await hasher.verify("secure_password123", hashed), await hasher.verify("wrong", hashed)
+
+    hashed, valid, invalid = asyncio.run(scenario())
+
+    assert hashed != "secure_password123"
+    assert valid
+    assert not invalid
+    assert hasher.stats()["completed"] == 3
+    assert hasher.stats()["hash_time_total"] > 0
+
+
+def test_overflow_returns_503_with_retry_after(hasher):
+    async def scenario():
+        return await asyncio.gather(hasher.hash("one"), hasher.hash("two"), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert len(errors) == 1
+    assert errors[0].status_code == 503
+    assert errors[0].headers["Retry-After"] == "3"
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_rehash_needed_when_cost_changes():
+    old_cost_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+
+    assert password_needs_rehash(old_cost_hash)
+    assert not password_needs_rehash(get_password_hash("secret"))
@@ -0,0 +1,73 @@
+from uuid import uuid4
+
+from app.core.principal_cache import Principal, PrincipalCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_principal(**overrides):
+    data = {"id": uuid4(), "roles": ("client",), "is_active": True, "token_version": 0}
+    data.update(overrides)
+    return Principal(**data)
+
+
+def test_hit_and_miss_counters():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    principal = make_principal()
+
+    assert cache.get(principal.id) is None
+    cache.put(principal, cache.generation())
+    assert cache.get(principal.id) == principal
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_invalidate_removes_entry():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    principal = make_principal()
+    cache.put(principal, cache.generation())
+
+    cache.invalidate(principal.id)
+
+    assert cache.get(principal.id) is None
+
+
+def test_put_ignored_when_invalidated_during_load():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    principal = make_principal()
+
+    generation = cache.generation()
+    cache.invalidate(principal.id)  # a writer committed while the row was being read
+    cache.put(principal, generation)
+
+    assert cache.get(principal.id) is None
+
+
+def test_entries_expire_after_ttl():
+    timer = FakeTimer()
+    cache = PrincipalCache(maxsize=10, ttl=30, timer=timer)
+    principal = make_principal()
+    cache.put(principal, cache.generation())
+
+    timer.now = 31
+
+    assert cache.get(principal.id) is None
+
+
+def test_cache_is_bounded():
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    principals = [make_principal() for _ in range(3)]
+    for principal in principals:
+        cache.put(principal, cache.generation())
+
+    assert cache.stats()["size"] == 2
+    assert cache.get(principals[0].id) is None
@@ -0,0 +1,63 @@
+from uuid import uuid4
+
+from app.core.revocation import RevocationSet
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def payload(user_id, token_version=0, session_id=None):
+    data = {"sub": str(user_id), "token_version": token_version}
+    if session_id:
+        data["sid"] = str(session_id)
+    return data
+
+
+def test_revoked_session_rejects_its_tokens_only():
+    revocations = RevocationSet(ttl_seconds=900)
+    user_id, session_id = uuid4(), uuid4()
+
+    revocations.revoke_session(session_id)
+
+    assert revocations.is_revoked(payload(user_id, session_id=session_id))
+    assert not revocations.is_revoked(payload(user_id, session_id=uuid4()))
+
+
+def test_user_floor_rejects_older_token_versions():
+    revocations = RevocationSet(ttl_seconds=900)
+    user_id = uuid4()
+
+    revocations.revoke_user(user_id, 3)
+
+    assert revocations.is_revoked(payload(user_id, token_version=2))
+    assert not revocations.is_revoked(payload(user_id, token_version=3))
+    assert not revocations.is_revoked(payload(uuid4(), token_version=0))
+
+
+def test_user_floor_never_goes_down():
+    revocations = RevocationSet(ttl_seconds=900)
+    user_id = uuid4()
+
+    revocations.revoke_user(user_id, 5)
+    revocations.revoke_user(user_id, 4)
+
+    assert revocations.is_revoked(payload(user_id, token_version=4))
+
+
+def test_entries_are_pruned_after_expiry():
+    timer = FakeTimer()
+    revocations = RevocationSet(ttl_seconds=900, timer=timer)
+    user_id, session_id = uuid4(), uuid4()
+    revocations.revoke_session(session_id)
+    revocations.revoke_user(user_id, 2)
+    assert len(revocations) == 2
+
+    timer.now += 901
+
+    assert not revocations.is_revoked(payload(user_id, token_version=1, session_id=session_id))
+    assert len(revocations) == 0
@@ -0,0 +1,75 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app.utils.bookings import (
+    MINUTES_PER_DAY, available_starts, compile_week, free_minutes, minute_offsets, offsets_to_datetimes,
+    parse_minute, slot_starts,
+)
+
+MONDAY = date(2026, 10, 19)
+WEEK = compile_week(
+    {"mon": [["09:00", "12:00"], ["13:00", "18:00"]], "tue": [["09:00", "18:00"]]},
+    [{"start": "10:00", "end": "10:30", "days": ["tue"]}],
+)
+
+
+def times(offsets) -> list[str]:
+    return [start.strftime("%H:%M") for start in offsets_to_datetimes(MONDAY, offsets)]
+
+
+def test_parse_minute():
+    assert parse_minute("00:00") == 0
+    assert parse_minute("09:30") == 570
+    assert parse_minute("24:00") == MINUTES_PER_DAY
+    for invalid in ("24:01", "9h", "12:60"):
+        with pytest.raises(ValueError):
+            parse_minute(invalid)
+
+
+def test_compile_week_applies_breaks_to_their_days():
+    assert WEEK.shape == (7, MINUTES_PER_DAY)
+    assert WEEK[0].sum() == 8 * 60
+    assert WEEK[1].sum() == 9 * 60 - 30
+    assert not WEEK[1, 600:630].any()
+    assert not WEEK[2:].any()
+
+
+def test_slots_fit_in_open_intervals():
+    starts = available_starts(WEEK, MONDAY, 1, duration=60, step=30)
+    assert times(starts) == ["09:00", "09:30", "10:00", "10:30", "11:00",
+                             "13:00", "13:30", "14:00", "14:30", "15:00", "15:30", "16:00", "16:30", "17:00"]
+
+
+def test_bookings_days_off_and_notice_remove_slots():
+    busy = minute_offsets(MONDAY, [(datetime(2026, 10, 19, 14, 10, 30), datetime(2026, 10, 19, 15, 4, 5))])
+    assert busy.tolist() == [[14 * 60 + 10, 15 * 60 + 5]]  # partial minutes round outwards
+    starts = available_starts(WEEK, MONDAY, 2, duration=60, step=30, busy=busy,
+                              days_off=[date(2026, 10, 20)], not_before=9 * 60 + 1)
+    assert times(starts) == ["09:30", "10:00", "10:30", "11:00", "13:00", "15:30", "16:00", "16:30", "17:00"]
+
+
+def test_busy_intervals_outside_the_window_are_clipped():
+    busy = minute_offsets(MONDAY, [(datetime(2026, 10, 18, 23, 0), datetime(2026, 10, 19, 9, 30)),
+                                   (datetime(2026, 10, 20, 17, 0), datetime(2026, 10, 21, 1, 0))])
+    assert busy.tolist() == [[-60, 570], [MINUTES_PER_DAY + 17 * 60, 2 * MINUTES_PER_DAY + 60]]
+    free = free_minutes(WEEK, MONDAY, 2, busy=busy)
+    assert free.shape == (2 * MINUTES_PER_DAY,)
+    assert not free[:570].any() and free[570]
+    assert not free[MINUTES_PER_DAY + 17 * 60:].any()
+
+
+def test_overlapping_bookings_count_once():
+    busy = np.array([[10, 40], [20, 30], [30, 35]])
+    free = free_minutes(np.ones((7, MINUTES_PER_DAY), dtype=bool), MONDAY, 1, busy=busy)
+    assert free[:10].all() and not free[10:40].any() and free[40:].all()
+
+
+def test_slot_starts_matches_a_naive_scan():
+    rng = np.random.default_rng(7)
+    free = rng.random(3 * MINUTES_PER_DAY) > 0.05
+    duration, step = 45, 15
+    expected = [t for t in range(0, free.size - duration + 1, step) if free[t:t + duration].all()]
+    assert slot_starts(free, duration, step).tolist() == expected
+    assert slot_starts(free, duration, step, not_before=61).tolist() == [t for t in expected if t >= 61]
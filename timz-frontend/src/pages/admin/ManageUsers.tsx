@@ -58,8 +58,8 @@ export function ManageUsers() {
     try {
       setLoading(true);
       const url = activeTab !== 'all'
-        ? `http://127.0.0.1:8000/api/v1/users?role=${activeTab}`
-        : 'http://127.0.0.1:8000/api/v1/users';
+        ? `http://127.0.0.1:8000/api/v1/users?role=${activeTab}&limit=100`
+        : 'http://127.0.0.1:8000/api/v1/users?limit=100';
 
       const response = await fetch(url, {
         headers: {
@@ -69,7 +69,7 @@ export function ManageUsers() {
 
       if (!response.ok) throw new Error('Failed to fetch users');
       const data = await response.json();
-      setUsers(data);
+      setUsers(data.items);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load users');